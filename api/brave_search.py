@@ -1,22 +1,25 @@
 import requests
+import httpx
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from config import Config
+from api.http_client import http_client, get_async_http_client
+from api.single_flight import SingleFlight
+from metrics import traced
 
 logger = logging.getLogger(__name__)
 
+# Identical searches already in flight share one Brave request
+_search_flight = SingleFlight("brave_search")
+
 class BraveSearchAPI:
     """Brave Search API integration"""
     
-    BASE_URL = "https://api.search.brave.com/res/v1/web/search"
+    BASE_URL = Config.BRAVE_SEARCH_URL
     
     @staticmethod
-    def search(query: str, count: int = 5) -> List[Dict[str, Any]]:
-        """Perform web search using Brave Search API"""
-        if not Config.BRAVE_API_KEY:
-            logger.error("Brave API key not configured")
-            return []
-        
+    def _request_parts(query: str, count: int) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Build the headers and query parameters for a search request"""
         headers = {
             "Accept": "application/json",
             "Accept-Encoding": "gzip",
@@ -30,26 +33,76 @@ class BraveSearchAPI:
             "safesearch": "moderate"
         }
         
+        return headers, params
+    
+    @staticmethod
+    def _parse_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert a Brave response body into our search result format"""
+        results = []
+        
+        for result in data.get("web", {}).get("results", []):
+            results.append({
+                "title": result.get("title", ""),
+                "snippet": result.get("description", ""),
+                "url": result.get("url", ""),
+                "published": result.get("age", ""),
+                "source": result.get("profile", {}).get("name", "web")
+            })
+        
+        return results
+    
+    @staticmethod
+    def search(query: str, count: int = 5) -> List[Dict[str, Any]]:
+        """Perform web search using Brave Search API"""
+        return _search_flight.do((query, count), lambda: BraveSearchAPI._search(query, count))
+    
+    @staticmethod
+    async def async_search(query: str, count: int = 5) -> List[Dict[str, Any]]:
+        """Perform web search without blocking the event loop"""
+        return await _search_flight.ado((query, count), lambda: BraveSearchAPI._async_search(query, count))
+    
+    @staticmethod
+    @traced("brave.search")
+    def _search(query: str, count: int) -> List[Dict[str, Any]]:
+        if not Config.BRAVE_API_KEY:
+            logger.error("Brave API key not configured")
+            return []
+        
+        headers, params = BraveSearchAPI._request_parts(query, count)
+        
         try:
-            response = requests.get(BraveSearchAPI.BASE_URL, headers=headers, params=params)
+            response = http_client.get(BraveSearchAPI.BASE_URL, headers=headers, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            results = []
+            results = BraveSearchAPI._parse_results(response.json())
+            logger.info(f"Retrieved {len(results)} search results for: {query}")
+            return results
             
-            for result in data.get("web", {}).get("results", []):
-                results.append({
-                    "title": result.get("title", ""),
-                    "snippet": result.get("description", ""),
-                    "url": result.get("url", ""),
-                    "published": result.get("age", ""),
-                    "source": result.get("profile", {}).get("name", "web")
-                })
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error performing web search: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error in web search: {e}")
+            return []
+    
+    @staticmethod
+    @traced("brave.search")
+    async def _async_search(query: str, count: int) -> List[Dict[str, Any]]:
+        if not Config.BRAVE_API_KEY:
+            logger.error("Brave API key not configured")
+            return []
+        
+        headers, params = BraveSearchAPI._request_parts(query, count)
+        
+        try:
+            response = await get_async_http_client().get(BraveSearchAPI.BASE_URL, headers=headers, params=params)
+            response.raise_for_status()
             
+            results = BraveSearchAPI._parse_results(response.json())
             logger.info(f"Retrieved {len(results)} search results for: {query}")
             return results
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error performing web search: {e}")
             return []
         except Exception as e:
@@ -0,0 +1,282 @@
+import time
+import random
+import asyncio
+import threading
+import logging
+import requests
+import httpx
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class RetryPolicy:
+    """Jittered exponential backoff that honors Retry-After"""
+
+    def __init__(
+        self,
+        max_retries: int = Config.HTTP_MAX_RETRIES,
+        backoff_base: float = Config.HTTP_BACKOFF_BASE,
+        backoff_max: float = Config.HTTP_BACKOFF_MAX,
+        retry_after_max: float = Config.HTTP_RETRY_AFTER_MAX
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    def should_retry(self, attempt: int, status: Optional[int] = None) -> bool:
+        """Retry connection errors (status None) and throttling/server errors"""
+        return attempt < self.max_retries and (status is None or status in RETRY_STATUSES)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt"""
+        server_delay = self.parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.retry_after_max)
+        # Full jitter keeps retries from many workers from synchronizing
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After is either delta-seconds or an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class HTTPMetrics:
+    """Per-host request counts, retries, errors and latency samples"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "retries": 0, "errors": 0})
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, host: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._counts[host]["requests"] += 1
+            if not ok:
+                self._counts[host]["errors"] += 1
+            self._latencies[host].append(seconds * 1000)
+
+    def record_retry(self, host: str) -> None:
+        with self._lock:
+            self._counts[host]["retries"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters plus mean/p50/p95 latency in ms for each host"""
+        with self._lock:
+            result = {}
+            for host, counts in self._counts.items():
+                samples = sorted(self._latencies[host])
+                stats: Dict[str, Any] = dict(counts)
+                if samples:
+                    stats["mean_ms"] = round(sum(samples) / len(samples), 2)
+                    stats["p50_ms"] = round(samples[len(samples) // 2], 2)
+                    stats["p95_ms"] = round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2)
+                result[host] = stats
+            return result
+
+http_metrics = HTTPMetrics()
+
+class HTTPClient:
+    """Keep-alive requests.Session with per-host concurrency limits, timeouts and retries"""
+
+    def __init__(
+        self,
+        pool_size: int = Config.HTTP_POOL_SIZE,
+        max_per_host: int = Config.HTTP_MAX_PER_HOST,
+        timeout: float = Config.HTTP_TIMEOUT,
+        retry: Optional[RetryPolicy] = None,
+        metrics: HTTPMetrics = http_metrics
+    ):
+        self.timeout = (Config.HTTP_CONNECT_TIMEOUT, timeout)
+        self.max_per_host = max_per_host
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors, 429 and 5xx responses"""
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self._send(host, method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.record(host, time.perf_counter() - start, ok=False)
+                if not self.retry.should_retry(attempt):
+                    raise
+                wait = self.retry.delay(attempt)
+                logger.warning(f"Request to {host} failed ({e}), retrying in {wait:.2f}s")
+            else:
+                self.metrics.record(host, time.perf_counter() - start, ok=response.status_code < 400)
+                if not self.retry.should_retry(attempt, response.status_code):
+                    return response
+                wait = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"{host} returned {response.status_code}, retrying in {wait:.2f}s")
+                response.close()
+
+            self.metrics.record_retry(host)
+            attempt += 1
+            time.sleep(wait)
+
+    def _send(self, host: str, method: str, url: str, **kwargs) -> requests.Response:
+        """One attempt under the host's concurrency limit; a streamed response keeps its slot until closed"""
+        limit = self._host_limit(host)
+        limit.acquire()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except BaseException:
+            limit.release()
+            raise
+        if not kwargs.get("stream"):
+            limit.release()
+            return response
+
+        close = response.close
+        released = False
+
+        def close_and_release() -> None:
+            nonlocal released
+            try:
+                close()
+            finally:
+                if not released:
+                    released = True
+                    limit.release()
+
+        response.close = close_and_release
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+class AsyncHTTPClient:
+    """httpx.AsyncClient counterpart of HTTPClient, bound to one event loop"""
+
+    def __init__(
+        self,
+        pool_size: int = Config.HTTP_POOL_SIZE,
+        max_per_host: int = Config.HTTP_MAX_PER_HOST,
+        timeout: float = Config.HTTP_TIMEOUT,
+        retry: Optional[RetryPolicy] = None,
+        metrics: HTTPMetrics = http_metrics
+    ):
+        self.max_per_host = max_per_host
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=Config.HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            follow_redirects=True
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    async def request(self, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """Send a request with retries; with stream=True the caller must aclose() the response"""
+        host = urlsplit(url).netloc
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = await self._send(host, method, url, stream, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException) as e:
+                self.metrics.record(host, time.perf_counter() - start, ok=False)
+                if not self.retry.should_retry(attempt):
+                    raise
+                wait = self.retry.delay(attempt)
+                logger.warning(f"Request to {host} failed ({e}), retrying in {wait:.2f}s")
+            else:
+                self.metrics.record(host, time.perf_counter() - start, ok=response.status_code < 400)
+                if not self.retry.should_retry(attempt, response.status_code):
+                    return response
+                wait = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"{host} returned {response.status_code}, retrying in {wait:.2f}s")
+                await response.aclose()
+
+            self.metrics.record_retry(host)
+            attempt += 1
+            await asyncio.sleep(wait)
+
+    async def _send(self, host: str, method: str, url: str, stream: bool, **kwargs) -> httpx.Response:
+        """One attempt under the host's concurrency limit; a streamed response keeps its slot until aclose()"""
+        limit = self._host_limit(host)
+        await limit.acquire()
+        try:
+            request = self.client.build_request(method, url, **kwargs)
+            response = await self.client.send(request, stream=stream)
+        except BaseException:
+            limit.release()
+            raise
+        if not stream:
+            limit.release()
+            return response
+
+        aclose = response.aclose
+        released = False
+
+        async def aclose_and_release() -> None:
+            nonlocal released
+            try:
+                await aclose()
+            finally:
+                if not released:
+                    released = True
+                    limit.release()
+
+        response.aclose = aclose_and_release
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+# Shared clients used by every API module
+http_client = HTTPClient()
+_async_clients: Dict[asyncio.AbstractEventLoop, AsyncHTTPClient] = {}
+
+def get_async_http_client() -> AsyncHTTPClient:
+    """Shared async client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        for stale_loop in [l for l in _async_clients if l.is_closed()]:
+            del _async_clients[stale_loop]
+        client = _async_clients[loop] = AsyncHTTPClient()
+    return client
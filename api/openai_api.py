@@ -1,16 +1,42 @@
+import asyncio
 import openai
 import logging
+from typing import AsyncIterator, Iterator, List, Dict, Optional
 from config import Config
+from metrics import span, traced, record_tokens
+from utils import count_tokens
 
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
 openai.api_key = Config.OPENAI_API_KEY
 
+SYSTEM_PROMPT = "You are a helpful research assistant. Provide accurate, well-cited responses."
+
+class OpenAIStreamError(Exception):
+    """A stream failed, possibly after yielding part of the answer; str() is the "Error ..." message"""
+
 class OpenAIAPI:
     """OpenAI API integration"""
     
+    _async_client: Optional[openai.AsyncOpenAI] = None
+    _async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
     @staticmethod
+    def _messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    @staticmethod
+    def _record_usage(response) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            record_tokens("generate", usage.prompt_tokens or 0, usage.completion_tokens or 0)
+    
+    @staticmethod
+    @traced("openai.generate")
     def generate_response(prompt: str, max_tokens: int = 1000) -> str:
         """Generate response using OpenAI API"""
         if not Config.OPENAI_API_KEY:
@@ -20,16 +46,109 @@ class OpenAIAPI:
         try:
             response = openai.chat.completions.create(
                 model=Config.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a helpful research assistant. Provide accurate, well-cited responses."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=OpenAIAPI._messages(prompt),
                 max_tokens=max_tokens,
                 temperature=0.7
             )
             
+            OpenAIAPI._record_usage(response)
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Error generating OpenAI response: {e}")
-            return f"Error generating response: {str(e)}"
\ No newline at end of file
+            return f"Error generating response: {str(e)}"
+    
+    @staticmethod
+    def stream_response(prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        """Yield response text chunks as the streaming completions API produces them
+        
+        Failures raise OpenAIStreamError rather than yielding an error chunk, so
+        callers cannot mistake a truncated answer for a complete one.
+        """
+        if not Config.OPENAI_API_KEY:
+            logger.error("OpenAI API key not configured")
+            raise OpenAIStreamError("Error: OpenAI API key not configured")
+        
+        chunks = []
+        try:
+            with span("openai.stream"):
+                stream = openai.chat.completions.create(
+                    model=Config.OPENAI_MODEL,
+                    messages=OpenAIAPI._messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    stream=True
+                )
+                
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            
+            # Streams carry no usage block, so count locally
+            record_tokens("stream", count_tokens(SYSTEM_PROMPT + prompt), count_tokens("".join(chunks)))
+            
+        except Exception as e:
+            logger.error(f"Error streaming OpenAI response: {e}")
+            raise OpenAIStreamError(f"Error generating response: {str(e)}") from e
+    
+    @classmethod
+    def _get_async_client(cls) -> openai.AsyncOpenAI:
+        """Async client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if cls._async_client is None or cls._async_client_loop is not loop:
+            cls._async_client = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+            cls._async_client_loop = loop
+        return cls._async_client
+    
+    @staticmethod
+    @traced("openai.generate")
+    async def async_generate_response(prompt: str, max_tokens: int = 1000) -> str:
+        """Generate response using the async OpenAI client"""
+        if not Config.OPENAI_API_KEY:
+            logger.error("OpenAI API key not configured")
+            return "Error: OpenAI API key not configured"
+        
+        try:
+            response = await OpenAIAPI._get_async_client().chat.completions.create(
+                model=Config.OPENAI_MODEL,
+                messages=OpenAIAPI._messages(prompt),
+                max_tokens=max_tokens,
+                temperature=0.7
+            )
+            
+            OpenAIAPI._record_usage(response)
+            return response.choices[0].message.content
+            
+        except Exception as e:
+            logger.error(f"Error generating OpenAI response: {e}")
+            return f"Error generating response: {str(e)}"
+    
+    @staticmethod
+    async def async_stream_response(prompt: str, max_tokens: int = 1000) -> AsyncIterator[str]:
+        """Async variant of stream_response"""
+        if not Config.OPENAI_API_KEY:
+            logger.error("OpenAI API key not configured")
+            raise OpenAIStreamError("Error: OpenAI API key not configured")
+        
+        chunks = []
+        try:
+            with span("openai.stream"):
+                stream = await OpenAIAPI._get_async_client().chat.completions.create(
+                    model=Config.OPENAI_MODEL,
+                    messages=OpenAIAPI._messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    stream=True
+                )
+                
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            
+            record_tokens("stream", count_tokens(SYSTEM_PROMPT + prompt), count_tokens("".join(chunks)))
+            
+        except Exception as e:
+            logger.error(f"Error streaming OpenAI response: {e}")
+            raise OpenAIStreamError(f"Error generating response: {str(e)}") from e
\ No newline at end of file
@@ -1,51 +1,225 @@
-import requests
+import hashlib
 import PyPDF2
 import re
 import logging
+import multiprocessing
 import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import Config
+from api.http_client import http_client, get_async_http_client
 
 logger = logging.getLogger(__name__)
 
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared extraction pool, started on first use so workers are spawned once
+
+    Workers are spawned, not forked: the servers run request threads and may
+    hold model runtime locks, which a forked child would inherit mid-use.
+    A spawned worker only imports this module.
+    """
+    with _pool_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = _process_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+def _extract_page(page, page_number: int, file_path: str) -> str:
+    try:
+        return page.extract_text() or ""
+    except Exception as e:
+        logger.warning(f"Could not extract page {page_number} of {file_path}: {e}")
+        return ""
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Extract pages [start, stop) in a worker process; page numbers start at 1"""
+    with open(file_path, 'rb') as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        return [
+            (index + 1, _extract_page(pdf_reader.pages[index], index + 1, file_path))
+            for index in range(start, stop)
+        ]
+
 class PDFProcessor:
     """PDF processing utilities"""
     
     @staticmethod
-    def extract_text_from_url(url: str) -> str:
-        """Extract text from PDF URL"""
+    def _check_size(url: str, declared: Optional[str], max_bytes: int) -> None:
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(f"PDF at {url} is {int(declared)} bytes, over the {max_bytes} byte limit")
+    
+    @staticmethod
+    def _new_temp_path() -> str:
+        """Unique temp file, so concurrent downloads never share a path"""
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        return temp_path
+    
+    @staticmethod
+    def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+    
+    @staticmethod
+    def _download_result(path: Optional[str], headers, content_hash: Optional[str]) -> Dict[str, Any]:
+        return {
+            "path": path,
+            "not_modified": path is None,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_hash": content_hash
+        }
+    
+    @staticmethod
+    def fetch_pdf(
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Conditionally stream a PDF to a unique temp file, hashing it on the way
+        
+        Returns path (None on 304 Not Modified; otherwise the caller removes it),
+        not_modified, the response's etag and last_modified, and the SHA-256 content_hash.
+        """
+        max_bytes = max_bytes or Config.PDF_MAX_BYTES
+        temp_path = PDFProcessor._new_temp_path()
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            # Save temporarily
-            temp_path = "temp_pdf.pdf"
-            with open(temp_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Extract text
-            text = PDFProcessor.extract_text_from_file(temp_path)
-            
-            # Clean up
-            os.remove(temp_path)
-            
-            return text
+            response = http_client.get(url, stream=True, headers=PDFProcessor._conditional_headers(etag, last_modified))
+            with response:
+                if response.status_code == 304:
+                    os.remove(temp_path)
+                    return PDFProcessor._download_result(None, response.headers, None)
+                response.raise_for_status()
+                PDFProcessor._check_size(url, response.headers.get("Content-Length"), max_bytes)
+                
+                digest = hashlib.sha256()
+                written = 0
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=Config.PDF_DOWNLOAD_CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise ValueError(f"PDF at {url} exceeds the {max_bytes} byte limit")
+                        digest.update(chunk)
+                        f.write(chunk)
+            return PDFProcessor._download_result(temp_path, response.headers, digest.hexdigest())
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @staticmethod
+    async def async_fetch_pdf(
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async variant of fetch_pdf"""
+        max_bytes = max_bytes or Config.PDF_MAX_BYTES
+        temp_path = PDFProcessor._new_temp_path()
+        try:
+            response = await get_async_http_client().request(
+                "GET", url, stream=True, headers=PDFProcessor._conditional_headers(etag, last_modified)
+            )
+            try:
+                if response.status_code == 304:
+                    os.remove(temp_path)
+                    return PDFProcessor._download_result(None, response.headers, None)
+                response.raise_for_status()
+                PDFProcessor._check_size(url, response.headers.get("Content-Length"), max_bytes)
+                
+                digest = hashlib.sha256()
+                written = 0
+                with open(temp_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(Config.PDF_DOWNLOAD_CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise ValueError(f"PDF at {url} exceeds the {max_bytes} byte limit")
+                        digest.update(chunk)
+                        f.write(chunk)
+            finally:
+                await response.aclose()
+            return PDFProcessor._download_result(temp_path, response.headers, digest.hexdigest())
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @staticmethod
+    def page_count(file_path: str) -> int:
+        with open(file_path, 'rb') as f:
+            return len(PyPDF2.PdfReader(f).pages)
+    
+    @staticmethod
+    def iter_pages(file_path: str, workers: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) in page order, starting at 1
+        
+        Documents with at least PDF_PARALLEL_MIN_PAGES pages are split into one
+        page range per worker and extracted in a process pool.
+        """
+        workers = workers or Config.PDF_EXTRACT_WORKERS
+        if workers > 1:
+            page_count = PDFProcessor.page_count(file_path)
+            if page_count >= Config.PDF_PARALLEL_MIN_PAGES:
+                yield from PDFProcessor._iter_pages_parallel(file_path, page_count, workers)
+                return
+        
+        with open(file_path, 'rb') as f:
+            pdf_reader = PyPDF2.PdfReader(f)
             
+            for page_number, page in enumerate(pdf_reader.pages, 1):
+                yield page_number, _extract_page(page, page_number, file_path)
+    
+    @staticmethod
+    def _iter_pages_parallel(file_path: str, page_count: int, workers: int) -> Iterator[Tuple[int, str]]:
+        range_size = -(-page_count // workers)
+        ranges = [(start, min(start + range_size, page_count)) for start in range(0, page_count, range_size)]
+        
+        try:
+            pool = _get_process_pool(workers)
+            futures = [pool.submit(_extract_page_range, file_path, start, stop) for start, stop in ranges]
         except Exception as e:
-            logger.error(f"Error extracting text from PDF URL: {e}")
-            return ""
+            logger.warning(f"Process pool unavailable ({e}), extracting {file_path} serially")
+            futures = [None] * len(ranges)
+        
+        # Results are consumed in submission order, so pages come back in document order
+        for (start, stop), future in zip(ranges, futures):
+            try:
+                pages = future.result() if future is not None else _extract_page_range(file_path, start, stop)
+            except Exception as e:
+                logger.warning(f"Worker failed on pages {start + 1}-{stop} of {file_path} ({e}), retrying in-process")
+                pages = _extract_page_range(file_path, start, stop)
+            yield from pages
+    
+    @staticmethod
+    def read_preview(file_path: str, max_chars: int) -> str:
+        """Text of the first pages, up to max_chars"""
+        parts, length = [], 0
+        for _, page_text in PDFProcessor.iter_pages(file_path, workers=1):
+            parts.append(page_text)
+            length += len(page_text) + 1
+            if length >= max_chars:
+                break
+        return "\n".join(parts).strip()[:max_chars]
     
     @staticmethod
     def extract_text_from_file(file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                text = ""
-                
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                
-                return text.strip()
-                
+            return "\n".join(text for _, text in PDFProcessor.iter_pages(file_path)).strip()
+            
         except Exception as e:
             logger.error(f"Error extracting text from PDF file: {e}")
             return ""
\ No newline at end of file
@@ -0,0 +1,145 @@
+import time
+import hashlib
+import threading
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sources that say nothing about the content behind an answer, so they never justify a near hit
+_UNSPECIFIC_SOURCES = frozenset({"", "memory"})
+
+class ResponseCache:
+    """LLM answer cache: exact prompt-hash hits plus optional near hits on question similarity"""
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = 500,
+        ttl: float = 24 * 60 * 60,
+        similarity_threshold: Optional[float] = None,
+        embedder: Optional[Callable[[List[str]], np.ndarray]] = None
+    ):
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def near_hits_enabled(self) -> bool:
+        return self.similarity_threshold is not None and self.embedder is not None
+
+    def prompt_key(self, prompt: str, max_tokens: int, kind: str = "answer") -> str:
+        """Hash of everything that determines the completion"""
+        return hashlib.sha256(f"{self.model}\0{kind}\0{max_tokens}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        try:
+            embedding = np.asarray(self.embedder([question])[0], dtype=np.float32)
+            return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+        except Exception as e:
+            logger.error(f"Error embedding question for response cache: {e}")
+            return None
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if now - entry["stored_at"] >= self.ttl]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(
+        self, prompt: str, max_tokens: int, question: str, sources: Iterable[str], kind: str = "answer"
+    ) -> Optional[str]:
+        """Cached answer for this prompt, or for a near-identical question of the same kind over the same sources
+
+        Near hits need at least one specific source: answers built from memory
+        alone, or from no context, say nothing about each other.
+        """
+        key = self.prompt_key(prompt, max_tokens, kind)
+        now = time.time()
+
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["answer"]
+
+        sources = frozenset(sources)
+        if self.near_hits_enabled and sources - _UNSPECIFIC_SOURCES:
+            with self._lock:
+                candidates = [
+                    (candidate_key, entry) for candidate_key, entry in self._entries.items()
+                    if entry["sources"] == sources
+                    and entry["kind"] == kind
+                    and entry["max_tokens"] == max_tokens
+                    and entry["embedding"] is not None
+                ]
+            if candidates:
+                query_embedding = self._embed_question(question)
+                if query_embedding is not None:
+                    similarities = np.stack([entry["embedding"] for _, entry in candidates]) @ query_embedding
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.similarity_threshold:
+                        with self._lock:
+                            self.near_hits += 1
+                            if candidates[best][0] in self._entries:
+                                self._entries.move_to_end(candidates[best][0])
+                        return candidates[best][1]["answer"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(
+        self, prompt: str, max_tokens: int, question: str, sources: Iterable[str], answer: str, kind: str = "answer"
+    ) -> None:
+        """Cache an answer, keyed by its prompt and tagged with its kind and the context sources it used"""
+        entry = {
+            "answer": answer,
+            "question": question,
+            "kind": kind,
+            "max_tokens": max_tokens,
+            "sources": frozenset(sources),
+            "stored_at": time.time(),
+            "embedding": self._embed_question(question) if self.near_hits_enabled else None
+        }
+        key = self.prompt_key(prompt, max_tokens, kind)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_sources(self, sources: Iterable[str]) -> int:
+        """Drop every cached answer built from any of the given sources"""
+        sources = set(sources)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry["sources"] & sources]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached answers for changed sources")
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries)
+        }
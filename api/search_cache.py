@@ -0,0 +1,220 @@
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SearchResults = List[Dict[str, Any]]
+
+def normalize_query(query: str) -> str:
+    """Case- and punctuation-insensitive form of a query"""
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+class SearchCache:
+    """LRU cache of search results with TTLs, stale-while-revalidate and an optional SQLite tier"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        stale_factor: float = 2.0,
+        db_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        # Expired entries may still be served for ttl * stale_factor while they refresh
+        self.stale_factor = stale_factor
+        self.db_path = db_path
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._entries: "OrderedDict[str, Tuple[SearchResults, float, float]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    results TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    ttl REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def key(query: str, count: int) -> str:
+        return f"{count}:{normalize_query(query)}"
+
+    def _lookup(self, key: str) -> Optional[Tuple[SearchResults, float, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self._conn is None:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT results, stored_at, ttl FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading search cache: {e}")
+            return None
+
+        if row is None:
+            return None
+        entry = (json.loads(row[0]), row[1], row[2])
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Tuple[SearchResults, float, float]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def store(self, query: str, count: int, results: SearchResults, ttl: float) -> None:
+        """Cache non-empty results for ttl seconds"""
+        if not results:
+            return
+        key = self.key(query, count)
+        entry = (results, time.time(), ttl)
+        self._remember(key, entry)
+
+        if self._conn is not None:
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO search_cache (key, results, stored_at, ttl) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(results), entry[1], ttl)
+                    )
+            except Exception as e:
+                logger.error(f"Error writing search cache: {e}")
+
+    def _classify(self, key: str) -> Tuple[str, Optional[SearchResults]]:
+        """Return ("fresh" | "stale" | "miss", cached results)"""
+        entry = self._lookup(key)
+        if entry is None:
+            return "miss", None
+        results, stored_at, ttl = entry
+        age = time.time() - stored_at
+        if age < ttl:
+            return "fresh", results
+        if age < ttl * (1 + self.stale_factor):
+            return "stale", results
+        return "miss", None
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _count(self, status: str) -> None:
+        with self._lock:
+            if status == "fresh":
+                self.hits += 1
+            elif status == "stale":
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_fetch(
+        self,
+        query: str,
+        count: int,
+        fetch: Callable[[str, int], SearchResults],
+        ttl: float
+    ) -> SearchResults:
+        """Serve from cache, refreshing stale entries in the background"""
+        key = self.key(query, count)
+        status, results = self._classify(key)
+        self._count(status)
+
+        if status == "fresh":
+            return results
+
+        if status == "stale":
+            if self._claim_refresh(key):
+                self._refresh_executor.submit(self._refresh, key, query, count, fetch, ttl)
+            return results
+
+        results = fetch(query, count)
+        self.store(query, count, results, ttl)
+        return results
+
+    def _refresh(self, key: str, query: str, count: int, fetch: Callable[[str, int], SearchResults], ttl: float) -> None:
+        try:
+            self.store(query, count, fetch(query, count), ttl)
+        except Exception as e:
+            logger.error(f"Error refreshing cached search for '{query}': {e}")
+        finally:
+            self._release_refresh(key)
+
+    async def aget_or_fetch(
+        self,
+        query: str,
+        count: int,
+        fetch: Callable[[str, int], Awaitable[SearchResults]],
+        ttl: float
+    ) -> SearchResults:
+        """Async variant of get_or_fetch; refreshes run as event loop tasks"""
+        key = self.key(query, count)
+        status, results = self._classify(key)
+        self._count(status)
+
+        if status == "fresh":
+            return results
+
+        if status == "stale":
+            if self._claim_refresh(key):
+                task = asyncio.get_running_loop().create_task(self._arefresh(key, query, count, fetch, ttl))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return results
+
+        results = await fetch(query, count)
+        self.store(query, count, results, ttl)
+        return results
+
+    async def _arefresh(self, key: str, query: str, count: int, fetch: Callable[[str, int], Awaitable[SearchResults]], ttl: float) -> None:
+        try:
+            self.store(query, count, await fetch(query, count), ttl)
+        except Exception as e:
+            logger.error(f"Error refreshing cached search for '{query}': {e}")
+        finally:
+            self._release_refresh(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "size": len(self._entries)
+        }
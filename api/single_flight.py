@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, "SingleFlight"] = {}
+
+# Async flights whose callers were all cancelled keep running; the loop only holds weak references
+_tasks: Set["asyncio.Task"] = set()
+
+class SingleFlight:
+    """Runs concurrent calls that share a key once and hands the result to every caller
+
+    The first caller for a key executes the work; callers arriving while it is
+    in flight wait for the same result (or exception) instead of repeating it.
+    Nothing is cached: a call that starts after the flight landed runs again.
+    Waiters receive the leader's result object, so it must not be mutated.
+    Sync and async callers of one instance share flights.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """The flight for key and whether this caller leads it"""
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def _land(self, key: Hashable) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), sharing one execution among concurrent callers with the same key"""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"Coalesced {self.name} call into in-flight request")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._land(key)
+            future.set_exception(e)
+            raise
+        self._land(key)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of do; cancelling any caller, the leader included, does not cancel the shared flight"""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"Coalesced {self.name} call into in-flight request")
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        # The work runs as its own task, so the leader's cancellation only stops its wait
+        task = asyncio.ensure_future(fn())
+        _tasks.add(task)
+
+        def settle(task: "asyncio.Task") -> None:
+            _tasks.discard(task)
+            self._land(key)
+            if task.cancelled():
+                future.set_exception(asyncio.CancelledError())
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        task.add_done_callback(settle)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights)
+            }
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Coalescing counters of every SingleFlight, by name"""
+    return {name: flight.stats() for name, flight in _registry.items()}
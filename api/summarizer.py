@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List
+from config import Config
+from api.openai_api import OpenAIAPI
+
+logger = logging.getLogger(__name__)
+
+MAP_PROMPT = """
+    Extract the information in this document excerpt that is relevant to the question: "{question}"
+
+    Excerpt:
+    {text}
+
+    Reply with concise bullet points that keep figures, names and page references. Reply "None" if nothing is relevant.
+    """
+
+REDUCE_PROMPT = """
+    Combine these partial summaries of one document into a single summary for the question: "{question}"
+
+    Partial summaries:
+    {text}
+
+    Merge duplicate points, keep page references, and highlight the key points relevant to the question.
+    """
+
+def _usable(summary: str) -> bool:
+    return bool(summary) and not summary.startswith("Error") and summary.strip().rstrip(".").lower() != "none"
+
+class MapReduceSummarizer:
+    """Summarize many chunks with concurrent map calls and a hierarchical reduce"""
+
+    def __init__(
+        self,
+        generate: Callable[..., str] = OpenAIAPI.generate_response,
+        agenerate: Callable[..., Awaitable[str]] = OpenAIAPI.async_generate_response,
+        max_concurrency: int = Config.PDF_SUMMARY_CONCURRENCY,
+        fan_in: int = Config.PDF_SUMMARY_FAN_IN,
+        map_max_tokens: int = 300,
+        reduce_max_tokens: int = 1000
+    ):
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+        self.generate = generate
+        self.agenerate = agenerate
+        self.max_concurrency = max_concurrency
+        self.fan_in = fan_in
+        self.map_max_tokens = map_max_tokens
+        self.reduce_max_tokens = reduce_max_tokens
+
+    def _groups(self, summaries: List[str]) -> List[str]:
+        return [
+            "\n\n".join(summaries[start:start + self.fan_in])
+            for start in range(0, len(summaries), self.fan_in)
+        ]
+
+    def summarize(self, question: str, chunks: List[str]) -> str:
+        """Map every chunk, then reduce fan_in summaries per call until one is left"""
+        if not chunks:
+            return "Error: nothing to summarize"
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as executor:
+            summaries = list(executor.map(
+                lambda chunk: self.generate(MAP_PROMPT.format(question=question, text=chunk), max_tokens=self.map_max_tokens),
+                chunks
+            ))
+            partials = [summary for summary in summaries if _usable(summary)]
+            if not partials:
+                return next((summary for summary in summaries if summary.startswith("Error")), "No relevant content found in the document.")
+
+            # A single map result still goes through one reduce to get the final summary format
+            while True:
+                reduced = list(executor.map(
+                    lambda text: self.generate(REDUCE_PROMPT.format(question=question, text=text), max_tokens=self.reduce_max_tokens),
+                    self._groups(partials)
+                ))
+                partials = [summary for summary in reduced if _usable(summary)] or reduced[:1]
+                if len(partials) == 1:
+                    return partials[0]
+
+    async def asummarize(self, question: str, chunks: List[str]) -> str:
+        """Async variant of summarize; at most max_concurrency completions run at once"""
+        if not chunks:
+            return "Error: nothing to summarize"
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call(template: str, text: str, max_tokens: int) -> str:
+            async with semaphore:
+                return await self.agenerate(template.format(question=question, text=text), max_tokens=max_tokens)
+
+        summaries = await asyncio.gather(*(call(MAP_PROMPT, chunk, self.map_max_tokens) for chunk in chunks))
+        partials = [summary for summary in summaries if _usable(summary)]
+        if not partials:
+            return next((summary for summary in summaries if summary.startswith("Error")), "No relevant content found in the document.")
+
+        while True:
+            reduced = await asyncio.gather(
+                *(call(REDUCE_PROMPT, text, self.reduce_max_tokens) for text in self._groups(partials))
+            )
+            partials = [summary for summary in reduced if _usable(summary)] or reduced[:1]
+            if len(partials) == 1:
+                return partials[0]
@@ -0,0 +1,128 @@
+"""
+Benchmark PDF chunking: fixed 1000-character slices vs the structure-aware TextChunker
+
+Retrieval quality is measured with a BM25 index over the chunks of a synthetic
+sectioned document. Each query is a handful of words from one sentence; a hit
+means one of the top-k chunks contains that whole sentence, so the answer is
+actually in the prompt. Tokens/prompt is the context cost of those k chunks.
+
+Usage: python -m benchmarks.bench_chunking [--sections 60] [--queries 300] [--k 3]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Iterable, Iterator, List, Tuple
+
+from stores.bm25_index import BM25Index, tokenize
+from stores.text_chunker import TextChunker
+from utils import count_tokens
+
+FIXED_CHUNK_SIZE = 1000
+
+
+def fixed_chunks(pages: Iterable[Tuple[int, str]]) -> Iterator[str]:
+    """The original slicing: 1000-character windows with no overlap"""
+    buffer = ""
+    for _, page_text in pages:
+        buffer += page_text + "\n"
+        while len(buffer) >= FIXED_CHUNK_SIZE:
+            yield buffer[:FIXED_CHUNK_SIZE]
+            buffer = buffer[FIXED_CHUNK_SIZE:]
+    if buffer.strip():
+        yield buffer
+
+
+def make_words(count: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(count)]
+
+
+def make_document(sections: int, rng: random.Random) -> Tuple[List[Tuple[int, str]], List[str]]:
+    """Sectioned text wrapped at ~90 columns and cut into ~3000-character pages, plus its sentences"""
+    common = make_words(300, rng)
+    lines, sentences = [], []
+
+    for section in range(1, sections + 1):
+        topic = make_words(40, rng)
+        lines += ["", f"{section}. {' '.join(rng.sample(topic, 2)).upper()}"]
+        for _ in range(rng.randint(3, 7)):
+            paragraph = []
+            for _ in range(rng.randint(3, 8)):
+                words = rng.choices(topic, k=rng.randint(4, 8)) + rng.choices(common, k=rng.randint(6, 14))
+                rng.shuffle(words)
+                sentence = " ".join(words).capitalize() + "."
+                sentences.append(sentence)
+                paragraph.append(sentence)
+
+            line = ""
+            for word in " ".join(paragraph).split():
+                if len(line) + len(word) > 90:
+                    lines.append(line)
+                    line = ""
+                line = f"{line} {word}".strip()
+            lines += [line, ""]
+
+    pages, page, page_number = [], [], 1
+    for line in lines:
+        page.append(line)
+        if sum(len(l) + 1 for l in page) >= 3000:
+            pages.append((page_number, "\n".join(page)))
+            page, page_number = [], page_number + 1
+    if page:
+        pages.append((page_number, "\n".join(page)))
+    return pages, sentences
+
+
+def evaluate(name: str, chunks: List[str], seconds: float, size: int, queries, k: int) -> None:
+    index = BM25Index()
+    normalized = []
+    for chunk_id, chunk in enumerate(chunks):
+        index.add(chunk_id, chunk)
+        normalized.append(" ".join(chunk.split()))
+    chunk_tokens = [count_tokens(chunk) for chunk in chunks]
+
+    hits, prompt_tokens = 0, []
+    for query, sentence in queries:
+        top = index.search(query, k)
+        hits += any(sentence in normalized[chunk_id] for chunk_id, _ in top)
+        prompt_tokens.append(sum(chunk_tokens[chunk_id] for chunk_id, _ in top))
+
+    print(
+        f"  {name:<12}: {len(chunks):5d} chunks  {size / seconds / 1e6:6.2f} MB/s  "
+        f"hit@{k} {hits / len(queries):6.1%}  tokens/prompt {statistics.mean(prompt_tokens):6.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--chunk-tokens", type=int, default=256)
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages, sentences = make_document(args.sections, rng)
+    size = sum(len(text) for _, text in pages)
+    queries = [
+        (" ".join(rng.sample(tokenize(sentence), 5)), sentence)
+        for sentence in rng.sample(sentences, min(args.queries, len(sentences)))
+    ]
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB, {len(sentences)} sentences, {len(queries)} queries")
+
+    start = time.perf_counter()
+    fixed = list(fixed_chunks(pages))
+    evaluate("fixed slices", fixed, time.perf_counter() - start, size, queries, args.k)
+
+    chunker = TextChunker(chunk_tokens=args.chunk_tokens, overlap_tokens=args.overlap_tokens)
+    start = time.perf_counter()
+    structured = [chunk["text"] for chunk in chunker.chunk_pages(pages)]
+    evaluate("structured", structured, time.perf_counter() - start, size, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
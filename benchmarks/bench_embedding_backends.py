@@ -0,0 +1,141 @@
+"""
+Compare embedding backends: load time, throughput, peak RSS and retrieval recall
+
+Each backend runs in a fresh interpreter so its memory use is measured alone.
+The corpus and queries are generated locally from a fixed seed (topic words
+mixed with filler), so no data is downloaded. Recall@k is the overlap of each
+query's top-k corpus neighbours with the neighbours found by the first backend
+(the fp32 baseline).
+
+Usage: python -m benchmarks.bench_embedding_backends [--backends sentence_transformers onnx onnx_int8] [--docs 2000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOPICS = {
+    "retrieval": ["vector", "index", "embedding", "nearest", "neighbour", "search", "recall", "query"],
+    "databases": ["transaction", "index", "replica", "query", "storage", "commit", "schema", "table"],
+    "biology": ["protein", "cell", "enzyme", "gene", "membrane", "mutation", "tissue", "receptor"],
+    "climate": ["carbon", "emission", "ocean", "warming", "glacier", "rainfall", "drought", "forecast"],
+    "finance": ["interest", "inflation", "bond", "equity", "market", "dividend", "credit", "yield"],
+    "networking": ["packet", "latency", "router", "bandwidth", "protocol", "congestion", "socket", "tcp"],
+}
+FILLER = ["the", "a", "of", "in", "results", "study", "shows", "we", "measure", "new", "method", "and", "effect", "for"]
+
+
+def make_corpus(docs: int, queries: int, seed: int) -> Tuple[List[str], List[str]]:
+    rng = random.Random(seed)
+
+    def sentence(words: int) -> str:
+        topic = TOPICS[rng.choice(list(TOPICS))]
+        return " ".join(rng.choice(topic) if rng.random() < 0.4 else rng.choice(FILLER) for _ in range(words))
+
+    return [sentence(rng.randint(20, 120)) for _ in range(docs)], [sentence(rng.randint(4, 12)) for _ in range(queries)]
+
+
+def run_worker(backend: str, corpus_path: str, output_path: str, batch_size: int) -> None:
+    """Embed corpus + queries with one backend and write vectors and stats"""
+    from stores.embedding_backends import create_embedding_backend
+
+    with open(corpus_path) as f:
+        data = json.load(f)
+    texts = data["docs"] + data["queries"]
+
+    start = time.perf_counter()
+    model = create_embedding_backend(backend)
+    model.encode(["warm up"])
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = np.concatenate([model.encode(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+    encode_seconds = time.perf_counter() - start
+
+    np.save(output_path, vectors.astype(np.float32))
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "texts_per_second": len(texts) / encode_seconds,
+        "peak_rss_mb": rss_mb
+    }))
+
+
+def top_k(vectors: np.ndarray, docs: int, k: int) -> np.ndarray:
+    doc_vectors, query_vectors = vectors[:docs], vectors[docs:]
+    doc_vectors = doc_vectors / np.maximum(np.linalg.norm(doc_vectors, axis=1, keepdims=True), 1e-12)
+    query_vectors = query_vectors / np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+    scores = query_vectors @ doc_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall_at_k(baseline: np.ndarray, candidate: np.ndarray) -> float:
+    hits = sum(len(set(expected) & set(found)) for expected, found in zip(baseline, candidate))
+    return hits / baseline.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["sentence_transformers", "onnx", "onnx_int8"])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--worker", nargs=3, metavar=("BACKEND", "CORPUS", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker, batch_size=args.batch_size)
+        return
+
+    docs, queries = make_corpus(args.docs, args.queries, args.seed)
+    pythonpath = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONPATH=pythonpath)
+    results: Dict[str, Dict[str, float]] = {}
+    neighbours: Dict[str, np.ndarray] = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_path = os.path.join(tmp_dir, "corpus.json")
+        with open(corpus_path, "w") as f:
+            json.dump({"docs": docs, "queries": queries}, f)
+
+        for backend in args.backends:
+            output_path = os.path.join(tmp_dir, f"{backend}.npy")
+            process = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_embedding_backends", "--batch-size", str(args.batch_size),
+                 "--worker", backend, corpus_path, output_path],
+                cwd=tmp_dir, env=env, capture_output=True, text=True
+            )
+            if process.returncode != 0:
+                print(f"{backend}: failed\n{process.stderr.strip().splitlines()[-1] if process.stderr.strip() else ''}")
+                continue
+            results[backend] = json.loads(process.stdout.strip().splitlines()[-1])
+            neighbours[backend] = top_k(np.load(output_path), len(docs), args.k)
+
+    if not results:
+        return
+    baseline = next(iter(results))
+    print(f"\n{len(docs)} docs, {len(queries)} queries, recall@{args.k} vs {baseline}")
+    print(f"  {'backend':<22} {'load s':>8} {'texts/s':>10} {'peak RSS MB':>12} {'recall':>8}")
+    for backend, stats in results.items():
+        recall = recall_at_k(neighbours[baseline], neighbours[backend])
+        print(f"  {backend:<22} {stats['load_seconds']:8.2f} {stats['texts_per_second']:10.0f} "
+              f"{stats['peak_rss_mb']:12.0f} {recall:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
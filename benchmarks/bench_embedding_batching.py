@@ -0,0 +1,104 @@
+"""
+Benchmark EmbeddingBatcher: direct per-request encode calls vs coalesced micro-batches
+
+Each client thread sends small encode requests (1-3 texts, like similarity_search
+and memory lookups) back to back. By default the model is simulated: one call
+costs a fixed overhead plus a per-text cost and, like a CPU-bound model, only one
+call runs at a time. Pass --model to use the real sentence-transformers model.
+
+Usage: python -m benchmarks.bench_embedding_batching [--clients 1 8 64] [--requests 50] [--model all-MiniLM-L6-v2]
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from stores.embedding_batcher import EmbeddingBatcher
+
+
+class SimulatedModel:
+    """encode() costs call_ms + per_text_ms * len(texts), serialized like a CPU-bound model"""
+
+    def __init__(self, call_ms: float, per_text_ms: float, dim: int = 384):
+        self.call_ms = call_ms
+        self.per_text_ms = per_text_ms
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        with self._lock:
+            time.sleep((self.call_ms + self.per_text_ms * len(texts)) / 1000)
+        return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+
+def run_clients(encode: Callable[[List[str]], np.ndarray], clients: int, requests: int, seed: int) -> Tuple[float, List[float], int]:
+    """Returns wall time, per-request latencies in ms and the number of texts encoded"""
+    latencies: List[float] = []
+    counts: List[int] = []
+    lock = threading.Lock()
+
+    def client(client_id: int) -> None:
+        rng = random.Random(seed + client_id)
+        local_latencies, local_texts = [], 0
+        for request in range(requests):
+            texts = [f"client {client_id} request {request} text {i}" for i in range(rng.randint(1, 3))]
+            start = time.perf_counter()
+            encode(texts)
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            local_texts += len(texts)
+        with lock:
+            latencies.extend(local_latencies)
+            counts.append(local_texts)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, sum(counts)
+
+
+def summarize(name: str, seconds: float, latencies: List[float], texts: int) -> str:
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return f"  {name:<8}: {texts / seconds:8.0f} texts/s  p50 {p50:8.2f} ms  p95 {p95:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--call-ms", type=float, default=4.0, help="simulated fixed cost per model call")
+    parser.add_argument("--per-text-ms", type=float, default=0.2, help="simulated cost per text")
+    parser.add_argument("--model", help="sentence-transformers model name instead of the simulation")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        encode_fn = SentenceTransformer(args.model).encode
+        encode_fn(["warm up"])
+    else:
+        encode_fn = SimulatedModel(args.call_ms, args.per_text_ms).encode
+
+    for clients in args.clients:
+        print(f"\n{clients} concurrent clients x {args.requests} requests")
+        print(summarize("direct", *run_clients(encode_fn, clients, args.requests, args.seed)))
+
+        batcher = EmbeddingBatcher(encode_fn, max_batch_size=args.batch_size, max_wait_ms=args.wait_ms)
+        print(summarize("batched", *run_clients(batcher.encode, clients, args.requests, args.seed)))
+        stats = batcher.stats()
+        batcher.close()
+        print(f"  {'':<8}  {stats['batches']} model calls, mean batch {stats['mean_batch_size']} texts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Offline load test of the /ask path against local fake Brave and OpenAI servers
+
+Starts benchmarks.fake_services with the given upstream latency and jitter, points
+the app at it with placeholder API keys, and sends unique questions at each
+concurrency level to one or more targets:
+
+  graph        compiled sync graph, invoke() from a thread pool
+  async_graph  compiled async graph, ainvoke() on one event loop
+  flask        POST /ask on the Flask app (in-process test client, threaded)
+  asgi         POST /ask on the FastAPI app (httpx ASGI transport)
+
+Reports throughput, p50/p95/p99 end-to-end latency and process RSS per level,
+and p50/p95/p99 per stage (graph node or external call) from the request
+timings. Stores are created in a temporary directory. Response and search
+caches are disabled so every request takes the full path, unless --keep-caches.
+
+Usage: python -m benchmarks.bench_load [--targets graph flask] [--concurrency 1 8 32] [--requests 64] [--brave-ms 150] [--openai-ms 600] [--jitter-ms 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOPICS = ["vector databases", "http caching", "python asyncio", "tcp congestion", "protein folding",
+          "solar panels", "rust ownership", "bloom filters", "raft consensus", "jpeg compression"]
+
+# (latency ms, ok, {stage: ms})
+Sample = Tuple[float, bool, Dict[str, float]]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def rss_mb() -> Tuple[float, float]:
+    """Current and peak resident set size in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        with open("/proc/self/statm") as f:
+            current_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        current_mb = peak_mb
+    return current_mb, peak_mb
+
+
+def make_questions(count: int, memory_share: float, rng: random.Random) -> List[str]:
+    """Unique questions, so neither coalescing nor caches hide the work"""
+    questions = []
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        if rng.random() < memory_share:
+            questions.append(f"What did we discuss previously about {topic}? ({i})")
+        else:
+            questions.append(f"Search the web for recent work on {topic} ({i} {rng.randint(0, 10 ** 6)})")
+    return questions
+
+
+def stage_ms(timings: Dict[str, Any]) -> Dict[str, float]:
+    return {name: entry["ms"] for name, entry in (timings or {}).items()}
+
+
+def run_threads(call: Callable[[str], Sample], questions: List[str], concurrency: int) -> Tuple[float, List[Sample]]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(call, questions))
+    return time.perf_counter() - start, samples
+
+
+async def run_tasks(call: Callable[[str], Any], questions: List[str], concurrency: int) -> Tuple[float, List[Sample]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(question: str) -> Sample:
+        async with semaphore:
+            return await call(question)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(limited(question) for question in questions))
+    return time.perf_counter() - start, list(samples)
+
+
+def graph_target():
+    from graph.workflow import create_research_assistant
+    from metrics import request_trace, timing_breakdown
+
+    graph = create_research_assistant()
+
+    def call(question: str) -> Sample:
+        start = time.perf_counter()
+        with request_trace() as trace:
+            result = graph.invoke({"question": question})
+        return (time.perf_counter() - start) * 1000, not result.get("error"), stage_ms(timing_breakdown(trace))
+
+    return call
+
+
+def async_graph_target():
+    from graph.workflow import create_async_research_assistant
+    from metrics import request_trace, timing_breakdown
+
+    graph = create_async_research_assistant()
+
+    async def call(question: str) -> Sample:
+        start = time.perf_counter()
+        with request_trace() as trace:
+            result = await graph.ainvoke({"question": question})
+        return (time.perf_counter() - start) * 1000, not result.get("error"), stage_ms(timing_breakdown(trace))
+
+    return call
+
+
+def flask_target():
+    from main import create_web_app
+
+    app = create_web_app()
+
+    def call(question: str) -> Sample:
+        start = time.perf_counter()
+        response = app.test_client().post("/ask", json={"question": question})
+        body = response.get_json() or {}
+        return (time.perf_counter() - start) * 1000, response.status_code == 200, stage_ms(body.get("timings"))
+
+    return call
+
+
+def asgi_target(client):
+    async def call(question: str) -> Sample:
+        start = time.perf_counter()
+        response = await client.post("/ask", json={"question": question})
+        body = response.json()
+        return (time.perf_counter() - start) * 1000, response.status_code == 200, stage_ms(body.get("timings"))
+
+    return call
+
+
+def report(target: str, concurrency: int, seconds: float, samples: List[Sample], top: int) -> None:
+    latencies = [latency for latency, _, _ in samples]
+    errors = sum(1 for _, ok, _ in samples if not ok)
+    current, peak = rss_mb()
+    print(f"\n{target} x{concurrency}: {len(samples)} requests, {errors} errors, {len(samples) / seconds:.1f} req/s, "
+          f"RSS {current:.0f} MB (peak {peak:.0f} MB)")
+    print(f"  {'stage':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print(f"  {'end to end':<28} {percentile(latencies, 0.5):9.1f} {percentile(latencies, 0.95):9.1f} {percentile(latencies, 0.99):9.1f}")
+
+    stages: Dict[str, List[float]] = {}
+    for _, _, timings in samples:
+        for name, ms in timings.items():
+            stages.setdefault(name, []).append(ms)
+    slowest = sorted(stages.items(), key=lambda item: percentile(item[1], 0.5), reverse=True)[:top]
+    for name, values in slowest:
+        print(f"  {name:<28} {percentile(values, 0.5):9.1f} {percentile(values, 0.95):9.1f} {percentile(values, 0.99):9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=["graph", "async_graph", "flask", "asgi"],
+                        choices=["graph", "async_graph", "flask", "asgi"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--brave-ms", type=float, default=150.0)
+    parser.add_argument("--openai-ms", type=float, default=600.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--memory-share", type=float, default=0.2, help="fraction of memory-lookup questions")
+    parser.add_argument("--workflow", choices=["routed", "parallel"], default="routed")
+    parser.add_argument("--keep-caches", action="store_true", help="leave response and search caches enabled")
+    parser.add_argument("--top", type=int, default=12, help="stages shown per level")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from benchmarks.fake_services import FakeServices
+
+    services = FakeServices(brave_ms=args.brave_ms, openai_ms=args.openai_ms, jitter_ms=args.jitter_ms, seed=args.seed).start()
+    os.environ.update(services.environ())
+    os.environ["WARM_UP_ON_START"] = "0"
+
+    # Config reads the environment on import, and stores are created relative to the working directory
+    sys.path.insert(0, ROOT)
+    tmp_dir = tempfile.TemporaryDirectory()
+    os.chdir(tmp_dir.name)
+
+    from config import Config
+    from graph.resources import resources
+
+    Config.DEBUG = True
+    Config.WORKFLOW_MODE = args.workflow
+    if not args.keep_caches:
+        Config.RESPONSE_CACHE_SIZE = 0
+        Config.SEARCH_CACHE_TTL = 0
+        Config.SEARCH_CACHE_NEWS_TTL = 0
+
+    start = time.perf_counter()
+    resources.warm_up()
+    current, peak = rss_mb()
+    print(f"warm-up {time.perf_counter() - start:.2f} s, RSS {current:.0f} MB (peak {peak:.0f} MB)")
+    print(f"fake upstreams: Brave {args.brave_ms:g} ms, OpenAI {args.openai_ms:g} ms, jitter ±{args.jitter_ms:g} ms")
+
+    rng = random.Random(args.seed)
+    for target in args.targets:
+        if target == "asgi":
+            import httpx
+            from main import create_asgi_app
+
+            async def run_asgi() -> None:
+                transport = httpx.ASGITransport(app=create_asgi_app())
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                    call = asgi_target(client)
+                    for concurrency in args.concurrency:
+                        questions = make_questions(args.requests, args.memory_share, rng)
+                        report(target, concurrency, *await run_tasks(call, questions, concurrency), args.top)
+
+            asyncio.run(run_asgi())
+        elif target == "async_graph":
+            call = async_graph_target()
+            for concurrency in args.concurrency:
+                questions = make_questions(args.requests, args.memory_share, rng)
+                report(target, concurrency, *asyncio.run(run_tasks(call, questions, concurrency)), args.top)
+        else:
+            call = graph_target() if target == "graph" else flask_target()
+            for concurrency in args.concurrency:
+                questions = make_questions(args.requests, args.memory_share, rng)
+                report(target, concurrency, *run_threads(call, questions, concurrency), args.top)
+
+    print(f"\nupstream requests: {services.requests}")
+    services.stop()
+    os.chdir(ROOT)
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark MemoryStore.search_memory: BM25 inverted index vs the original overlap scorer
+
+Usage: python -m benchmarks.bench_memory_search [--sizes 1000 10000 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List, Dict, Any
+
+from stores.memory_backends import JSONLMemoryBackend
+from stores.memory_store import MemoryStore
+
+
+def overlap_search(memory: List[Dict[str, Any]], query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """The original full-scan word-overlap scorer"""
+    query_words = set(query.lower().split())
+    scored_entries = []
+
+    for entry in memory:
+        question_words = set(entry["question"].lower().split())
+        answer_words = set(entry["answer"].lower().split())
+        score = len(query_words & question_words) + 0.5 * len(query_words & answer_words)
+        if score > 0:
+            scored_entries.append((score, entry))
+
+    scored_entries.sort(key=lambda x: x[0], reverse=True)
+    return [entry for _, entry in scored_entries[:limit]]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_entries(count: int, vocabulary: List[str], rng: random.Random) -> List[Dict[str, Any]]:
+    # Zipf-like word frequencies so a few terms are very common, as in real text
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    entries = []
+    for _ in range(count):
+        question = " ".join(rng.choices(vocabulary, weights, k=rng.randint(6, 14))) + "??"
+        answer = " ".join(rng.choices(vocabulary, weights, k=rng.randint(80, 200))) + "."
+        entries.append({"question": question, "answer": answer, "citations": [], "timestamp": "2025-01-01T00:00:00"})
+    return entries
+
+
+def time_queries(search, queries: List[str]) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return f"mean {statistics.mean(latencies):8.3f} ms  p95 {p95:8.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(20000, rng)
+
+    for size in args.sizes:
+        entries = make_entries(size, vocabulary, rng)
+        queries = [" ".join(rng.sample(entry["question"].split(), 4)) for entry in rng.sample(entries, args.queries)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backend = JSONLMemoryBackend(os.path.join(tmp_dir, "memory.jsonl"))
+            backend.append_many(entries)
+            store = MemoryStore(file_path=os.path.join(tmp_dir, "missing.json"), backend=backend)
+
+            start = time.perf_counter()
+            store.memory
+            load_ms = (time.perf_counter() - start) * 1000
+
+            bm25 = time_queries(lambda q: store.search_memory(q, limit=3), queries)
+            overlap = time_queries(lambda q: overlap_search(store.memory, q, limit=3), queries)
+
+        print(f"\n{size} entries (load + index {load_ms:.0f} ms)")
+        print(f"  overlap scan : {summarize(overlap)}")
+        print(f"  bm25 index   : {summarize(bm25)}")
+        print(f"  speedup      : {statistics.mean(overlap) / statistics.mean(bm25):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
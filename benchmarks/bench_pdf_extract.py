@@ -0,0 +1,92 @@
+"""
+Benchmark PDFProcessor page extraction: serial vs process pool with 2, 4, 8... workers
+
+Usage: python -m benchmarks.bench_pdf_extract [--pages 400] [--workers 2 4 8] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from api.pdf_processor import PDFProcessor, _get_process_pool
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 40) -> None:
+    """Write a minimal uncompressed PDF with `pages` pages of Helvetica text"""
+    font_id = 3 + 2 * pages
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+    ]
+
+    for i in range(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        lines = [f"Page {i + 1} line {j}: the quick brown fox jumps over the lazy dog." for j in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 50 760 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def extract(path: str, workers: int) -> List[str]:
+    return [text for _, text in PDFProcessor.iter_pages(path, workers=workers)]
+
+
+def best_of(path: str, workers: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(path, workers)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs available")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "synthetic.pdf")
+        make_pdf(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024:.0f} KiB")
+
+        expected = extract(path, workers=1)
+        serial = best_of(path, 1, args.repeat)
+        print(f"  serial      : {serial:7.2f} s")
+
+        for workers in args.workers:
+            # Spawn the pool outside the timed runs; the server keeps it alive between requests
+            _get_process_pool(workers)
+            if extract(path, workers) != expected:
+                raise SystemExit(f"{workers} workers returned different text than serial extraction")
+            seconds = best_of(path, workers, args.repeat)
+            print(f"  {workers:2d} workers  : {seconds:7.2f} s  speedup {serial / seconds:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
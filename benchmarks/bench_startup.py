@@ -0,0 +1,82 @@
+"""
+Profile startup: import time of the graph and server modules, and time to warm up resources
+
+Each measurement runs in a fresh interpreter, so nothing is cached between them.
+`--top` lists the slowest imports (cumulative) reported by `python -X importtime`.
+
+Usage: python -m benchmarks.bench_startup [--modules graph.workflow main] [--top 15] [--repeat 3] [--skip-warm-up]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+WARM_UP_SNIPPET = """
+import time
+from graph.resources import resources
+start = time.perf_counter()
+resources.warm_up()
+print(time.perf_counter() - start)
+print(resources.status())
+"""
+
+
+def run_python(code: str, *flags: str, cwd: str = ROOT) -> subprocess.CompletedProcess:
+    pythonpath = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, WARM_UP_ON_START="0", PYTHONPATH=pythonpath)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_seconds(module: str, repeat: int) -> float:
+    return min(float(run_python(IMPORT_SNIPPET.format(module=module)).stdout.split()[0]) for _ in range(repeat))
+
+
+def slowest_imports(module: str, top: int) -> List[Tuple[float, str]]:
+    """(cumulative ms, module) pairs from -X importtime"""
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=["graph.workflow", "main"])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-warm-up", action="store_true", help="do not load the embedding model and Chroma")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        print(f"\nimport {module}: {import_seconds(module, args.repeat) * 1000:.0f} ms (best of {args.repeat})")
+        for milliseconds, name in slowest_imports(module, args.top):
+            print(f"  {milliseconds:8.1f} ms  {name}")
+
+    if not args.skip_warm_up:
+        # Stores are created relative to the working directory, so keep them out of the checkout
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lines = run_python(WARM_UP_SNIPPET, cwd=tmp_dir).stdout.splitlines()
+        print(f"\nresources.warm_up(): {float(lines[0]):.2f} s")
+        print(f"  {lines[1]}")
+
+
+if __name__ == "__main__":
+    main()
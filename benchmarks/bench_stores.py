@@ -0,0 +1,141 @@
+"""
+Micro-benchmarks of the retrieval stores and PDF extraction at growing data sizes
+
+  memory  MemoryStore.search_memory over N synthetic Q&A entries
+  vector  VectorStore.similarity_search and hybrid_search over N documents in a fresh Chroma collection
+  pdf     PDFProcessor page extraction of an N-page generated PDF
+
+Query latencies are reported as p50/p95/p99. Everything is written to a
+temporary directory. The vector store (and --memory-mode semantic/hybrid)
+loads the configured embedding backend.
+
+Usage: python -m benchmarks.bench_stores [--benchmarks memory vector pdf] [--memory-sizes 1000 10000 100000] [--vector-sizes 1000 10000] [--pdf-pages 10 100 400]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+from benchmarks.bench_memory_search import make_entries, make_vocabulary
+from benchmarks.bench_pdf_extract import make_pdf
+from config import Config
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def time_queries(search: Callable[[str], object], queries: List[str]) -> str:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return (f"p50 {percentile(latencies, 0.5):8.3f} ms  p95 {percentile(latencies, 0.95):8.3f} ms  "
+            f"p99 {percentile(latencies, 0.99):8.3f} ms")
+
+
+def bench_memory(sizes: List[int], queries: int, mode: str, rng: random.Random, embed=None) -> None:
+    from stores.memory_backends import JSONLMemoryBackend
+    from stores.memory_store import MemoryStore
+
+    vocabulary = make_vocabulary(20000, rng)
+    print(f"\nMemoryStore.search_memory ({mode})")
+    for size in sizes:
+        entries = make_entries(size, vocabulary, rng)
+        sample = [" ".join(rng.sample(entry["question"].split(), 4)) for entry in rng.choices(entries, k=queries)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backend = JSONLMemoryBackend(os.path.join(tmp_dir, "memory.jsonl"))
+            backend.append_many(entries)
+            store = MemoryStore(
+                file_path=os.path.join(tmp_dir, "missing.json"),
+                backend=backend,
+                embedder=embed if mode != "lexical" else None,
+                search_mode=mode,
+                embeddings_path=os.path.join(tmp_dir, "memory_embeddings.f32")
+            )
+
+            start = time.perf_counter()
+            store.search_memory("warm up", limit=3)
+            store.wait_for_embeddings()
+            load_seconds = time.perf_counter() - start
+            print(f"  {size:>8} entries (load {load_seconds:6.2f} s)  {time_queries(lambda q: store.search_memory(q, limit=3), sample)}")
+
+
+def bench_vector(store, sizes: List[int], queries: int, rng: random.Random) -> None:
+    vocabulary = make_vocabulary(5000, rng)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    print("\nVectorStore.similarity_search / hybrid_search")
+
+    added = 0
+    for size in sorted(sizes):
+        # Grow one collection, so each size reuses the documents already embedded
+        documents = [
+            {"content": " ".join(rng.choices(vocabulary, weights, k=rng.randint(40, 120))), "metadata": {"source": f"doc-{i}"}}
+            for i in range(added, size)
+        ]
+        start = time.perf_counter()
+        for offset in range(0, len(documents), 256):
+            store.add_documents(documents[offset:offset + 256])
+        added = size
+        sample = [" ".join(rng.choices(vocabulary, weights, k=6)) for _ in range(queries)]
+        print(f"  {size:>8} docs (added in {time.perf_counter() - start:6.2f} s)  vector  "
+              f"{time_queries(lambda q: store.similarity_search(q, Config.MAX_RAG_DOCS), sample)}")
+        # The first hybrid query at each size also indexes the documents added since the last one
+        print(f"  {'':>33}  hybrid  {time_queries(lambda q: store.hybrid_search(q, Config.MAX_RAG_DOCS), sample)}")
+
+
+def bench_pdf(page_counts: List[int], repeat: int) -> None:
+    from api.pdf_processor import PDFProcessor
+
+    print(f"\nPDFProcessor page extraction (PDF_EXTRACT_WORKERS={Config.PDF_EXTRACT_WORKERS})")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in page_counts:
+            path = os.path.join(tmp_dir, f"{pages}.pdf")
+            make_pdf(path, pages)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                sum(1 for _ in PDFProcessor.iter_pages(path))
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            print(f"  {pages:>8} pages  best {best * 1000:9.1f} ms  {pages / best:8.0f} pages/s  ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", default=["memory", "vector", "pdf"], choices=["memory", "vector", "pdf"])
+    parser.add_argument("--memory-sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--memory-mode", choices=["lexical", "semantic", "hybrid"], default="lexical")
+    parser.add_argument("--vector-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--pdf-pages", type=int, nargs="+", default=[10, 100, 400])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="PDF extraction runs per size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    needs_model = "vector" in args.benchmarks or ("memory" in args.benchmarks and args.memory_mode != "lexical")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_store = None
+        if needs_model:
+            from stores.vector_store import VectorStore
+            Config.CHROMA_PERSIST_DIR = os.path.join(tmp_dir, "chroma")
+            vector_store = VectorStore(collection_name="bench_stores")
+
+        if "memory" in args.benchmarks:
+            bench_memory(args.memory_sizes, args.queries, args.memory_mode, rng, vector_store.embed if vector_store else None)
+        if "vector" in args.benchmarks:
+            bench_vector(vector_store, args.vector_sizes, args.queries, rng)
+        if "pdf" in args.benchmarks:
+            bench_pdf(args.pdf_pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Local stand-ins for the Brave Search and OpenAI chat completions APIs
+
+Both are served by one threaded HTTP server. Every response waits a configurable
+latency plus uniform jitter, so load tests can run offline with realistic
+upstream timings. Point the app at it with BRAVE_SEARCH_URL and OPENAI_BASE_URL
+(FakeServices.environ() returns both, plus placeholder API keys).
+
+Usage: python -m benchmarks.fake_services [--port 8800] [--brave-ms 150] [--openai-ms 600] [--jitter-ms 50]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+WORDS = (
+    "latency throughput cache index vector search memory model token embedding query "
+    "retrieval database network protocol research document summary answer source"
+).split()
+
+
+class FakeServices:
+    """Fake Brave (GET <any path>?q=...) and OpenAI (POST /v1/chat/completions) on one port"""
+
+    def __init__(
+        self,
+        port: int = 0,
+        brave_ms: float = 150.0,
+        openai_ms: float = 600.0,
+        jitter_ms: float = 50.0,
+        stream_chunks: int = 20,
+        seed: int = 7
+    ):
+        self.brave_ms = brave_ms
+        self.openai_ms = openai_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunks = stream_chunks
+        self.requests: Dict[str, int] = {"brave": 0, "openai": 0}
+        self._failures: List[Tuple[int, Optional[str]]] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def brave_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/res/v1/web/search"
+
+    @property
+    def openai_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def environ(self) -> Dict[str, str]:
+        """Environment variables that point the app at these servers"""
+        return {
+            "BRAVE_SEARCH_URL": self.brave_url,
+            "OPENAI_BASE_URL": self.openai_url,
+            "BRAVE_API_KEY": "fake-brave-key",
+            "OPENAI_API_KEY": "fake-openai-key"
+        }
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeServices":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def fail_next(self, count: int, status: int = 503, retry_after: Optional[str] = None) -> None:
+        """Answer the next count requests with an error status (and Retry-After header), to exercise retries"""
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def _next_failure(self) -> Optional[Tuple[int, Optional[str]]]:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _delay(self, service: str, base_ms: float) -> None:
+        with self._lock:
+            self.requests[service] += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, base_ms + jitter) / 1000)
+
+    @staticmethod
+    def search_results(query: str, count: int) -> Dict:
+        """Deterministic Brave-shaped results: the same query always returns the same pages"""
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+        results = []
+        for i in range(count):
+            words = " ".join(rng.choice(WORDS) for _ in range(30))
+            results.append({
+                "title": f"Result {i + 1} for {query}",
+                "description": f"{query}: {words}",
+                "url": f"https://example.com/{digest[:12]}/{i}",
+                "age": "1 day ago",
+                "profile": {"name": "example"}
+            })
+        return {"web": {"results": results}}
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send_json(self, body: Dict) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_failure(self) -> bool:
+                failure = services._next_failure()
+                if failure is None:
+                    return False
+                status, retry_after = failure
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header("Retry-After", retry_after)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return True
+
+            def do_GET(self) -> None:
+                params = parse_qs(urlsplit(self.path).query)
+                query = params.get("q", [""])[0]
+                count = int(params.get("count", ["5"])[0])
+                services._delay("brave", services.brave_ms)
+                if self._send_failure():
+                    return
+                self._send_json(services.search_results(query, count))
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = " ".join(message.get("content", "") for message in body.get("messages", []))
+                words = [WORDS[i % len(WORDS)] for i in range(min(body.get("max_tokens") or 200, 120))]
+                services._delay("openai", services.openai_ms)
+                if self._send_failure():
+                    return
+
+                if body.get("stream"):
+                    self._stream(words)
+                    return
+
+                self._send_json({
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": " ".join(words)}
+                    }],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(words),
+                        "total_tokens": len(prompt) // 4 + len(words)
+                    }
+                })
+
+            def _stream(self, words) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                per_chunk = max(1, len(words) // services.stream_chunks)
+                for start in range(0, len(words), per_chunk):
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": "fake",
+                        "choices": [{"index": 0, "delta": {"content": " ".join(words[start:start + per_chunk]) + " "}, "finish_reason": None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--brave-ms", type=float, default=150.0)
+    parser.add_argument("--openai-ms", type=float, default=600.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    services = FakeServices(args.port, args.brave_ms, args.openai_ms, args.jitter_ms).start()
+    for name, value in services.environ().items():
+        print(f"export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,76 @@ load_dotenv()
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
+    BRAVE_SEARCH_URL = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
     OPENAI_MODEL = "gpt-4o-mini"
-    EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Hugging Face name, or a local directory for the onnx backends
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence_transformers")  # "sentence_transformers", "onnx" or "onnx_int8"
+    EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")  # e.g. onnx/model_qint8_arm64.onnx on ARM
     CHROMA_PERSIST_DIR = "./chroma_db"
     MAX_SEARCH_RESULTS = 5
-    MAX_RAG_DOCS = 3
\ No newline at end of file
+    MAX_RAG_DOCS = 3
+    RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")  # "vector" (Chroma only) or "hybrid" (Chroma fused with BM25)
+    RAG_CANDIDATES = 20  # documents fetched from each retriever before fusion
+    RAG_RRF_K = 60  # reciprocal rank fusion constant; larger flattens the rank weighting
+    CONTEXT_TOKEN_BUDGET = 2000  # tokens of retrieved context in the answer prompt
+    CONTEXT_MAX_ITEM_TOKENS = 400  # longer snippets are cut to this before packing
+    CONTEXT_MIN_RELEVANCE = 0.2  # candidates scored below this (0-1) are left out
+    CONTEXT_DUPLICATE_OVERLAP = 0.8  # share of a snippet's words already packed that makes it a duplicate
+    WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "routed")  # "routed" (one retrieval branch per question) or "parallel"
+    # Parallel workflow: seconds a branch may take before the answer goes ahead without it
+    WEB_SEARCH_DEADLINE = 5.0
+    MEMORY_LOOKUP_DEADLINE = 2.0
+    RAG_DEADLINE = 2.0
+    DEBUG = os.getenv("DEBUG", "0") == "1"  # Flask debug mode, and per-request timings in /ask responses
+    WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "1") != "0"  # load models in a background thread at startup
+    MEMORY_FILE = "memory_store.json"
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "jsonl")  # "jsonl", "sqlite" or "json"
+    MEMORY_BACKEND_PATHS = {
+        "json": "memory_store.json",
+        "jsonl": "memory_store.jsonl",
+        "sqlite": "memory_store.db"
+    }
+    MEMORY_COMPACT_GROWTH = 2.0  # rewrite the JSONL log once it reaches this multiple of its last compacted size
+    MEMORY_COMPACT_MIN_BYTES = 1024 * 1024
+    MEMORY_SEARCH_MODE = os.getenv("MEMORY_SEARCH_MODE", "hybrid")  # "lexical", "semantic" or "hybrid"
+    MEMORY_EMBEDDINGS_PATH = "memory_embeddings.f32"
+    MEMORY_SEMANTIC_WEIGHT = 0.7  # share of the cosine similarity in hybrid scores
+    MEMORY_MIN_SCORE = 0.3
+    EMBEDDING_CACHE_SIZE = 10000
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")  # e.g. "./embedding_cache.db"; unset keeps it in-process only
+    EMBEDDING_BATCH_SIZE = 64  # texts per coalesced model call
+    EMBEDDING_BATCH_WAIT_MS = 2.0  # how long a request may wait for others to join its batch
+    HTTP_TIMEOUT = 30.0  # seconds
+    HTTP_CONNECT_TIMEOUT = 5.0
+    HTTP_POOL_SIZE = 20
+    HTTP_MAX_PER_HOST = 8
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_BASE = 0.5
+    HTTP_BACKOFF_MAX = 8.0
+    HTTP_RETRY_AFTER_MAX = 30.0
+    SEARCH_CACHE_SIZE = 1000
+    SEARCH_CACHE_TTL = 6 * 60 * 60  # seconds
+    SEARCH_CACHE_NEWS_TTL = 10 * 60  # for "news"/"latest"-style questions
+    SEARCH_CACHE_STALE_FACTOR = 2.0  # serve expired results for ttl * factor while refreshing
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH")  # e.g. "./search_cache.db" to share across workers
+    RESPONSE_CACHE_SIZE = 500
+    RESPONSE_CACHE_TTL = 24 * 60 * 60  # seconds
+    RESPONSE_CACHE_SIMILARITY = 0.95  # cosine threshold for near hits; None for exact hits only
+    PDF_MAX_BYTES = 50 * 1024 * 1024
+    PDF_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    PDF_EMBED_BATCH_SIZE = 32  # chunks embedded and inserted per batch while pages stream in
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", min(4, max(1, (os.cpu_count() or 1) // 2))))  # 1 extracts serially in-process
+    PDF_PARALLEL_MIN_PAGES = 32  # smaller documents are not worth the process pool round trip
+    PDF_CHUNK_TOKENS = 256  # target chunk size for PDF retrieval
+    PDF_CHUNK_OVERLAP_TOKENS = 32  # text shared between consecutive chunks of a section
+    DOCUMENT_CACHE_PATH = os.getenv("DOCUMENT_CACHE_PATH", "document_cache.db")  # ingested PDFs, alongside CHROMA_PERSIST_DIR
+    # Per document type; None disables the TTL (days since added) or the size cap (least recently retrieved go first)
+    RETENTION_POLICIES = {
+        "web_search": {"ttl_days": 14, "max_documents": 20000},
+        "pdf": {"ttl_days": None, "max_documents": None}
+    }
+    RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", 6 * 60 * 60))  # seconds between background compactions; 0 disables
+    PDF_SUMMARY_MODE = os.getenv("PDF_SUMMARY_MODE", "map_reduce")  # "map_reduce" or "preview" (first pages only)
+    PDF_SUMMARY_MAX_CHUNKS = 16  # most question-relevant chunks summarized in map_reduce mode
+    PDF_SUMMARY_CONCURRENCY = 8  # completions in flight per summary
+    PDF_SUMMARY_FAN_IN = 4  # partial summaries combined per reduce call
\ No newline at end of file
@@ -0,0 +1,132 @@
+import re
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+from config import Config
+from utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+class ContextPacker:
+    """Ranks retrieved snippets by relevance and packs the best into a token budget
+
+    Candidates come from web search results, RAG documents and memory entries.
+    Each is tokenized once, cut to max_item_tokens, and given a relevance in
+    [0, 1]:
+    - Search results: their rank, since Brave returns no score.
+    - RAG documents: their Chroma distance, as cosine similarity, or their
+      normalized BM25 lexical_score from hybrid search if higher (exact-term
+      hits can be far in embedding space). fusion_score is rank-based and
+      says nothing about match quality, so it is not used.
+    - Memory entries: their search score.
+    Candidates are then taken greedily, most relevant first. A candidate is
+    skipped if it falls below min_relevance, if its words are mostly covered by
+    a snippet already packed, or if it does not fit in the remaining budget.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = Config.CONTEXT_TOKEN_BUDGET,
+        max_item_tokens: int = Config.CONTEXT_MAX_ITEM_TOKENS,
+        min_relevance: float = Config.CONTEXT_MIN_RELEVANCE,
+        duplicate_overlap: float = Config.CONTEXT_DUPLICATE_OVERLAP,
+        token_counter: Callable[[str], int] = count_tokens
+    ):
+        self.token_budget = token_budget
+        self.max_item_tokens = max_item_tokens
+        self.min_relevance = min_relevance
+        self.duplicate_overlap = duplicate_overlap
+        self.count_tokens = token_counter
+
+    @staticmethod
+    def _search_relevance(rank: int) -> float:
+        return max(0.1, 1.0 - 0.1 * rank)
+
+    @staticmethod
+    def _rag_relevance(doc: Dict[str, Any]) -> float:
+        # Squared L2 between unit vectors is 2 - 2 * cosine
+        try:
+            relevance = min(1.0, max(0.0, 1.0 - float(doc.get("score")) / 2))
+        except (TypeError, ValueError):
+            relevance = 0.5
+        return max(relevance, doc.get("lexical_score", 0.0))
+
+    def _candidate(self, kind: str, item: Dict[str, Any], header: str, content: str, relevance: float) -> Dict[str, Any]:
+        header_tokens = self.count_tokens(header)
+        content_tokens = self.count_tokens(content)
+        limit = max(0, self.max_item_tokens - header_tokens)
+        if content_tokens > limit:
+            # Cut proportionally by characters rather than re-tokenizing
+            content = content[:int(len(content) * limit / content_tokens)].rstrip() + "..."
+            content_tokens = limit
+        return {
+            "kind": kind,
+            "item": item,
+            "content": content,
+            "relevance": round(relevance, 4),
+            "tokens": header_tokens + content_tokens,
+            "words": set(WORD_PATTERN.findall(f"{header} {content}".lower()))
+        }
+
+    def candidates(
+        self,
+        search_results: List[Dict[str, Any]],
+        rag_docs: List[Dict[str, Any]],
+        memory_context: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """All context candidates, most relevant first"""
+        candidates = []
+
+        # Memory hits also appear as search results; they are ranked from memory_context instead
+        web_results = [result for result in search_results if result.get("url") != "memory"]
+        for rank, result in enumerate(web_results):
+            header = f"{result.get('title', 'Unknown')} {result.get('url', result.get('source', 'Unknown'))}"
+            candidates.append(self._candidate("search", result, header, result.get("snippet", ""), self._search_relevance(rank)))
+
+        for doc in rag_docs:
+            candidates.append(self._candidate("rag", doc, str(doc.get("source", "Unknown")), doc.get("content", ""), self._rag_relevance(doc)))
+
+        # Lexical (BM25) scores are unbounded, semantic and hybrid ones are already in [0, 1]
+        top_score = max([mem.get("score", 1.0) for mem in memory_context] + [1.0])
+        for mem in memory_context:
+            relevance = mem.get("score", 1.0) / top_score
+            candidates.append(self._candidate("memory", mem, mem.get("question", ""), mem.get("answer", ""), relevance))
+
+        candidates.sort(key=lambda candidate: candidate["relevance"], reverse=True)
+        return candidates
+
+    def _is_duplicate(self, words: Set[str], packed: List[Set[str]]) -> bool:
+        if not words:
+            return True
+        for other in packed:
+            if len(words & other) / min(len(words), len(other) or 1) >= self.duplicate_overlap:
+                return True
+        return False
+
+    def pack(
+        self,
+        search_results: List[Dict[str, Any]],
+        rag_docs: List[Dict[str, Any]],
+        memory_context: List[Dict[str, Any]],
+        token_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Selected candidates by kind ("search", "rag", "memory"), each most relevant first, plus tokens used"""
+        budget = self.token_budget if token_budget is None else token_budget
+        packed: Dict[str, Any] = {"search": [], "rag": [], "memory": [], "tokens": 0, "dropped": 0}
+        packed_words: List[Set[str]] = []
+
+        for candidate in self.candidates(search_results, rag_docs, memory_context):
+            if (
+                candidate["relevance"] < self.min_relevance
+                or candidate["tokens"] > budget - packed["tokens"]
+                or self._is_duplicate(candidate["words"], packed_words)
+            ):
+                packed["dropped"] += 1
+                continue
+            packed[candidate["kind"]].append(candidate)
+            packed_words.append(candidate["words"])
+            packed["tokens"] += candidate["tokens"]
+
+        logger.info(f"📦 Packed {packed['tokens']} context tokens, dropped {packed['dropped']} candidates")
+        return packed
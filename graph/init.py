@@ -1,4 +1,4 @@
-from .workflow import create_research_assistant
+from .workflow import create_research_assistant, create_async_research_assistant
 from .nodes import *
 
-__all__ = ["create_research_assistant"]
\ No newline at end of file
+__all__ = ["create_research_assistant", "create_async_research_assistant"]
\ No newline at end of file
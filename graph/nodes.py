@@ -1,19 +1,35 @@
 from state import ResearchState, ToolChoice
-from stores.vector_store import VectorStore
-from stores.memory_store import MemoryStore
 from api.brave_search import BraveSearchAPI
-from api.openai_api import OpenAIAPI
+from api.openai_api import OpenAIAPI, OpenAIStreamError
 from api.pdf_processor import PDFProcessor
+from api.single_flight import SingleFlight
+from graph.resources import resources
+import asyncio
+import contextvars
 import logging
+import os
 import re
-from typing import Dict, Any, List
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Callable, Optional, Tuple, Set
+from langchain_core.runnables import RunnableConfig
 from config import Config
 
 logger = logging.getLogger(__name__)
 
-# Initialize global instances
-vector_store = VectorStore()
-memory_store = MemoryStore()
+ANSWER_MAX_TOKENS = 1500
+SUMMARY_MAX_TOKENS = 1000
+PDF_PREVIEW_CHARS = 3000
+
+PDF_KEYWORDS = ["pdf", "document", "summarize", "file"]
+WEB_KEYWORDS = ["search", "web", "current", "news", "recent", "latest"]
+# Web keywords that ask for fresh results, so cached searches expire sooner
+FRESHNESS_KEYWORDS = ["current", "news", "recent", "latest"]
+
+PDF_URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+
+# Concurrent questions about the same PDF share one download, extraction and ingestion
+_pdf_flight = SingleFlight("pdf_ingest")
 
 def receive_question(state: ResearchState) -> Dict[str, Any]:
     """Entry node that processes the user's question"""
@@ -29,9 +45,9 @@ def select_tool(state: ResearchState) -> Dict[str, Any]:
     """Determine which tool to use based on the question"""
     question = state["question"].lower()
     
-    if any(keyword in question for keyword in ["pdf", "document", "summarize", "file"]):
+    if any(keyword in question for keyword in PDF_KEYWORDS):
         tool_choice = ToolChoice.PDF_SUMMARIZE.value
-    elif any(keyword in question for keyword in ["search", "web", "current", "news", "recent", "latest"]):
+    elif any(keyword in question for keyword in WEB_KEYWORDS):
         tool_choice = ToolChoice.WEB_SEARCH.value
     else:
         tool_choice = ToolChoice.MEMORY_LOOKUP.value
@@ -39,18 +55,9 @@ def select_tool(state: ResearchState) -> Dict[str, Any]:
     logger.info(f"🔧 Selected tool: {tool_choice}")
     return {"tool_choice": tool_choice}
 
-def web_search(state: ResearchState) -> Dict[str, Any]:
-    """Perform web search using Brave Search API"""
-    question = state["question"]
-    logger.info(f"🔍 Performing web search for: {question}")
-    
-    search_results = BraveSearchAPI.search(question, Config.MAX_SEARCH_RESULTS)
-    
-    if not search_results:
-        return {"error": "No search results found"}
-    
-    # Add search results to vector store for future RAG
-    documents = [
+def _search_result_documents(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vector store documents for web search results"""
+    return [
         {
             "content": f"{result['title']}\n{result['snippet']}",
             "metadata": {
@@ -61,59 +68,88 @@ def web_search(state: ResearchState) -> Dict[str, Any]:
         }
         for result in search_results
     ]
-    
-    vector_store.add_documents(documents)
-    
-    return {"search_results": search_results}
 
-def pdf_summarize(state: ResearchState) -> Dict[str, Any]:
-    """Summarize PDF documents related to the question"""
+def _search_ttl(question: str) -> float:
+    """Cache lifetime for a question's search results"""
+    question = question.lower()
+    if any(keyword in question for keyword in FRESHNESS_KEYWORDS):
+        return Config.SEARCH_CACHE_NEWS_TTL
+    return Config.SEARCH_CACHE_TTL
+
+def _index_search_results(search_results: List[Dict[str, Any]]) -> None:
+    if resources.vector_store.add_documents(_search_result_documents(search_results)):
+        resources.response_cache.invalidate_sources(result["url"] for result in search_results)
+
+def web_search(state: ResearchState) -> Dict[str, Any]:
+    """Perform web search using Brave Search API"""
     question = state["question"]
-    logger.info(f"📄 Processing PDF for: {question}")
-    
-    # Extract URL from question
-    urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', question)
+    logger.info(f"🔍 Performing web search for: {question}")
     
-    if not urls:
-        return {"error": "No PDF URL found in question"}
+    search_results = resources.search_cache.get_or_fetch(
+        question, Config.MAX_SEARCH_RESULTS, BraveSearchAPI.search, _search_ttl(question)
+    )
     
-    pdf_url = urls[0]
-    text = PDFProcessor.extract_text_from_url(pdf_url)
+    if not search_results:
+        return {"error": "No search results found"}
     
-    if not text:
-        return {"error": "Could not extract text from PDF"}
+    # Add search results to vector store for future RAG
+    _index_search_results(search_results)
     
-    # Chunk the text for better processing
-    chunks = [text[i:i+1000] for i in range(0, len(text), 1000)]
+    return {"search_results": search_results}
+
+def _ingest_pdf(pdf_url: str, file_path: str) -> int:
+    """Extract, chunk and embed a downloaded PDF page by page in batches; returns the chunk count
     
-    # Add to vector store
-    documents = [
-        {
-            "content": chunk,
+    Chunks of an earlier version of the document are deleted afterwards, so
+    retrieval filtered on the URL only sees the current text.
+    """
+    batch: List[Dict[str, Any]] = []
+    contents: List[str] = []
+    total = added = 0
+    
+    for chunk in resources.text_chunker.chunk_pages(PDFProcessor.iter_pages(file_path)):
+        contents.append(chunk["text"])
+        batch.append({
+            "content": chunk["text"],
             "metadata": {
                 "source": pdf_url,
                 "type": "pdf",
-                "chunk_id": i
+                "chunk_id": chunk["chunk_id"],
+                "page_start": chunk["page_start"],
+                "page_end": chunk["page_end"],
+                "heading": chunk["heading"]
             }
-        }
-        for i, chunk in enumerate(chunks)
-    ]
+        })
+        if len(batch) >= Config.PDF_EMBED_BATCH_SIZE:
+            added += resources.vector_store.add_documents(batch)
+            total += len(batch)
+            batch = []
     
-    vector_store.add_documents(documents)
+    if batch:
+        added += resources.vector_store.add_documents(batch)
+        total += len(batch)
     
-    # Generate summary using OpenAI
-    summary_prompt = f"""
+    removed = resources.vector_store.delete_documents({"source": pdf_url}, keep_contents=contents)
+    
+    if added or removed:
+        resources.response_cache.invalidate_sources([pdf_url])
+        resources.summary_cache.invalidate_sources([pdf_url])
+    
+    logger.info(f"Ingested {total} chunks ({added} new, {removed} stale removed) from {pdf_url}")
+    return total
+
+def _pdf_summary_prompt(question: str, text: str) -> str:
+    return f"""
     Summarize the following PDF content in relation to the question: "{question}"
     
     PDF Content:
-    {text[:3000]}...
+    {text[:PDF_PREVIEW_CHARS]}...
     
     Please provide a concise summary highlighting the key points relevant to the question.
     """
-    
-    summary = OpenAIAPI.generate_response(summary_prompt)
-    
-    search_results = [
+
+def _pdf_search_results(question: str, pdf_url: str, summary: str) -> List[Dict[str, Any]]:
+    return [
         {
             "title": f"PDF Summary: {question}",
             "snippet": summary,
@@ -121,16 +157,125 @@ def pdf_summarize(state: ResearchState) -> Dict[str, Any]:
             "source": "PDF Document"
         }
     ]
+
+def _cached_pdf(pdf_url: str) -> Optional[Dict[str, Any]]:
+    """Cache record for an ingested PDF whose chunks are still in the vector store"""
+    cached = resources.document_cache.get(pdf_url)
+    if cached and not resources.vector_store.has_documents({"source": pdf_url}):
+        logger.info(f"Chunks for {pdf_url} are missing from the vector store, ingesting again")
+        return None
+    return cached
+
+def _unchanged_preview(pdf_url: str, cached: Optional[Dict[str, Any]], download: Dict[str, Any]) -> Optional[str]:
+    """Stored preview when the download shows the ingested copy is current, else None"""
+    if cached is None:
+        return None
+    if not download["not_modified"] and download["content_hash"] != cached["content_hash"]:
+        return None
+    
+    if download["path"]:
+        os.remove(download["path"])
+    resources.document_cache.touch(pdf_url, download["etag"], download["last_modified"])
+    logger.info(f"{pdf_url} is unchanged, reusing {cached['chunk_count']} stored chunks")
+    return cached["preview"]
+
+def _excerpt_label(metadata: Dict[str, Any]) -> str:
+    start, end = metadata.get("page_start"), metadata.get("page_end")
+    label = f"page {start}" if start == end else f"pages {start}-{end}"
+    return f"{label}, {metadata['heading']}" if metadata.get("heading") else label
+
+def _pdf_excerpts(question: str, pdf_url: str) -> List[str]:
+    """The question's most relevant stored chunks of a PDF, labelled and in document order"""
+    docs = resources.vector_store.search(question, Config.PDF_SUMMARY_MAX_CHUNKS, where={"source": pdf_url})
+    docs.sort(key=lambda doc: doc["metadata"].get("chunk_id", 0))
+    return [f"[{_excerpt_label(doc['metadata'])}]\n{doc['content']}" for doc in docs]
+
+def _summary_request(question: str, pdf_url: str, preview: str) -> Tuple[str, List[str]]:
+    """Response cache key and the excerpts to map-reduce; no excerpts means a single preview prompt"""
+    if Config.PDF_SUMMARY_MODE == "map_reduce":
+        excerpts = _pdf_excerpts(question, pdf_url)
+        if excerpts:
+            return "\n\n".join(["map_reduce", question] + excerpts), excerpts
+    return _pdf_summary_prompt(question, preview), []
+
+def _summarize_pdf(question: str, pdf_url: str, preview: str) -> str:
+    prompt, excerpts = _summary_request(question, pdf_url, preview)
+    summary = resources.summary_cache.lookup(prompt, SUMMARY_MAX_TOKENS, question, [pdf_url], kind="summary")
+    if summary is None:
+        if excerpts:
+            summary = resources.summarizer.summarize(question, excerpts)
+        else:
+            summary = OpenAIAPI.generate_response(prompt, max_tokens=SUMMARY_MAX_TOKENS)
+        if not summary.startswith("Error"):
+            resources.summary_cache.store(prompt, SUMMARY_MAX_TOKENS, question, [pdf_url], summary, kind="summary")
+    return summary
+
+def _prepare_pdf(pdf_url: str, on_preview: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Download the PDF unless the ingested copy is current, and ingest it; returns its preview, or None on failure
     
-    return {"search_results": search_results}
+    on_preview is called with the preview of a changed document as soon as it
+    is read, before ingestion.
+    """
+    try:
+        cached = _cached_pdf(pdf_url)
+        download = PDFProcessor.fetch_pdf(
+            pdf_url,
+            etag=cached["etag"] if cached else None,
+            last_modified=cached["last_modified"] if cached else None
+        )
+    except Exception as e:
+        logger.error(f"Error downloading PDF: {e}")
+        return None
+    
+    preview = _unchanged_preview(pdf_url, cached, download)
+    if preview is not None:
+        return preview
+    
+    file_path = download["path"]
+    try:
+        preview = PDFProcessor.read_preview(file_path, PDF_PREVIEW_CHARS)
+        if not preview:
+            return None
+        if on_preview:
+            on_preview(preview)
+        
+        # Stream the pages into the vector store
+        chunk_count = _ingest_pdf(pdf_url, file_path)
+        resources.document_cache.record(
+            pdf_url, download["etag"], download["last_modified"], download["content_hash"], chunk_count, preview
+        )
+        return preview
+    except Exception as e:
+        logger.error(f"Error processing PDF: {e}")
+        return None
+    finally:
+        os.remove(file_path)
 
-def memory_lookup(state: ResearchState) -> Dict[str, Any]:
-    """Look up previous conversations from memory"""
+def pdf_summarize(state: ResearchState) -> Dict[str, Any]:
+    """Summarize PDF documents related to the question"""
     question = state["question"]
-    logger.info(f"🧠 Looking up memory for: {question}")
+    logger.info(f"📄 Processing PDF for: {question}")
+    
+    # Extract URL from question
+    urls = PDF_URL_PATTERN.findall(question)
+    
+    if not urls:
+        return {"error": "No PDF URL found in question"}
+    
+    pdf_url = urls[0]
     
-    relevant_memory = memory_store.search_memory(question, limit=3)
+    preview = _pdf_flight.do(pdf_url, lambda: _prepare_pdf(pdf_url))
+    if not preview:
+        return {"error": "Could not extract text from PDF"}
+    
+    # Generate summary using OpenAI
+    summary = _summarize_pdf(question, pdf_url, preview)
+    if summary.startswith("Error"):
+        return {"error": summary}
     
+    return {"search_results": _pdf_search_results(question, pdf_url, summary)}
+
+def _memory_results(relevant_memory: List[Dict[str, Any]]) -> Dict[str, Any]:
     search_results = [
         {
             "title": f"Previous Q&A: {mem['question']}",
@@ -144,53 +289,78 @@ def memory_lookup(state: ResearchState) -> Dict[str, Any]:
     
     return {"search_results": search_results, "memory_context": relevant_memory}
 
+def _scored_memory(question: str, limit: int = 3) -> List[Dict[str, Any]]:
+    """Relevant memory entries, copied with their search score for context packing"""
+    return [
+        {**entry, "score": score}
+        for score, entry in resources.memory_store.search_memory_scored(question, limit)
+    ]
+
+def memory_lookup(state: ResearchState) -> Dict[str, Any]:
+    """Look up previous conversations from memory"""
+    question = state["question"]
+    logger.info(f"🧠 Looking up memory for: {question}")
+    
+    relevant_memory = _scored_memory(question)
+    
+    return _memory_results(relevant_memory)
+
+def _rag_filter(state: ResearchState) -> Optional[Dict[str, Any]]:
+    """Metadata filter for RAG: PDF questions are answered from that PDF's chunks only"""
+    if state.get("tool_choice") == ToolChoice.PDF_SUMMARIZE.value:
+        urls = PDF_URL_PATTERN.findall(state["question"])
+        if urls:
+            return {"source": urls[0]}
+    return None
+
 def rag_context(state: ResearchState) -> Dict[str, Any]:
     """Retrieve relevant documents using RAG"""
     question = state["question"]
     logger.info(f"📚 Retrieving RAG context for: {question}")
     
-    rag_docs = vector_store.similarity_search(question, Config.MAX_RAG_DOCS)
+    rag_docs = resources.vector_store.search(question, Config.MAX_RAG_DOCS, _rag_filter(state))
     
     return {"rag_docs": rag_docs}
 
-def generate_answer(state: ResearchState) -> Dict[str, Any]:
-    """Generate the final answer using OpenAI"""
+def _answer_prompt(state: ResearchState) -> str:
+    """Assemble the answer prompt from the most relevant search results, RAG documents and memory"""
     question = state["question"]
-    search_results = state.get("search_results", [])
-    rag_docs = state.get("rag_docs", [])
-    memory_context = state.get("memory_context", [])
+    packed = resources.context_packer.pack(
+        state.get("search_results", []),
+        state.get("rag_docs", []),
+        state.get("memory_context", [])
+    )
     
-    logger.info(f"🤖 Generating answer for: {question}")
-    
-    # Build comprehensive context
+    # Build context from what fits the token budget, most relevant first in each section
     context_parts = []
     
     # Add search results
-    if search_results:
+    if packed["search"]:
         context_parts.append("## Search Results:")
-        for i, result in enumerate(search_results[:3], 1):
+        for i, candidate in enumerate(packed["search"], 1):
+            result = candidate["item"]
             context_parts.append(f"{i}. **{result.get('title', 'Unknown')}**")
             context_parts.append(f"   Source: {result.get('url', result.get('source', 'Unknown'))}")
-            context_parts.append(f"   Content: {result.get('snippet', '')}")
+            context_parts.append(f"   Content: {candidate['content']}")
     
     # Add RAG documents
-    if rag_docs:
+    if packed["rag"]:
         context_parts.append("\n## Related Documents:")
-        for i, doc in enumerate(rag_docs, 1):
-            context_parts.append(f"{i}. Source: {doc.get('source', 'Unknown')}")
-            context_parts.append(f"   Content: {doc.get('content', '')[:200]}...")
+        for i, candidate in enumerate(packed["rag"], 1):
+            context_parts.append(f"{i}. Source: {candidate['item'].get('source', 'Unknown')}")
+            context_parts.append(f"   Content: {candidate['content']}")
     
     # Add memory context
-    if memory_context:
+    if packed["memory"]:
         context_parts.append("\n## Previous Conversations:")
-        for i, mem in enumerate(memory_context, 1):
-            context_parts.append(f"{i}. Q: {mem['question']}")
-            context_parts.append(f"   A: {mem['answer'][:100]}...")
+        for i, candidate in enumerate(packed["memory"], 1):
+            context_parts.append(f"{i}. Q: {candidate['item']['question']}")
+            context_parts.append(f"   A: {candidate['content']}")
     
     context = "\n".join(context_parts)
     
     # Create comprehensive prompt
-    prompt = f"""
+    return f"""
     You are a research assistant. Answer the following question using the provided context.
     
     Question: {question}
@@ -206,16 +376,56 @@ def generate_answer(state: ResearchState) -> Dict[str, Any]:
     
     Answer:
     """
-    
-    answer = OpenAIAPI.generate_response(prompt, max_tokens=1500)
-    
-    # Extract citations
+
+def _context_sources(state: ResearchState) -> List[str]:
+    """Sources behind the prompt context, used to invalidate cached answers"""
+    sources = [result.get("url", result.get("source", "")) for result in state.get("search_results", [])]
+    sources += [doc.get("source", "") for doc in state.get("rag_docs", [])]
+    return sources
+
+def _extract_citations(search_results: List[Dict[str, Any]]) -> List[str]:
     citations = []
     for result in search_results:
         if 'url' in result and result['url'] not in citations:
             citations.append(result['url'])
+    return citations
+
+def _token_callback(config: Optional[RunnableConfig]) -> Optional[Callable[[str], None]]:
+    """Streaming callback passed by the caller as configurable["on_token"]"""
+    return ((config or {}).get("configurable") or {}).get("on_token")
+
+def generate_answer(state: ResearchState, config: RunnableConfig = None) -> Dict[str, Any]:
+    """Generate the final answer using OpenAI, streaming tokens when a callback is configured"""
+    question = state["question"]
+    logger.info(f"🤖 Generating answer for: {question}")
+    
+    prompt = _answer_prompt(state)
+    sources = _context_sources(state)
+    on_token = _token_callback(config)
     
-    return {"answer": answer, "citations": citations}
+    answer = resources.response_cache.lookup(prompt, ANSWER_MAX_TOKENS, question, sources)
+    if answer is not None:
+        logger.info(f"♻️ Serving cached answer for: {question}")
+        if on_token:
+            on_token(answer)
+    else:
+        if on_token:
+            chunks = []
+            try:
+                for chunk in OpenAIAPI.stream_response(prompt, max_tokens=ANSWER_MAX_TOKENS):
+                    chunks.append(chunk)
+                    on_token(chunk)
+                answer = "".join(chunks)
+            except OpenAIStreamError as e:
+                # The partial answer was already streamed; the state records the failure instead
+                answer = str(e)
+        else:
+            answer = OpenAIAPI.generate_response(prompt, max_tokens=ANSWER_MAX_TOKENS)
+        
+        if not answer.startswith("Error"):
+            resources.response_cache.store(prompt, ANSWER_MAX_TOKENS, question, sources, answer)
+    
+    return {"answer": answer, "citations": _extract_citations(state.get("search_results", []))}
 
 def update_memory(state: ResearchState) -> Dict[str, Any]:
     """Store the Q&A pair in memory for future reference"""
@@ -223,9 +433,14 @@ def update_memory(state: ResearchState) -> Dict[str, Any]:
     answer = state["answer"]
     citations = state.get("citations", [])
     
+    # Failed generations would otherwise be recalled as answers to later questions
+    if answer.startswith("Error"):
+        logger.info("Skipping memory update for failed answer")
+        return {}
+    
     logger.info(f"💾 Updating memory with Q&A")
     
-    memory_store.add_entry(question, answer, citations)
+    resources.memory_store.add_entry(question, answer, citations)
     
     return {}
 
@@ -236,4 +451,350 @@ def should_continue_to_rag(state: ResearchState) -> str:
     if tool_choice == ToolChoice.MEMORY_LOOKUP.value:
         return "generate_answer"
     else:
-        return "rag_context"
\ No newline at end of file
+        return "rag_context"
+
+# Async variants: network calls are awaited, embedding and store work runs in worker threads
+
+async def aweb_search(state: ResearchState) -> Dict[str, Any]:
+    """Async web search using Brave Search API"""
+    question = state["question"]
+    logger.info(f"🔍 Performing web search for: {question}")
+    
+    search_results = await resources.search_cache.aget_or_fetch(
+        question, Config.MAX_SEARCH_RESULTS, BraveSearchAPI.async_search, _search_ttl(question)
+    )
+    
+    if not search_results:
+        return {"error": "No search results found"}
+    
+    await asyncio.to_thread(_index_search_results, search_results)
+    
+    return {"search_results": search_results}
+
+async def _asummarize_pdf(question: str, pdf_url: str, preview: str) -> str:
+    prompt, excerpts = await asyncio.to_thread(_summary_request, question, pdf_url, preview)
+    summary = await asyncio.to_thread(
+        resources.summary_cache.lookup, prompt, SUMMARY_MAX_TOKENS, question, [pdf_url], "summary"
+    )
+    if summary is None:
+        if excerpts:
+            summary = await resources.summarizer.asummarize(question, excerpts)
+        else:
+            summary = await OpenAIAPI.async_generate_response(prompt, max_tokens=SUMMARY_MAX_TOKENS)
+        if not summary.startswith("Error"):
+            await asyncio.to_thread(
+                resources.summary_cache.store, prompt, SUMMARY_MAX_TOKENS, question, [pdf_url], summary, "summary"
+            )
+    return summary
+
+async def _aprepare_pdf(pdf_url: str, on_preview: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Async variant of _prepare_pdf: the download is awaited, reading and ingestion run in worker threads"""
+    try:
+        cached = await asyncio.to_thread(_cached_pdf, pdf_url)
+        download = await PDFProcessor.async_fetch_pdf(
+            pdf_url,
+            etag=cached["etag"] if cached else None,
+            last_modified=cached["last_modified"] if cached else None
+        )
+    except Exception as e:
+        logger.error(f"Error downloading PDF: {e}")
+        return None
+    
+    preview = await asyncio.to_thread(_unchanged_preview, pdf_url, cached, download)
+    if preview is not None:
+        return preview
+    
+    file_path = download["path"]
+    try:
+        preview = await asyncio.to_thread(PDFProcessor.read_preview, file_path, PDF_PREVIEW_CHARS)
+        if not preview:
+            return None
+        if on_preview:
+            on_preview(preview)
+        
+        chunk_count = await asyncio.to_thread(_ingest_pdf, pdf_url, file_path)
+        await asyncio.to_thread(
+            resources.document_cache.record,
+            pdf_url, download["etag"], download["last_modified"], download["content_hash"], chunk_count, preview
+        )
+        return preview
+    except Exception as e:
+        logger.error(f"Error processing PDF: {e}")
+        return None
+    finally:
+        os.remove(file_path)
+
+async def apdf_summarize(state: ResearchState) -> Dict[str, Any]:
+    """Async PDF download, ingestion and summary"""
+    question = state["question"]
+    logger.info(f"📄 Processing PDF for: {question}")
+    
+    urls = PDF_URL_PATTERN.findall(question)
+    
+    if not urls:
+        return {"error": "No PDF URL found in question"}
+    
+    pdf_url = urls[0]
+    summary_task: Optional["asyncio.Task"] = None
+    
+    def start_summary(preview: str) -> None:
+        # A preview summary does not depend on ingestion, so overlap them; map_reduce
+        # selects excerpts from the stored chunks and has to wait
+        nonlocal summary_task
+        if Config.PDF_SUMMARY_MODE != "map_reduce":
+            summary_task = asyncio.ensure_future(_asummarize_pdf(question, pdf_url, preview))
+    
+    # Only the caller that leads the flight starts its summary early; the others wait for ingestion
+    preview = await _pdf_flight.ado(pdf_url, lambda: _aprepare_pdf(pdf_url, start_summary))
+    if not preview:
+        if summary_task is not None:
+            summary_task.cancel()
+        return {"error": "Could not extract text from PDF"}
+    
+    if summary_task is not None:
+        summary = await summary_task
+    else:
+        summary = await _asummarize_pdf(question, pdf_url, preview)
+    if summary.startswith("Error"):
+        return {"error": summary}
+    
+    return {"search_results": _pdf_search_results(question, pdf_url, summary)}
+
+async def amemory_lookup(state: ResearchState) -> Dict[str, Any]:
+    """Async memory lookup"""
+    question = state["question"]
+    logger.info(f"🧠 Looking up memory for: {question}")
+    
+    relevant_memory = await asyncio.to_thread(_scored_memory, question)
+    
+    return _memory_results(relevant_memory)
+
+async def arag_context(state: ResearchState) -> Dict[str, Any]:
+    """Async RAG retrieval"""
+    question = state["question"]
+    logger.info(f"📚 Retrieving RAG context for: {question}")
+    
+    rag_docs = await asyncio.to_thread(resources.vector_store.search, question, Config.MAX_RAG_DOCS, _rag_filter(state))
+    
+    return {"rag_docs": rag_docs}
+
+async def agenerate_answer(state: ResearchState, config: RunnableConfig = None) -> Dict[str, Any]:
+    """Async answer generation, streaming tokens when a callback is configured"""
+    question = state["question"]
+    logger.info(f"🤖 Generating answer for: {question}")
+    
+    prompt = _answer_prompt(state)
+    sources = _context_sources(state)
+    on_token = _token_callback(config)
+    
+    answer = await asyncio.to_thread(resources.response_cache.lookup, prompt, ANSWER_MAX_TOKENS, question, sources)
+    if answer is not None:
+        logger.info(f"♻️ Serving cached answer for: {question}")
+        if on_token:
+            on_token(answer)
+    else:
+        if on_token:
+            chunks = []
+            try:
+                async for chunk in OpenAIAPI.async_stream_response(prompt, max_tokens=ANSWER_MAX_TOKENS):
+                    chunks.append(chunk)
+                    on_token(chunk)
+                answer = "".join(chunks)
+            except OpenAIStreamError as e:
+                answer = str(e)
+        else:
+            answer = await OpenAIAPI.async_generate_response(prompt, max_tokens=ANSWER_MAX_TOKENS)
+        
+        if not answer.startswith("Error"):
+            await asyncio.to_thread(resources.response_cache.store, prompt, ANSWER_MAX_TOKENS, question, sources, answer)
+    
+    return {"answer": answer, "citations": _extract_citations(state.get("search_results", []))}
+
+async def aupdate_memory(state: ResearchState) -> Dict[str, Any]:
+    """Async memory update"""
+    if state["answer"].startswith("Error"):
+        logger.info("Skipping memory update for failed answer")
+        return {}
+    
+    logger.info(f"💾 Updating memory with Q&A")
+    
+    await asyncio.to_thread(
+        resources.memory_store.add_entry, state["question"], state["answer"], state.get("citations", [])
+    )
+    
+    return {}
+
+# Parallel retrieval: web search, memory and the vector store are queried at once and
+# joined, each branch bounded by its own deadline
+
+# Branch work runs here so a branch can stop waiting at its deadline while the call finishes
+# in the background (and still fills the caches for the next question)
+_branch_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="retrieval-branch")
+_background_tasks: Set["asyncio.Task"] = set()
+
+def fan_out_retrieval(state: ResearchState) -> List[str]:
+    """Conditional edge: PDF questions keep their own path, everything else queries sources in parallel"""
+    tool_choice = state["tool_choice"]
+    
+    if tool_choice == ToolChoice.PDF_SUMMARIZE.value:
+        return ["pdf_summarize"]
+    branches = ["parallel_memory_lookup", "parallel_rag_context"]
+    # Questions about earlier conversations do not need the web
+    if tool_choice == ToolChoice.WEB_SEARCH.value:
+        branches.insert(0, "parallel_web_search")
+    return branches
+
+def _with_deadline(source: str, work: Callable[[], Any], deadline: float, default: Any) -> Tuple[Any, List[str]]:
+    """Result of work() and [], or default and [source] if it failed or missed its deadline"""
+    start = time.perf_counter()
+    # Carry the request trace into the worker thread, so the branch's spans are timed with the request
+    future = _branch_executor.submit(contextvars.copy_context().run, work)
+    try:
+        result = future.result(timeout=deadline)
+        logger.info(f"⏱️ {source} finished in {time.perf_counter() - start:.2f}s")
+        return result, []
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ {source} missed its {deadline:g}s deadline, answering without it")
+    except Exception as e:
+        logger.error(f"Error in {source} branch: {e}")
+    return default, [source]
+
+async def _awith_deadline(source: str, work: Any, deadline: float, default: Any) -> Tuple[Any, List[str]]:
+    """Async variant of _with_deadline; work is an awaitable and keeps running past the deadline"""
+    start = time.perf_counter()
+    task = asyncio.ensure_future(work)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    try:
+        result = await asyncio.wait_for(asyncio.shield(task), deadline)
+        logger.info(f"⏱️ {source} finished in {time.perf_counter() - start:.2f}s")
+        return result, []
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ {source} missed its {deadline:g}s deadline, answering without it")
+    except Exception as e:
+        logger.error(f"Error in {source} branch: {e}")
+    return default, [source]
+
+def _index_in_background(search_results: List[Dict[str, Any]]) -> None:
+    """Index web results for later questions without holding up this one"""
+    def index() -> None:
+        try:
+            _index_search_results(search_results)
+        except Exception as e:
+            logger.error(f"Error indexing search results: {e}")
+    
+    _branch_executor.submit(contextvars.copy_context().run, index)
+
+def parallel_web_search(state: ResearchState) -> Dict[str, Any]:
+    """Web search branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"🔍 Performing web search for: {question}")
+    
+    search_results, degraded = _with_deadline(
+        "web_search",
+        lambda: resources.search_cache.get_or_fetch(
+            question, Config.MAX_SEARCH_RESULTS, BraveSearchAPI.search, _search_ttl(question)
+        ),
+        Config.WEB_SEARCH_DEADLINE,
+        []
+    )
+    if search_results:
+        _index_in_background(search_results)
+    
+    return {"web_results": search_results, "degraded_sources": degraded}
+
+def parallel_memory_lookup(state: ResearchState) -> Dict[str, Any]:
+    """Memory branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"🧠 Looking up memory for: {question}")
+    
+    relevant_memory, degraded = _with_deadline(
+        "memory_lookup",
+        lambda: _scored_memory(question),
+        Config.MEMORY_LOOKUP_DEADLINE,
+        []
+    )
+    
+    return {"memory_context": relevant_memory, "degraded_sources": degraded}
+
+def parallel_rag_context(state: ResearchState) -> Dict[str, Any]:
+    """Vector store branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"📚 Retrieving RAG context for: {question}")
+    
+    rag_docs, degraded = _with_deadline(
+        "rag_context",
+        lambda: resources.vector_store.search(question, Config.MAX_RAG_DOCS),
+        Config.RAG_DEADLINE,
+        []
+    )
+    
+    return {"rag_docs": rag_docs, "degraded_sources": degraded}
+
+async def aparallel_web_search(state: ResearchState) -> Dict[str, Any]:
+    """Async web search branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"🔍 Performing web search for: {question}")
+    
+    search_results, degraded = await _awith_deadline(
+        "web_search",
+        resources.search_cache.aget_or_fetch(
+            question, Config.MAX_SEARCH_RESULTS, BraveSearchAPI.async_search, _search_ttl(question)
+        ),
+        Config.WEB_SEARCH_DEADLINE,
+        []
+    )
+    if search_results:
+        _index_in_background(search_results)
+    
+    return {"web_results": search_results, "degraded_sources": degraded}
+
+async def aparallel_memory_lookup(state: ResearchState) -> Dict[str, Any]:
+    """Async memory branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"🧠 Looking up memory for: {question}")
+    
+    relevant_memory, degraded = await _awith_deadline(
+        "memory_lookup",
+        asyncio.to_thread(_scored_memory, question),
+        Config.MEMORY_LOOKUP_DEADLINE,
+        []
+    )
+    
+    return {"memory_context": relevant_memory, "degraded_sources": degraded}
+
+async def aparallel_rag_context(state: ResearchState) -> Dict[str, Any]:
+    """Async vector store branch of the parallel workflow"""
+    question = state["question"]
+    logger.info(f"📚 Retrieving RAG context for: {question}")
+    
+    rag_docs, degraded = await _awith_deadline(
+        "rag_context",
+        asyncio.to_thread(resources.vector_store.search, question, Config.MAX_RAG_DOCS),
+        Config.RAG_DEADLINE,
+        []
+    )
+    
+    return {"rag_docs": rag_docs, "degraded_sources": degraded}
+
+def join_retrieval(state: ResearchState) -> Dict[str, Any]:
+    """Merge the branch results into the search results the answer prompt uses"""
+    web_results = state.get("web_results") or []
+    memory_results = _memory_results(state.get("memory_context") or [])
+    degraded = state.get("degraded_sources") or []
+    if degraded:
+        logger.warning(f"⚠️ Answering without: {', '.join(degraded)}")
+    
+    search_results = web_results + memory_results["search_results"]
+    # Memory questions with nothing relevant are still answered, as in the routed workflow
+    web_requested = state.get("tool_choice") == ToolChoice.WEB_SEARCH.value
+    if web_requested and not search_results and not state.get("rag_docs"):
+        return {"search_results": [], "error": "No search results found"}
+    
+    return {"search_results": search_results}
+
+def should_generate_answer(state: ResearchState) -> str:
+    """Conditional edge after join_retrieval: stop before the LLM call when retrieval failed"""
+    if state.get("error"):
+        return "end"
+    return "generate_answer"
\ No newline at end of file
@@ -0,0 +1,225 @@
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from config import Config
+from metrics import registry
+from api.http_client import http_metrics
+from api.single_flight import single_flight_stats
+
+logger = logging.getLogger(__name__)
+
+RETENTION_REMOVED = registry.counter(
+    "research_retention_removed_total", "Vector store documents removed by retention, by type and reason", ["type", "reason"]
+)
+
+# What warm_up() loads; once requests have built all of them lazily, the process is just as ready
+WARM_UP_RESOURCES = ("vector_store", "memory_store", "response_cache", "summary_cache", "search_cache", "document_cache")
+
+class Resources:
+    """Shared services used by the graph nodes, each built on first use
+
+    Importing the graph loads no models and opens no databases. The embedding
+    model, Chroma and the memory file are loaded by the first node that needs
+    them, or ahead of time by start_warm_up().
+    """
+
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._ready = threading.Event()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._warm_up_error: Optional[str] = None
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._compaction_stop = threading.Event()
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        # One lock per resource, so a slow model load does not hold up cheap resources
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = factory()
+                self._load_seconds[name] = round(time.perf_counter() - start, 3)
+                self._instances[name] = instance
+                logger.info(f"Initialized {name} in {self._load_seconds[name]:.2f}s")
+        return instance
+
+    def _embed(self, texts: List[str]):
+        return self.vector_store.embed(texts)
+
+    @property
+    def vector_store(self):
+        def build():
+            from stores.vector_store import VectorStore
+            return VectorStore()
+        return self._get("vector_store", build)
+
+    @property
+    def memory_store(self):
+        def build():
+            from stores.memory_store import MemoryStore
+            return MemoryStore(embedder=self._embed)
+        return self._get("memory_store", build)
+
+    @property
+    def search_cache(self):
+        def build():
+            from api.search_cache import SearchCache
+            return SearchCache(
+                max_entries=Config.SEARCH_CACHE_SIZE,
+                stale_factor=Config.SEARCH_CACHE_STALE_FACTOR,
+                db_path=Config.SEARCH_CACHE_PATH
+            )
+        return self._get("search_cache", build)
+
+    @property
+    def response_cache(self):
+        def build():
+            from api.response_cache import ResponseCache
+            return ResponseCache(
+                Config.OPENAI_MODEL,
+                max_entries=Config.RESPONSE_CACHE_SIZE,
+                ttl=Config.RESPONSE_CACHE_TTL,
+                similarity_threshold=Config.RESPONSE_CACHE_SIMILARITY,
+                embedder=self._embed
+            )
+        return self._get("response_cache", build)
+
+    @property
+    def summary_cache(self):
+        def build():
+            from api.response_cache import ResponseCache
+            # Exact hits only: a summary must never stand in for an answer, or for another question's summary
+            return ResponseCache(
+                Config.OPENAI_MODEL,
+                max_entries=Config.RESPONSE_CACHE_SIZE,
+                ttl=Config.RESPONSE_CACHE_TTL
+            )
+        return self._get("summary_cache", build)
+
+    @property
+    def document_cache(self):
+        def build():
+            from stores.document_cache import DocumentCache
+            return DocumentCache(Config.DOCUMENT_CACHE_PATH)
+        return self._get("document_cache", build)
+
+    @property
+    def text_chunker(self):
+        def build():
+            from stores.text_chunker import TextChunker
+            return TextChunker()
+        return self._get("text_chunker", build)
+
+    @property
+    def context_packer(self):
+        def build():
+            from graph.context_packer import ContextPacker
+            return ContextPacker()
+        return self._get("context_packer", build)
+
+    @property
+    def summarizer(self):
+        def build():
+            from api.summarizer import MapReduceSummarizer
+            return MapReduceSummarizer()
+        return self._get("summarizer", build)
+
+    @property
+    def ready(self) -> bool:
+        """True after warm_up(), or once requests have loaded every resource it would have"""
+        if not self._ready.is_set() and all(name in self._instances for name in WARM_UP_RESOURCES):
+            self._ready.set()
+        return self._ready.is_set()
+
+    def warm_up(self) -> None:
+        """Load the embedding model, Chroma and memory, and run one encode so the first request is fast"""
+        try:
+            self.vector_store.embedding_backend.encode(["warm up"])
+            self.memory_store.memory
+            self.response_cache
+            self.summary_cache
+            self.search_cache
+            self.document_cache
+            self._ready.set()
+            logger.info(f"Resources ready: {self._load_seconds}")
+        except Exception as e:
+            self._warm_up_error = str(e)
+            logger.error(f"Error warming up resources: {e}", exc_info=True)
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up on a background thread once; returns that thread"""
+        with self._locks_guard:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self.warm_up, name="resource-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def compact(self) -> Dict[str, Dict[str, Any]]:
+        """Apply Config.RETENTION_POLICIES to the vector store; returns enforce_retention's report
+
+        PDFs that lose chunks are dropped from the document cache, so the next
+        request for them re-ingests the document instead of trusting a stale entry.
+        """
+        report = self.vector_store.enforce_retention(Config.RETENTION_POLICIES)
+        for doc_type, stats in report.items():
+            RETENTION_REMOVED.inc(doc_type, "expired", amount=stats["expired"])
+            RETENTION_REMOVED.inc(doc_type, "evicted", amount=stats["evicted"])
+        for source in report.get("pdf", {}).get("removed_sources", []):
+            self.document_cache.remove(source)
+        return report
+
+    def _compaction_loop(self, interval: float) -> None:
+        while not self._compaction_stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Error compacting vector store: {e}", exc_info=True)
+
+    def start_compaction(self, interval: float = Config.RETENTION_INTERVAL) -> threading.Thread:
+        """Run compact every interval seconds on a background thread, once per process; returns that thread"""
+        with self._locks_guard:
+            if self._compaction_thread is None:
+                self._compaction_thread = threading.Thread(
+                    target=self._compaction_loop, args=(interval,), name="vector-store-compaction", daemon=True
+                )
+                self._compaction_thread.start()
+            return self._compaction_thread
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """stats() of the caches built so far; never builds one just to report it"""
+        stats = {}
+        for name in ("search_cache", "response_cache", "summary_cache", "document_cache"):
+            if name in self._instances:
+                stats[name] = self._instances[name].stats()
+        vector_store = self._instances.get("vector_store")
+        if vector_store is not None:
+            stats["embedding_cache"] = vector_store.embedding_cache.stats()
+            stats["embedding_batcher"] = vector_store.embedding_batcher.stats()
+        return stats
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness, per-resource load times in seconds and any warm-up error"""
+        warming_up = self._warm_up_thread is not None and self._warm_up_thread.is_alive()
+        return {
+            "ready": self.ready,
+            "warming_up": warming_up,
+            "loaded": dict(self._load_seconds),
+            "error": self._warm_up_error
+        }
+
+# Shared by the graph nodes and the servers
+resources = Resources()
+
+registry.add_collector("research_cache", "Cache counters and sizes", ("cache", "field"), resources.cache_stats)
+registry.add_collector("research_single_flight", "Coalesced call counters", ("call", "field"), single_flight_stats)
+registry.add_collector("research_http", "HTTP client counters and latency in ms", ("host", "field"), http_metrics.snapshot)
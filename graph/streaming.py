@@ -0,0 +1,115 @@
+import json
+import queue
+import asyncio
+import threading
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Event names emitted while a question is processed
+NODE_EVENT = "node"
+TOKEN_EVENT = "token"
+RESULT_EVENT = "result"
+ERROR_EVENT = "error"
+
+Event = Tuple[str, Dict[str, Any]]
+
+_DONE = object()
+
+def final_error(final_state: Dict[str, Any]) -> Optional[str]:
+    """Failure recorded in a final state: an error set by a node, or a failed generation"""
+    if final_state.get("error"):
+        return final_state["error"]
+    answer = final_state.get("answer") or ""
+    if answer.startswith("Error"):
+        return answer
+    return None
+
+def _final_event(final_state: Dict[str, Any]) -> Event:
+    error = final_error(final_state)
+    if error:
+        return ERROR_EVENT, {"error": error}
+    return RESULT_EVENT, final_state
+
+def stream_research_events(research_assistant, question: str) -> Iterator[Event]:
+    """Run the graph in a worker thread, yielding node progress, answer tokens and the final state
+
+    The stream ends with exactly one RESULT_EVENT or ERROR_EVENT. Failed runs
+    end with ERROR_EVENT, whether the graph raised, a node set "error", or
+    generation produced an "Error ..." answer.
+    """
+    events: "queue.Queue" = queue.Queue()
+
+    def on_token(text: str) -> None:
+        events.put((TOKEN_EVENT, {"text": text}))
+
+    def run() -> None:
+        final_state: Dict[str, Any] = {}
+        try:
+            for mode, chunk in research_assistant.stream(
+                {"question": question},
+                config={"configurable": {"on_token": on_token}},
+                stream_mode=["updates", "values"]
+            ):
+                if mode == "updates":
+                    for node in chunk:
+                        events.put((NODE_EVENT, {"node": node}))
+                else:
+                    final_state = chunk
+            events.put(_final_event(final_state))
+        except Exception as e:
+            logger.error(f"Error streaming question: {e}", exc_info=True)
+            events.put((ERROR_EVENT, {"error": str(e)}))
+        finally:
+            events.put(_DONE)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    while True:
+        event = events.get()
+        if event is _DONE:
+            return
+        yield event
+
+async def astream_research_events(research_assistant, question: str) -> AsyncIterator[Event]:
+    """Async variant of stream_research_events for the async graph"""
+    events: "asyncio.Queue" = asyncio.Queue()
+
+    def on_token(text: str) -> None:
+        events.put_nowait((TOKEN_EVENT, {"text": text}))
+
+    async def run() -> None:
+        final_state: Dict[str, Any] = {}
+        try:
+            async for mode, chunk in research_assistant.astream(
+                {"question": question},
+                config={"configurable": {"on_token": on_token}},
+                stream_mode=["updates", "values"]
+            ):
+                if mode == "updates":
+                    for node in chunk:
+                        events.put_nowait((NODE_EVENT, {"node": node}))
+                else:
+                    final_state = chunk
+            events.put_nowait(_final_event(final_state))
+        except Exception as e:
+            logger.error(f"Error streaming question: {e}", exc_info=True)
+            events.put_nowait((ERROR_EVENT, {"error": str(e)}))
+        finally:
+            events.put_nowait(_DONE)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            event = await events.get()
+            if event is _DONE:
+                return
+            yield event
+    finally:
+        if not task.done():
+            task.cancel()
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Serialize an event in Server-Sent Events wire format"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
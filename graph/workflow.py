@@ -1,22 +1,84 @@
+from typing import Optional
 from langgraph.graph import StateGraph, END
 from .nodes import *
 from state import ResearchState
+from config import Config
+from metrics import traced
 
-def create_research_assistant():
-    """Create and configure the research assistant graph"""
+WORKFLOW_MODES = ("routed", "parallel")
+
+def create_research_assistant(mode: Optional[str] = None):
+    """Create and configure the research assistant graph
+
+    mode "routed" sends each question down one retrieval branch, "parallel"
+    queries web search, memory and the vector store at once. Defaults to
+    Config.WORKFLOW_MODE.
+    """
+    if _workflow_mode(mode) == "parallel":
+        return _build_parallel_graph({
+            "receive_question": receive_question,
+            "select_tool": select_tool,
+            "parallel_web_search": parallel_web_search,
+            "parallel_memory_lookup": parallel_memory_lookup,
+            "parallel_rag_context": parallel_rag_context,
+            "join_retrieval": join_retrieval,
+            "pdf_summarize": pdf_summarize,
+            "rag_context": rag_context,
+            "generate_answer": generate_answer,
+            "update_memory": update_memory
+        })
+    return _build_graph({
+        "receive_question": receive_question,
+        "select_tool": select_tool,
+        "web_search": web_search,
+        "pdf_summarize": pdf_summarize,
+        "memory_lookup": memory_lookup,
+        "rag_context": rag_context,
+        "generate_answer": generate_answer,
+        "update_memory": update_memory
+    })
+
+def create_async_research_assistant(mode: Optional[str] = None):
+    """Create the research assistant graph with async nodes, to be run with ainvoke"""
+    if _workflow_mode(mode) == "parallel":
+        return _build_parallel_graph({
+            "receive_question": receive_question,
+            "select_tool": select_tool,
+            "parallel_web_search": aparallel_web_search,
+            "parallel_memory_lookup": aparallel_memory_lookup,
+            "parallel_rag_context": aparallel_rag_context,
+            "join_retrieval": join_retrieval,
+            "pdf_summarize": apdf_summarize,
+            "rag_context": arag_context,
+            "generate_answer": agenerate_answer,
+            "update_memory": aupdate_memory
+        })
+    return _build_graph({
+        "receive_question": receive_question,
+        "select_tool": select_tool,
+        "web_search": aweb_search,
+        "pdf_summarize": apdf_summarize,
+        "memory_lookup": amemory_lookup,
+        "rag_context": arag_context,
+        "generate_answer": agenerate_answer,
+        "update_memory": aupdate_memory
+    })
+
+def _workflow_mode(mode: Optional[str]) -> str:
+    mode = mode or Config.WORKFLOW_MODE
+    if mode not in WORKFLOW_MODES:
+        raise ValueError(f"Unknown workflow mode: {mode} (expected one of {', '.join(WORKFLOW_MODES)})")
+    return mode
+
+def _build_graph(nodes):
+    """Wire the given node implementations into the research assistant graph"""
     
     # Create the StateGraph
     graph = StateGraph(ResearchState)
     
-    # Add nodes
-    graph.add_node("receive_question", receive_question)
-    graph.add_node("select_tool", select_tool)
-    graph.add_node("web_search", web_search)
-    graph.add_node("pdf_summarize", pdf_summarize)
-    graph.add_node("memory_lookup", memory_lookup)
-    graph.add_node("rag_context", rag_context)
-    graph.add_node("generate_answer", generate_answer)
-    graph.add_node("update_memory", update_memory)
+    # Add nodes, each timed as a node.<name> span
+    for name, node in nodes.items():
+        graph.add_node(name, traced(f"node.{name}")(node))
     
     # Add edges
     graph.add_edge("receive_question", "select_tool")
@@ -72,4 +134,42 @@ def create_research_assistant():
     # Set entry point
     graph.set_entry_point("receive_question")
     
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
+
+def _build_parallel_graph(nodes):
+    """Wire the parallel workflow: retrieval branches fan out from select_tool and meet at join_retrieval"""
+    
+    graph = StateGraph(ResearchState)
+    
+    for name, node in nodes.items():
+        graph.add_node(name, traced(f"node.{name}")(node))
+    
+    graph.add_edge("receive_question", "select_tool")
+    
+    # Fan out: every returned branch runs in the same step
+    graph.add_conditional_edges(
+        "select_tool",
+        fan_out_retrieval,
+        ["parallel_web_search", "parallel_memory_lookup", "parallel_rag_context", "pdf_summarize"]
+    )
+    
+    # Join: runs once, in the step after all started branches have returned
+    graph.add_edge("parallel_web_search", "join_retrieval")
+    graph.add_edge("parallel_memory_lookup", "join_retrieval")
+    graph.add_edge("parallel_rag_context", "join_retrieval")
+    graph.add_conditional_edges(
+        "join_retrieval",
+        should_generate_answer,
+        {"generate_answer": "generate_answer", "end": END}
+    )
+    
+    # PDFs are ingested before retrieval, so they keep the sequential path
+    graph.add_edge("pdf_summarize", "rag_context")
+    graph.add_edge("rag_context", "generate_answer")
+    
+    graph.add_edge("generate_answer", "update_memory")
+    graph.add_edge("update_memory", END)
+    
+    graph.set_entry_point("receive_question")
+    
+    return graph.compile()
@@ -1,18 +1,87 @@
 """
 Research Assistant - CLI and Web Server
-Supports both interactive CLI mode and web server mode
+Supports interactive CLI mode, a Flask web server and an async ASGI server
 """
 
+import os
 import logging
 import sys
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from graph.workflow import create_research_assistant
+from graph.workflow import create_research_assistant, create_async_research_assistant
+from graph.resources import resources
+from api.single_flight import SingleFlight
+from graph.streaming import (
+    stream_research_events, astream_research_events, format_sse,
+    NODE_EVENT, TOKEN_EVENT, RESULT_EVENT, ERROR_EVENT
+)
 from config import Config
+from metrics import registry, request_trace, span, timing_breakdown
 from utils import configure_logging
 
 logger = configure_logging()
 
+# Identical questions asked while one is being answered share that graph run
+ask_flight = SingleFlight("ask")
+
+def question_key(question):
+    """Whitespace-insensitive key for coalescing /ask requests"""
+    return " ".join(question.split())
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def build_response(result, question, timings=None):
+    """Shape a final graph state into the /ask response body"""
+    body = {
+        'answer': result.get('answer', 'No answer provided'),
+        'citations': result.get('citations', []),
+        'timestamp': result.get('timestamp'),
+        'question': question
+    }
+    if Config.DEBUG and timings is not None:
+        body['timings'] = timings
+    return body
+
+def run_traced(run):
+    """Run the graph for one /ask request; returns the final state and its per-span timings"""
+    with request_trace() as trace:
+        with span("request.ask"):
+            result = run()
+    return result, timing_breakdown(trace)
+
+async def arun_traced(run):
+    """Async variant of run_traced"""
+    with request_trace() as trace:
+        with span("request.ask"):
+            result = await run()
+    return result, timing_breakdown(trace)
+
+def sse_event(event, data, question):
+    """Translate a graph streaming event into an SSE frame"""
+    if event == RESULT_EVENT:
+        return format_sse("done", build_response(data, question))
+    return format_sse(event, data)
+
+def get_stream_question(payload):
+    """Question from a JSON body or ?question= (EventSource can only GET)"""
+    question = (payload or {}).get('question') or request.args.get('question', '')
+    return str(question).strip()
+
+def start_warm_up():
+    """Load models in the background so the first request does not pay for it"""
+    if Config.WARM_UP_ON_START:
+        resources.start_warm_up()
+
+def start_compaction():
+    """Expire and evict old vector store documents in the background"""
+    if Config.RETENTION_INTERVAL > 0:
+        resources.start_compaction(Config.RETENTION_INTERVAL)
+
+def readiness():
+    """/ready body and status code: 200 once models and stores are loaded, 503 until then"""
+    status = resources.status()
+    return {'status': 'ready' if status['ready'] else 'loading', **status}, 200 if status['ready'] else 503
+
 def create_web_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
@@ -24,6 +93,15 @@ def create_web_app():
     def health_check():
         return jsonify({'status': 'healthy'})
     
+    @app.route('/ready', methods=['GET'])
+    def ready_check():
+        body, status_code = readiness()
+        return jsonify(body), status_code
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), content_type=METRICS_CONTENT_TYPE)
+    
     @app.route('/ask', methods=['POST'])
     def ask_question():
         try:
@@ -36,24 +114,110 @@ def create_web_app():
                 return jsonify({'error': 'Question cannot be empty'}), 400
             
             logger.info(f"Processing question: {question}")
-            result = research_assistant.invoke({"question": question})
+            result, timings = ask_flight.do(
+                question_key(question), lambda: run_traced(lambda: research_assistant.invoke({"question": question}))
+            )
             
             if result.get("error"):
                 return jsonify({'error': result['error']}), 500
             
-            response = {
-                'answer': result.get('answer', 'No answer provided'),
-                'citations': result.get('citations', []),
-                'timestamp': result.get('timestamp'),
-                'question': question
-            }
-            
-            return jsonify(response)
+            return jsonify(build_response(result, question, timings))
             
         except Exception as e:
             logger.error(f"Error processing question: {e}", exc_info=True)
             return jsonify({'error': f'Internal server error: {str(e)}'}), 500
     
+    @app.route('/ask/stream', methods=['GET', 'POST'])
+    def ask_question_stream():
+        question = get_stream_question(request.get_json(silent=True))
+        if not question:
+            return jsonify({'error': 'No question provided'}), 400
+        
+        logger.info(f"Streaming question: {question}")
+        
+        def generate():
+            for event, data in stream_research_events(research_assistant, question):
+                yield sse_event(event, data, question)
+        
+        return Response(
+            generate(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    return app
+
+def create_asgi_app():
+    """Create the FastAPI application, serving the async graph"""
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    
+    app = FastAPI(title="Research Assistant")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=['http://localhost:3000', 'http://127.0.0.1:3000'],
+        allow_methods=["*"],
+        allow_headers=["*"]
+    )
+    
+    research_assistant = create_async_research_assistant()
+    
+    @app.get('/health')
+    async def health_check():
+        return {'status': 'healthy'}
+    
+    @app.get('/ready')
+    async def ready_check():
+        body, status_code = readiness()
+        return JSONResponse(body, status_code=status_code)
+    
+    @app.get('/metrics')
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+    
+    @app.post('/ask')
+    async def ask_question(payload: dict):
+        try:
+            if 'question' not in payload:
+                return JSONResponse({'error': 'No question provided'}, status_code=400)
+            
+            question = str(payload['question']).strip()
+            if not question:
+                return JSONResponse({'error': 'Question cannot be empty'}, status_code=400)
+            
+            logger.info(f"Processing question: {question}")
+            result, timings = await ask_flight.ado(
+                question_key(question), lambda: arun_traced(lambda: research_assistant.ainvoke({"question": question}))
+            )
+            
+            if result.get("error"):
+                return JSONResponse({'error': result['error']}, status_code=500)
+            
+            return build_response(result, question, timings)
+            
+        except Exception as e:
+            logger.error(f"Error processing question: {e}", exc_info=True)
+            return JSONResponse({'error': f'Internal server error: {str(e)}'}, status_code=500)
+    
+    @app.post('/ask/stream')
+    async def ask_question_stream(payload: dict):
+        question = str(payload.get('question') or '').strip()
+        if not question:
+            return JSONResponse({'error': 'No question provided'}, status_code=400)
+        
+        logger.info(f"Streaming question: {question}")
+        
+        async def generate():
+            async for event, data in astream_research_events(research_assistant, question):
+                yield sse_event(event, data, question)
+        
+        return StreamingResponse(
+            generate(),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
     return app
 
 def run_web_server():
@@ -65,12 +229,35 @@ def run_web_server():
     port = getattr(Config, 'PORT', 5000)
     debug = getattr(Config, 'DEBUG', False)
     
+    # With debug the reloader re-runs this in a child process; only the child serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
+        start_compaction()
+    
     print(f"🚀 Server running on: http://{host}:{port}")
-    print(f"📡 Endpoints: POST /ask, GET /health")
+    print(f"📡 Endpoints: POST /ask, GET|POST /ask/stream, GET /health, GET /ready, GET /metrics")
     print(f"🎯 Ready for React frontend!")
     
     app.run(host=host, port=port, debug=debug, threaded=True)
 
+def run_asgi_server():
+    """Run the async ASGI server with uvicorn"""
+    import uvicorn
+    
+    print("🌐 Starting Research Assistant ASGI Server...")
+    app = create_asgi_app()
+    
+    host = getattr(Config, 'HOST', '0.0.0.0')
+    port = getattr(Config, 'PORT', 5000)
+    
+    start_warm_up()
+    start_compaction()
+    
+    print(f"🚀 Server running on: http://{host}:{port}")
+    print(f"📡 Endpoints: POST /ask, POST /ask/stream, GET /health, GET /ready, GET /metrics")
+    
+    uvicorn.run(app, host=host, port=port)
+
 def run_cli():
     """Run the interactive CLI"""
     print("🤖 Research Assistant CLI Mode")
@@ -81,6 +268,9 @@ def run_cli():
     print("  - Summarize this PDF: https://example.com/document.pdf")
     
     app = create_research_assistant()
+    # Models load while the user types the first question
+    start_warm_up()
+    start_compaction()
     
     while True:
         try:
@@ -94,13 +284,29 @@ def run_cli():
                 continue
             
             print(f"\n🔄 Processing your question...")
-            result = app.invoke({"question": question})
+            result = {}
+            answer_started = False
+            
+            for event, data in stream_research_events(app, question):
+                if event == NODE_EVENT and not answer_started:
+                    print(f"   ✔ {data['node']}")
+                elif event == TOKEN_EVENT:
+                    if not answer_started:
+                        print(f"\n✅ Answer:")
+                        answer_started = True
+                    print(data["text"], end="", flush=True)
+                elif event in (RESULT_EVENT, ERROR_EVENT):
+                    result = data
+            
+            if answer_started:
+                print()
             
             if result.get("error"):
                 print(f"❌ Error: {result['error']}")
             else:
-                print(f"\n✅ Answer:")
-                print(result["answer"])
+                if not answer_started:
+                    print(f"\n✅ Answer:")
+                    print(result.get("answer", ""))
                 
                 if result.get("citations"):
                     print(f"\n📚 Citations:")
@@ -136,12 +342,15 @@ def main():
         if mode in ['web', 'server', 'api']:
             run_web_server()
             return
+        elif mode in ['asgi', 'async']:
+            run_asgi_server()
+            return
         elif mode in ['cli', 'interactive', 'chat']:
             run_cli()
             return
         else:
             print(f"❌ Unknown mode: {mode}")
-            print("Usage: python main.py [web|cli]")
+            print("Usage: python main.py [web|asgi|cli]")
             exit(1)
     
     # Default: Ask user for mode
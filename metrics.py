@@ -0,0 +1,188 @@
+import time
+import asyncio
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; covers cache hits (ms) up to slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, +Inf count, sum)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, value_sum) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = _format_labels(self.label_names, labels, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                inf = _format_labels(self.label_names, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {total}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {value_sum:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {total}")
+        return lines
+
+class MetricsRegistry:
+    """Metrics owned by this process plus collectors that export existing stats() counters"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Tuple[str, str, Tuple[str, str], Callable[[], Dict[str, Dict[str, Any]]]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help_text, label_names, buckets))
+
+    def add_collector(self, name: str, help_text: str, label_names: Tuple[str, str], collect: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+        """Export collect()'s {component: {field: number}} as name{<component label>, <field label>}"""
+        with self._lock:
+            self._collectors.append((name, help_text, label_names, collect))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, help_text, label_names, collect in collectors:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge"])
+            for component, fields in sorted(collect().items()):
+                for field, value in sorted(fields.items()):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f"{name}{_format_labels(label_names, (component, field))} {value:g}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+SPAN_SECONDS = registry.histogram(
+    "research_span_seconds", "Duration of graph nodes and external calls", ["span"]
+)
+SPAN_ERRORS = registry.counter(
+    "research_span_errors_total", "Spans that ended with an exception", ["span"]
+)
+LLM_TOKENS = registry.counter(
+    "research_llm_tokens_total", "OpenAI tokens by call and type (prompt or completion)", ["call", "type"]
+)
+
+# Spans of the request being handled; a list shared by every context copied from it
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("trace", default=None)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into research_span_seconds and the current request trace, if any"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(name)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        SPAN_SECONDS.observe(seconds, name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append({"span": name, "ms": round(seconds * 1000, 2)})
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorator form of span for sync and async functions; keeps the wrapped signature"""
+    def decorate(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def record_tokens(call: str, prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.inc(call, "prompt", amount=prompt_tokens)
+    LLM_TOKENS.inc(call, "completion", amount=completion_tokens)
+
+@contextmanager
+def request_trace() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the spans of one request (including graph nodes run in worker threads or tasks)"""
+    trace: List[Dict[str, Any]] = []
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+def timing_breakdown(trace: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Total ms per span name, with call counts, in the order spans finished"""
+    totals: Dict[str, Dict[str, Any]] = {}
+    for entry in list(trace):
+        totals.setdefault(entry["span"], {"ms": 0.0, "calls": 0})
+        totals[entry["span"]]["ms"] = round(totals[entry["span"]]["ms"] + entry["ms"], 2)
+        totals[entry["span"]]["calls"] += 1
+    return totals
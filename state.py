@@ -1,5 +1,6 @@
+import operator
 from enum import Enum
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
 class ResearchState(TypedDict):
     question: str
@@ -10,6 +11,9 @@ class ResearchState(TypedDict):
     citations: List[str]
     memory_context: List[Dict[str, Any]]
     error: Optional[str]
+    # Parallel workflow: web results before the join, and branches that missed their deadline
+    web_results: List[Dict[str, Any]]
+    degraded_sources: Annotated[List[str], operator.add]
 
 class ToolChoice(Enum):
     WEB_SEARCH = "web_search"
@@ -0,0 +1,115 @@
+import re
+import math
+import heapq
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Function words that match nearly every entry and only add posting-list work
+STOPWORDS = frozenset("""
+a an and are as at be but by can did do does for from had has have how i if in into is it its
+me my of on or our so than that the their them then there these they this to was we were what
+when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str, drop_stopwords: bool = True) -> List[str]:
+    """Lowercase text and split it into word tokens, stripping punctuation"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if drop_stopwords:
+        return [token for token in tokens if token not in STOPWORDS]
+    return tokens
+
+
+class BM25Index:
+    """Incrementally maintained inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.doc_lengths: Dict[Hashable, int] = {}
+        self.doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Tokenize and index a document, replacing any previous version"""
+        self.add_tokens(doc_id, tokenize(text))
+
+    def add_tokens(self, doc_id: Hashable, tokens: List[str]) -> None:
+        """Index an already tokenized document"""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        self.doc_lengths[doc_id] = len(tokens)
+        self.doc_terms[doc_id] = tuple(counts)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Drop a document from the index"""
+        if doc_id not in self.doc_lengths:
+            return
+
+        for term in self.doc_terms.pop(doc_id):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency with the usual +1 smoothing"""
+        df = len(self.postings.get(term, ()))
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def max_score(self, query_tokens: Iterable[str]) -> float:
+        """Upper bound of scores() for a query: every term's idf times the tf saturation limit (k1 + 1)"""
+        return sum(self.idf(term) for term in set(query_tokens)) * (self.k1 + 1)
+
+    def scores(self, query_tokens: Iterable[str]) -> Dict[Hashable, float]:
+        """Accumulate BM25 scores for every document sharing a query term"""
+        if not self.doc_lengths:
+            return {}
+
+        avg_length = self.total_length / len(self.doc_lengths) or 1.0
+        k1, b = self.k1, self.b
+        doc_lengths = self.doc_lengths
+        scores: Dict[Hashable, float] = {}
+
+        for term in set(query_tokens):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in posting.items():
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        return scores
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        predicate: Optional[Callable[[Hashable], bool]] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """Return the top-k (doc_id, score) pairs for a free-text query"""
+        scores = self.scores(tokenize(query))
+        items = scores.items()
+        if predicate is not None:
+            items = [(doc_id, score) for doc_id, score in items if predicate(doc_id)]
+        return heapq.nlargest(k, items, key=lambda item: item[1])
@@ -0,0 +1,92 @@
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class DocumentCache:
+    """SQLite record of ingested documents: HTTP validators, content hash, chunk count and preview"""
+
+    COLUMNS = ("url", "etag", "last_modified", "content_hash", "chunk_count", "preview", "ingested_at", "checked_at")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                preview TEXT NOT NULL,
+                ingested_at REAL NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM documents WHERE url = ?", (url,)
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading document cache: {e}")
+            return None
+        return dict(zip(self.COLUMNS, row)) if row else None
+
+    def record(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: str,
+        chunk_count: int,
+        preview: str
+    ) -> None:
+        """Remember a freshly ingested document"""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO documents ({', '.join(self.COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, content_hash, chunk_count, preview, now, now)
+                )
+                self.misses += 1
+        except Exception as e:
+            logger.error(f"Error writing document cache: {e}")
+
+    def touch(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Mark an unchanged document as revalidated, keeping validators the server did not resend"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    """
+                    UPDATE documents
+                    SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), checked_at = ?
+                    WHERE url = ?
+                    """,
+                    (etag, last_modified, time.time(), url)
+                )
+                self.hits += 1
+        except Exception as e:
+            logger.error(f"Error writing document cache: {e}")
+
+    def remove(self, url: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE url = ?", (url,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
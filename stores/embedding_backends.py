@@ -0,0 +1,136 @@
+import os
+import logging
+import numpy as np
+from typing import List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_model_id(kind: Optional[str] = None, model_name: Optional[str] = None) -> str:
+    """Name that identifies the vectors a backend produces, for cache keys and stored indexes
+
+    The default backend keeps the bare model name so existing caches stay valid.
+    """
+    kind = kind or Config.EMBEDDING_BACKEND
+    model_name = model_name or Config.EMBEDDING_MODEL
+    return model_name if kind == "sentence_transformers" else f"{model_name}:{kind}"
+
+
+class EmbeddingBackend:
+    """Base class for sentence embedding implementations"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Return one L2-normalized float32 row per text"""
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Full-precision PyTorch model through sentence-transformers"""
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts), dtype=np.float32)
+
+
+class ONNXEmbeddingBackend(EmbeddingBackend):
+    """ONNX Runtime on CPU with mean pooling, without loading PyTorch
+
+    `model_name` is either a Hugging Face repo (bare names resolve under
+    sentence-transformers/) or a local directory with tokenizer.json and the
+    ONNX file.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        file_name: str = "onnx/model.onnx",
+        max_tokens: int = 256,
+        batch_size: int = 32,
+        threads: int = 0
+    ):
+        super().__init__(model_name)
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(self._resolve("tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_tokens)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            self._resolve(file_name), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _resolve(self, file_name: str) -> str:
+        if os.path.isdir(self.model_name):
+            return os.path.join(self.model_name, file_name)
+        from huggingface_hub import hf_hub_download
+        repo_id = self.model_name if "/" in self.model_name else f"sentence-transformers/{self.model_name}"
+        return hf_hub_download(repo_id, file_name)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        }
+        token_embeddings = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        # Mean over real tokens, then normalize, matching the sentence-transformers pipeline
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Batch texts of similar length together to minimize padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        result: Optional[np.ndarray] = None
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            vectors = self._encode_batch([texts[i] for i in indices])
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[indices] = vectors
+        return result
+
+
+class QuantizedONNXEmbeddingBackend(ONNXEmbeddingBackend):
+    """ONNX Runtime with dynamically int8-quantized weights"""
+
+    def __init__(self, model_name: str, file_name: Optional[str] = None, **kwargs):
+        super().__init__(model_name, file_name or Config.EMBEDDING_ONNX_INT8_FILE, **kwargs)
+
+
+BACKENDS = {
+    "sentence_transformers": SentenceTransformerBackend,
+    "onnx": ONNXEmbeddingBackend,
+    "onnx_int8": QuantizedONNXEmbeddingBackend,
+}
+
+
+def create_embedding_backend(kind: Optional[str] = None, model_name: Optional[str] = None) -> EmbeddingBackend:
+    """Instantiate the embedding backend registered under the given name"""
+    kind = kind or Config.EMBEDDING_BACKEND
+    try:
+        backend_cls = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown embedding backend: {kind} (expected one of {', '.join(BACKENDS)})")
+    logger.info(f"Loading {kind} embedding backend for {model_name or Config.EMBEDDING_MODEL}")
+    return backend_cls(model_name or Config.EMBEDDING_MODEL)
@@ -0,0 +1,135 @@
+import time
+import queue
+import asyncio
+import threading
+import logging
+import numpy as np
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatcher:
+    """Coalesces encode requests from many threads into micro-batches on one worker thread
+
+    The worker takes the first waiting request, then keeps collecting requests
+    until max_batch_size texts are queued or max_wait_ms has passed, and runs the
+    model once for all of them. The wait only applies while the previous batch
+    coalesced several requests, so a lone client is never delayed.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._last_batch_requests = 0
+
+    def submit(self, texts: List[str]) -> "Future[np.ndarray]":
+        """Queue texts for the next micro-batch; the future resolves to their embeddings"""
+        future: "Future[np.ndarray]" = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0), dtype=np.float32))
+            return future
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+            self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking encode through the shared batch queue"""
+        return self.submit(texts).result()
+
+    async def aencode(self, texts: List[str]) -> np.ndarray:
+        """Await embeddings without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Gather requests until the batch is full or the wait budget is spent; also report shutdown"""
+        batch = [first]
+        size = len(first[0])
+        # Idle traffic: take whatever is already queued and go
+        deadline = time.monotonic() + (self.max_wait if self._last_batch_requests > 1 else 0)
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            size += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            self._last_batch_requests = len(batch)
+            self._encode_batch(batch)
+            if stop:
+                return
+
+    def _encode_batch(self, batch: List[Tuple[List[str], Future]]) -> None:
+        # Requests whose caller already gave up are skipped
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(texts)} texts: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(vectors[offset:offset + len(request_texts)].copy())
+            offset += len(request_texts)
+
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += len(texts)
+
+    def close(self) -> None:
+        """Finish queued requests and stop the worker"""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+        if worker is not None:
+            worker.join()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "texts": self.texts,
+                "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0
+            }
@@ -0,0 +1,125 @@
+import sqlite3
+import hashlib
+import threading
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache: in-process LRU plus an optional SQLite tier"""
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        model_name: str,
+        max_entries: int = 10000,
+        disk_path: Optional[str] = None
+    ):
+        self.encode_fn = encode_fn
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if disk_path:
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    def key(self, text: str) -> str:
+        """Hash of the model name and text, so caches never mix models"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, running the model only for texts not seen before"""
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+
+        pending = {key: text for key, text in zip(keys, texts) if key not in found}
+
+        from_disk = {}
+        if pending and self._conn is not None:
+            from_disk = self._load_from_disk(list(pending))
+            for key, vector in from_disk.items():
+                found[key] = vector
+                del pending[key]
+
+        if pending:
+            vectors = np.asarray(self.encode_fn(list(pending.values())), dtype=np.float32)
+            # Copy each row so the cache does not keep the whole batch array alive
+            computed = {key: vector.copy() for key, vector in zip(pending, vectors)}
+            found.update(computed)
+            self._save_to_disk(computed)
+
+        with self._lock:
+            self.disk_hits += len(from_disk)
+            for key in keys:
+                if key in pending:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            for key, vector in found.items():
+                vector.setflags(write=False)
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def _load_from_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        try:
+            rows = []
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                with self._lock:
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall())
+            return {key: np.frombuffer(blob, dtype=np.float32).copy() for key, blob in rows}
+        except Exception as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            return {}
+
+    def _save_to_disk(self, vectors: Dict[str, np.ndarray]) -> None:
+        if self._conn is None or not vectors:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in vectors.items()]
+                )
+        except Exception as e:
+            logger.error(f"Error writing embedding cache: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters (hits include disk_hits) and current LRU size"""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._entries)
+        }
@@ -0,0 +1,86 @@
+"""
+Vector store maintenance commands
+
+Usage: python -m stores.maintenance dedup
+       python -m stores.maintenance compact [--vacuum]
+"""
+
+import os
+import sqlite3
+import argparse
+from config import Config
+from stores.document_cache import DocumentCache
+from stores.vector_store import VectorStore
+from utils import configure_logging
+
+logger = configure_logging()
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of all files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def run_dedup(vector_store: VectorStore) -> None:
+    """Re-key every document by content hash and delete duplicate copies"""
+    before = vector_store.collection.count()
+    stats = vector_store.deduplicate()
+    after = vector_store.collection.count()
+    print(f"🧹 Scanned {stats['scanned']} documents in '{vector_store.collection_name}'")
+    print(f"   Re-keyed: {stats['rekeyed']}  Removed duplicates: {stats['removed']}")
+    print(f"   Documents: {before} -> {after}")
+    print(f"   Store size on disk: {directory_size(Config.CHROMA_PERSIST_DIR) / 1e6:.1f} MB")
+
+
+def run_compact(vector_store: VectorStore, vacuum: bool = False) -> None:
+    """Apply the retention policies, then optionally VACUUM Chroma's SQLite file"""
+    size_before = directory_size(Config.CHROMA_PERSIST_DIR)
+    before = vector_store.collection.count()
+    report = vector_store.enforce_retention(Config.RETENTION_POLICIES)
+
+    pdf_sources = report.get("pdf", {}).get("removed_sources", [])
+    if pdf_sources:
+        document_cache = DocumentCache(Config.DOCUMENT_CACHE_PATH)
+        for source in pdf_sources:
+            document_cache.remove(source)
+
+    # Deleted rows only give their pages back to the filesystem after a VACUUM
+    if vacuum:
+        connection = sqlite3.connect(os.path.join(Config.CHROMA_PERSIST_DIR, "chroma.sqlite3"))
+        try:
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+    size_after = directory_size(Config.CHROMA_PERSIST_DIR)
+    print(f"🗜️  Applied retention to '{vector_store.collection_name}'")
+    for doc_type, stats in report.items():
+        print(f"   {doc_type}: scanned {stats['scanned']}  expired {stats['expired']}  "
+              f"evicted {stats['evicted']}  backfilled {stats['backfilled']}")
+    print(f"   Documents: {before} -> {vector_store.collection.count()}")
+    print(f"   Store size on disk: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB "
+          f"(reclaimed {(size_before - size_after) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store maintenance")
+    parser.add_argument("--collection", default="research_docs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("dedup", help="Deduplicate documents by content hash")
+    compact_parser = subparsers.add_parser("compact", help="Expire and evict documents per Config.RETENTION_POLICIES")
+    compact_parser.add_argument("--vacuum", action="store_true", help="VACUUM the Chroma database to shrink it on disk")
+    args = parser.parse_args()
+
+    vector_store = VectorStore(args.collection)
+    if args.command == "dedup":
+        run_dedup(vector_store)
+    elif args.command == "compact":
+        run_compact(vector_store, args.vacuum)
+
+
+if __name__ == "__main__":
+    main()
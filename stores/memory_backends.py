@@ -0,0 +1,252 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Any, Iterable
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Base class for memory storage engines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Return True if the backing storage has been created"""
+        return os.path.exists(self.path)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load all stored entries in insertion order"""
+        raise NotImplementedError
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Persist a single new entry"""
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Persist several new entries"""
+        raise NotImplementedError
+
+    def compact(self, entries: List[Dict[str, Any]]) -> None:
+        """Rewrite the storage so it contains exactly the given entries"""
+        raise NotImplementedError
+
+    def create(self, entries: List[Dict[str, Any]]) -> None:
+        """Create the storage from the given entries in one step, so a crash never leaves a partial import"""
+        # compact writes a temporary file and os.replace()s it into place
+        self.compact(entries)
+
+    def needs_compaction(self) -> bool:
+        """Return True once the storage has grown enough to be worth rewriting"""
+        return False
+
+
+class JSONMemoryBackend(MemoryBackend):
+    """Legacy single JSON document, rewritten on every append"""
+
+    def __init__(self, path: str = "memory_store.json"):
+        super().__init__(path)
+        self._entries: List[Dict[str, Any]] = []
+
+    def load(self) -> List[Dict[str, Any]]:
+        if self.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        return list(self._entries)
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries.extend(entries)
+            self._write(self._entries)
+
+    def compact(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries = list(entries)
+            self._write(self._entries)
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class JSONLMemoryBackend(MemoryBackend):
+    """Append-only JSON Lines log with atomic compaction"""
+
+    def __init__(
+        self,
+        path: str = "memory_store.jsonl",
+        compact_growth: float = Config.MEMORY_COMPACT_GROWTH,
+        compact_min_bytes: int = Config.MEMORY_COMPACT_MIN_BYTES
+    ):
+        super().__init__(path)
+        self.compact_growth = compact_growth
+        self.compact_min_bytes = compact_min_bytes
+        self._compacted_size = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        if not self.exists():
+            return []
+
+        entries = []
+        damaged = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.endswith("\n"):
+                    # Torn write from a crash: the record never completed
+                    damaged = True
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt memory record at {self.path}:{line_no}")
+                    damaged = True
+
+        if damaged:
+            logger.info(f"Compacting {self.path} after recovering {len(entries)} entries")
+            self.compact(entries)
+        else:
+            self._compacted_size = os.path.getsize(self.path)
+
+        return entries
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        if not payload:
+            return
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._compacted_size = os.path.getsize(self.path)
+
+    def needs_compaction(self) -> bool:
+        # Geometric threshold: each rewrite is paid for by as many bytes of appends
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return False
+        return size >= self.compact_min_bytes and size >= self._compacted_size * self.compact_growth
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """SQLite table with one row per Q&A entry"""
+
+    INSERT_SQL = "INSERT INTO memory (question, answer, citations, timestamp) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path: str = "memory_store.db"):
+        super().__init__(path)
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memory (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    citations TEXT NOT NULL,
+                    timestamp TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT question, answer, citations, timestamp FROM memory ORDER BY id"
+            ).fetchall()
+        return [
+            {
+                "question": question,
+                "answer": answer,
+                "citations": json.loads(citations),
+                "timestamp": timestamp
+            }
+            for question, answer, citations, timestamp in rows
+        ]
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        rows = self._rows(entries)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(self.INSERT_SQL, rows)
+
+    def compact(self, entries: List[Dict[str, Any]]) -> None:
+        rows = self._rows(entries)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM memory")
+                conn.executemany(self.INSERT_SQL, rows)
+            conn.execute("VACUUM")
+
+    def create(self, entries: List[Dict[str, Any]]) -> None:
+        # Build the database under a temporary name, so the live path only ever holds a finished import
+        tmp_path = f"{self.path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        staging = SQLiteMemoryBackend(tmp_path)
+        try:
+            staging.append_many(entries)
+        finally:
+            staging.close()
+        with self._lock:
+            self.close()
+            os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        """Close the database connection; the next call reopens it"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _rows(entries: Iterable[Dict[str, Any]]) -> List[tuple]:
+        return [
+            (entry["question"], entry["answer"], json.dumps(entry.get("citations", [])), entry["timestamp"])
+            for entry in entries
+        ]
+
+
+BACKENDS = {
+    "json": JSONMemoryBackend,
+    "jsonl": JSONLMemoryBackend,
+    "sqlite": SQLiteMemoryBackend,
+}
+
+
+def create_memory_backend(kind: str, path: str) -> MemoryBackend:
+    """Instantiate the storage engine registered under the given name"""
+    try:
+        backend_cls = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown memory backend: {kind} (expected one of {', '.join(BACKENDS)})")
+    return backend_cls(path)
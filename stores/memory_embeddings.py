@@ -0,0 +1,141 @@
+import os
+import json
+import threading
+import logging
+import numpy as np
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class MemoryEmbeddingIndex:
+    """Row-aligned float32 embedding matrix for memory entries, memory-mapped from disk
+
+    Each row's entry key is kept in a line-per-row sidecar file, so callers can
+    check that the rows still line up with the entries they were built from.
+    """
+
+    DTYPE = np.float32
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.meta_path = f"{path}.meta.json"
+        self.keys_path = f"{path}.keys"
+        self.keys: List[str] = []
+        self.model_name = model_name
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._open()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _open(self) -> None:
+        """Validate the on-disk matrix and drop any torn trailing row"""
+        if not all(os.path.exists(path) for path in (self.path, self.meta_path, self.keys_path)):
+            self._reset()
+            return
+
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except Exception as e:
+            logger.warning(f"Unreadable embedding metadata {self.meta_path}: {e}")
+            self._reset()
+            return
+
+        if meta.get("model") != self.model_name:
+            logger.info(f"Embedding model changed to {self.model_name}, rebuilding memory embeddings")
+            self._reset()
+            return
+
+        self.dim = meta["dim"]
+        row_bytes = self.dim * np.dtype(self.DTYPE).itemsize
+        size = os.path.getsize(self.path)
+        if size % row_bytes:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size - size % row_bytes)
+        self._rows = size // row_bytes
+
+        # Rows and keys are appended separately; a crash between the two leaves one longer
+        with open(self.keys_path, 'r', encoding='utf-8') as f:
+            self.keys = f.read().splitlines()
+        if len(self.keys) != self._rows:
+            self._truncate(min(len(self.keys), self._rows))
+
+    def clear(self) -> None:
+        """Discard all rows so the matrix can be rebuilt"""
+        with self._lock:
+            self._reset()
+
+    def truncate(self, rows: int) -> None:
+        """Keep only the first rows, e.g. the prefix that still matches the entries"""
+        with self._lock:
+            if rows < self._rows:
+                self._truncate(rows)
+
+    def _truncate(self, rows: int) -> None:
+        if not rows:
+            self._reset()
+            return
+        with open(self.path, 'r+b') as f:
+            f.truncate(rows * self.dim * np.dtype(self.DTYPE).itemsize)
+        self.keys = self.keys[:rows]
+        with open(self.keys_path, 'w', encoding='utf-8') as f:
+            f.write("".join(f"{key}\n" for key in self.keys))
+        self._rows = rows
+        self._matrix = None
+
+    def _reset(self) -> None:
+        for path in (self.path, self.meta_path, self.keys_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+        self.keys = []
+        self._rows = 0
+        self._matrix = None
+
+    def append(self, embeddings: np.ndarray, keys: List[str]) -> None:
+        """Normalize and append embeddings as new rows, one entry key per row"""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=self.DTYPE))
+        if not len(embeddings):
+            return
+        if len(keys) != len(embeddings):
+            raise ValueError(f"Got {len(keys)} keys for {len(embeddings)} embeddings")
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            with open(self.path, 'ab') as f:
+                f.write(embeddings.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                f.write("".join(f"{key}\n" for key in keys))
+            self.keys.extend(keys)
+            self._rows += len(embeddings)
+            self._matrix = None
+
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped view of all rows, remapped after appends"""
+        with self._lock:
+            if self._matrix is None:
+                if not self._rows:
+                    return np.empty((0, self.dim or 0), dtype=self.DTYPE)
+                self._matrix = np.memmap(self.path, dtype=self.DTYPE, mode='r', shape=(self._rows, self.dim))
+            return self._matrix
+
+    def similarities(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity between the query and every row"""
+        matrix = self.matrix()
+        if not len(matrix):
+            return np.empty(0, dtype=self.DTYPE)
+        query = np.asarray(query_embedding, dtype=self.DTYPE).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        return matrix @ query
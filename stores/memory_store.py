@@ -1,36 +1,182 @@
 import os
 import json
+import heapq
+import hashlib
+import threading
+import numpy as np
 from datetime import datetime
 import logging
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from config import Config
+from stores.memory_backends import MemoryBackend, create_memory_backend
+from stores.embedding_backends import embedding_model_id
+from stores.bm25_index import BM25Index, tokenize
+from stores.memory_embeddings import MemoryEmbeddingIndex
+from metrics import traced
 
 logger = logging.getLogger(__name__)
 
 class MemoryStore:
-    """Simple JSON-based memory store"""
-    
-    def __init__(self, file_path: str = "memory_store.json"):
+    """Q&A memory persisted through a pluggable storage backend"""
+
+    # Relative weight of answer matches, as in the original overlap scorer
+    ANSWER_WEIGHT = 0.5
+    EMBEDDING_BATCH_SIZE = 64
+
+    def __init__(
+        self,
+        file_path: str = Config.MEMORY_FILE,
+        backend: Optional[MemoryBackend] = None,
+        embedder: Optional[Callable[[List[str]], np.ndarray]] = None,
+        search_mode: str = Config.MEMORY_SEARCH_MODE,
+        embeddings_path: str = Config.MEMORY_EMBEDDINGS_PATH
+    ):
+        # file_path is the legacy JSON document, imported once into a fresh backend
         self.file_path = file_path
-        self.memory = self._load_memory()
-    
+        self.backend = backend or create_memory_backend(
+            Config.MEMORY_BACKEND, Config.MEMORY_BACKEND_PATHS[Config.MEMORY_BACKEND]
+        )
+        self.embedder = embedder
+        self.search_mode = search_mode
+        self.embeddings_path = embeddings_path
+        self._memory: Optional[List[Dict[str, Any]]] = None
+        self._question_index = BM25Index()
+        self._answer_index = BM25Index()
+        self._embeddings: Optional[MemoryEmbeddingIndex] = None
+        self._embeddings_checked = False
+        self._backfill_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    @property
+    def memory(self) -> List[Dict[str, Any]]:
+        """Stored entries, loaded from the backend on first access"""
+        if self._memory is None:
+            with self._lock:
+                if self._memory is None:
+                    memory = self._load_memory()
+                    for position, entry in enumerate(memory):
+                        self._index_entry(position, entry)
+                    self._memory = memory
+        return self._memory
+
+    def _index_entry(self, position: int, entry: Dict[str, Any]) -> None:
+        """Tokenize an entry once and add it to the inverted indexes"""
+        self._question_index.add_tokens(position, tokenize(entry["question"]))
+        self._answer_index.add_tokens(position, tokenize(entry["answer"]))
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.embedder is not None and self.search_mode in ("semantic", "hybrid")
+
+    def _embedding_index(self) -> MemoryEmbeddingIndex:
+        if self._embeddings is None:
+            self._embeddings = MemoryEmbeddingIndex(self.embeddings_path, embedding_model_id())
+        return self._embeddings
+
+    @staticmethod
+    def _embedding_text(entry: Dict[str, Any]) -> str:
+        return f"{entry['question']}\n{entry['answer'][:500]}"
+
+    @staticmethod
+    def _entry_key(entry: Dict[str, Any]) -> str:
+        """Identifies an entry's embedding row; entries have no ID of their own"""
+        text = f"{entry.get('timestamp', '')}\x00{entry['question']}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    def _sync_embeddings(self) -> MemoryEmbeddingIndex:
+        """Embedding index lined up with memory; missing rows are embedded in the background
+
+        Called with the lock held. Rows whose keys stop matching the entries
+        (e.g. memory was rewritten) are dropped once, on first use. Entries added
+        later are appended in order, so they stay aligned.
+        """
+        index = self._embedding_index()
+        memory = self.memory
+        if not self._embeddings_checked:
+            keys = index.keys
+            aligned = 0
+            while aligned < min(len(keys), len(memory)) and keys[aligned] == self._entry_key(memory[aligned]):
+                aligned += 1
+            if aligned < len(index):
+                logger.info(f"Memory embeddings diverge from the entries after row {aligned}, re-embedding the rest")
+                index.truncate(aligned)
+            self._embeddings_checked = True
+
+        if len(index) < len(memory) and self._backfill_thread is None:
+            self._backfill_thread = threading.Thread(
+                target=self._backfill_embeddings, name="memory-embedding-backfill", daemon=True
+            )
+            self._backfill_thread.start()
+        return index
+
+    def wait_for_embeddings(self, timeout: Optional[float] = None) -> bool:
+        """Start any pending backfill and wait for it; returns whether every entry has a row"""
+        if not self.semantic_enabled:
+            return False
+        with self._lock:
+            self._sync_embeddings()
+            thread = self._backfill_thread
+        if thread is not None:
+            thread.join(timeout)
+        return len(self._embedding_index()) == len(self.memory)
+
+    def _backfill_embeddings(self) -> None:
+        """Embed entries without a row in batches, holding the lock only to read and append"""
+        try:
+            while True:
+                with self._lock:
+                    index = self._embedding_index()
+                    start = len(index)
+                    batch = self.memory[start:start + self.EMBEDDING_BATCH_SIZE]
+                if not batch:
+                    break
+                embeddings = self.embedder([self._embedding_text(entry) for entry in batch])
+                with self._lock:
+                    # Rows are positional: append only if nothing else extended the index meanwhile
+                    if len(index) == start:
+                        index.append(embeddings, [self._entry_key(entry) for entry in batch])
+            logger.info(f"Memory embeddings backfilled to {len(index)} entries")
+        except Exception as e:
+            logger.error(f"Error backfilling memory embeddings: {e}")
+        finally:
+            with self._lock:
+                self._backfill_thread = None
+
+    @traced("memory_store.load")
     def _load_memory(self) -> List[Dict[str, Any]]:
-        """Load memory from file"""
+        """Load memory from the backend, migrating the legacy JSON file if needed"""
         try:
-            if os.path.exists(self.file_path):
-                with open(self.file_path, 'r') as f:
-                    return json.load(f)
+            if not self.backend.exists() and self._has_legacy_file():
+                self._migrate_legacy_file()
+            return self.backend.load()
         except Exception as e:
             logger.error(f"Error loading memory: {e}")
         return []
-    
+
+    def _has_legacy_file(self) -> bool:
+        return (
+            os.path.exists(self.file_path)
+            and os.path.abspath(self.file_path) != os.path.abspath(self.backend.path)
+        )
+
+    def _migrate_legacy_file(self) -> None:
+        """Import entries from the legacy JSON document into the backend"""
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        # The backend appears only once the import is complete, so an interrupted
+        # migration is simply retried on the next start
+        self.backend.create(entries)
+        logger.info(f"Migrated {len(entries)} memory entries from {self.file_path} to {self.backend.path}")
+
     def save_memory(self) -> None:
-        """Save memory to file"""
+        """Rewrite the backend from the in-memory entries"""
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(self.memory, f, indent=2)
+            with self._lock:
+                self.backend.compact(self.memory)
         except Exception as e:
             logger.error(f"Error saving memory: {e}")
-    
+
+    @traced("memory_store.write")
     def add_entry(self, question: str, answer: str, citations: List[str] = None) -> None:
         """Add a new Q&A entry"""
         entry = {
@@ -39,24 +185,88 @@ class MemoryStore:
             "citations": citations or [],
             "timestamp": datetime.now().isoformat()
         }
-        self.memory.append(entry)
-        self.save_memory()
-    
+        embedding = None
+        if self.semantic_enabled:
+            try:
+                embedding = self.embedder([self._embedding_text(entry)])
+            except Exception as e:
+                logger.error(f"Error embedding memory entry: {e}")
+
+        with self._lock:
+            memory = self.memory
+            try:
+                self.backend.append(entry)
+            except Exception as e:
+                logger.error(f"Error saving memory: {e}")
+            position = len(memory)
+            self._index_entry(position, entry)
+            memory.append(entry)
+            if self.backend.needs_compaction():
+                self.save_memory()
+
+            # Rows are positional; anything out of step is backfilled in the background
+            if embedding is not None and len(self._embedding_index()) == position:
+                self._embedding_index().append(embedding, [self._entry_key(entry)])
+
     def search_memory(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search memory for relevant entries"""
-        query_words = set(query.lower().split())
-        scored_entries = []
-        
-        for entry in self.memory:
-            question_words = set(entry["question"].lower().split())
-            answer_words = set(entry["answer"].lower().split())
-            
-            # Simple word overlap scoring
-            score = len(query_words & question_words) + 0.5 * len(query_words & answer_words)
-            
-            if score > 0:
-                scored_entries.append((score, entry))
-        
-        # Sort by score and return top results
-        scored_entries.sort(key=lambda x: x[0], reverse=True)
-        return [entry for _, entry in scored_entries[:limit]]
\ No newline at end of file
+        """Search memory for relevant entries using BM25 ranking"""
+        return [entry for _, entry in self.search_memory_scored(query, limit)]
+
+    @traced("memory_store.search")
+    def search_memory_scored(self, query: str, limit: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return the top (score, entry) pairs for a query"""
+        if self.semantic_enabled:
+            try:
+                return self._semantic_search(query, limit)
+            except Exception as e:
+                logger.error(f"Semantic memory search failed, falling back to lexical: {e}")
+        return self._lexical_search(query, limit)
+
+    def _lexical_scores(self, query_tokens: List[str]) -> Dict[int, float]:
+        scores = self._question_index.scores(query_tokens)
+        for position, score in self._answer_index.scores(query_tokens).items():
+            scores[position] = scores.get(position, 0.0) + self.ANSWER_WEIGHT * score
+        return scores
+
+    def _lexical_search(self, query: str, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            memory = self.memory
+            scores = self._lexical_scores(query_tokens)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(score, memory[position]) for position, score in top]
+
+    def _semantic_search(self, query: str, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Cosine similarity over the embedding matrix, optionally fused with BM25"""
+        query_embedding = self.embedder([query])[0]
+
+        with self._lock:
+            memory = self.memory
+            scores = self._sync_embeddings().similarities(query_embedding)
+            if not len(scores):
+                # Nothing embedded yet (the backfill is still running)
+                return self._lexical_search(query, limit)
+            if len(scores) < len(memory):
+                # Entries still waiting for the backfill only score lexically
+                scores = np.concatenate([scores, np.zeros(len(memory) - len(scores), dtype=scores.dtype)])
+
+            if self.search_mode == "hybrid":
+                weight = Config.MEMORY_SEMANTIC_WEIGHT
+                scores = weight * scores
+                lexical = self._lexical_scores(tokenize(query))
+                if lexical:
+                    positions = np.fromiter(lexical.keys(), dtype=np.int64, count=len(lexical))
+                    values = np.fromiter(lexical.values(), dtype=np.float32, count=len(lexical))
+                    scores[positions] += (1 - weight) * values / values.max()
+
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (float(scores[position]), memory[position])
+                for position in top
+                if scores[position] >= Config.MEMORY_MIN_SCORE
+            ]
@@ -0,0 +1,125 @@
+import re
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Tuple
+from config import Config
+from utils import count_tokens
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[IVX]+\.|#{1,6})\s+\S")
+
+# (page_number, heading, text, tokens)
+Unit = Tuple[int, str, str, int]
+
+def is_heading(line: str) -> bool:
+    """Short lines that look like "2.1 Results", "# Results" or "RESULTS" """
+    line = line.strip()
+    if not line or len(line) > 80 or line[-1] in ".,;:":
+        return False
+    if NUMBERED_HEADING.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+class TextChunker:
+    """Pack paragraphs and sentences into token-sized chunks with overlap, in one pass"""
+
+    def __init__(
+        self,
+        chunk_tokens: int = Config.PDF_CHUNK_TOKENS,
+        overlap_tokens: int = Config.PDF_CHUNK_OVERLAP_TOKENS,
+        token_counter: Callable[[str], int] = count_tokens
+    ):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = token_counter
+
+    def _split_long(self, text: str, tokens: int) -> Iterator[Tuple[str, int]]:
+        """Split an oversized sentence into word windows of about chunk_tokens"""
+        words = text.split()
+        words_per_piece = max(1, int(len(words) * self.chunk_tokens / tokens))
+        for start in range(0, len(words), words_per_piece):
+            piece = " ".join(words[start:start + words_per_piece])
+            yield piece, self.count_tokens(piece)
+
+    def _paragraph_units(self, page_number: int, heading: str, paragraph: str) -> Iterator[Unit]:
+        tokens = self.count_tokens(paragraph)
+        if tokens <= self.chunk_tokens:
+            yield page_number, heading, paragraph, tokens
+            return
+
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            sentence_tokens = self.count_tokens(sentence)
+            if sentence_tokens <= self.chunk_tokens:
+                yield page_number, heading, sentence, sentence_tokens
+            else:
+                for piece, piece_tokens in self._split_long(sentence, sentence_tokens):
+                    yield page_number, heading, piece, piece_tokens
+
+    def _units(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[Unit, bool]]:
+        """Yield (unit, starts_section) for every paragraph, sentence or heading in page order"""
+        heading = ""
+        for page_number, page_text in pages:
+            for block in PARAGRAPH_BREAK.split(page_text):
+                lines: List[str] = []
+                for line in block.splitlines():
+                    if is_heading(line):
+                        if lines:
+                            for unit in self._paragraph_units(page_number, heading, " ".join(lines)):
+                                yield unit, False
+                            lines = []
+                        heading = line.strip()
+                        yield (page_number, heading, heading, self.count_tokens(heading)), True
+                    elif line.strip():
+                        lines.append(line.strip())
+                if lines:
+                    for unit in self._paragraph_units(page_number, heading, " ".join(lines)):
+                        yield unit, False
+
+    def _chunk(self, chunk_id: int, units: Iterable[Unit], tokens: int) -> Dict[str, Any]:
+        units = list(units)
+        return {
+            "chunk_id": chunk_id,
+            "text": "\n".join(unit[2] for unit in units),
+            "page_start": units[0][0],
+            "page_end": units[-1][0],
+            "heading": units[0][1],
+            "tokens": tokens
+        }
+
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+        """Chunk streamed (page_number, text) pairs; each chunk carries its pages and section heading
+
+        A new section starts a fresh chunk once the current one is a quarter full,
+        and consecutive chunks inside a section share up to overlap_tokens of text.
+        """
+        current: Deque[Unit] = deque()
+        current_tokens = 0
+        chunk_id = 0
+        min_section_tokens = self.chunk_tokens // 4
+
+        for unit, starts_section in self._units(pages):
+            unit_tokens = unit[3]
+
+            if current and starts_section and current_tokens >= min_section_tokens:
+                yield self._chunk(chunk_id, current, current_tokens)
+                chunk_id += 1
+                current.clear()
+                current_tokens = 0
+            elif current and current_tokens + unit_tokens > self.chunk_tokens:
+                yield self._chunk(chunk_id, current, current_tokens)
+                chunk_id += 1
+                # Keep the trailing units that fit in the overlap budget
+                while current and (current_tokens > self.overlap_tokens or current_tokens + unit_tokens > self.chunk_tokens):
+                    current_tokens -= current.popleft()[3]
+
+            current.append(unit)
+            current_tokens += unit_tokens
+
+        if current:
+            yield self._chunk(chunk_id, current, current_tokens)
+
+    def chunk_text(self, text: str) -> List[Dict[str, Any]]:
+        return list(self.chunk_pages([(1, text)]))
@@ -1,19 +1,96 @@
 import chromadb
-from sentence_transformers import SentenceTransformer
-from datetime import datetime
+import re
+import time
+import heapq
+import hashlib
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
 import chromadb.errors  # Import ChromaDB specific errors
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from stores.bm25_index import BM25Index, tokenize
+from stores.embedding_cache import EmbeddingCache
+from stores.embedding_batcher import EmbeddingBatcher
+from stores.embedding_backends import create_embedding_backend, embedding_model_id
+from metrics import traced
 
 logger = logging.getLogger(__name__)
 
+CONTENT_ID_PATTERN = re.compile(r"doc_[0-9a-f]{32}")
+
+SEARCH_MODES = ("vector", "hybrid")
+
+# Lexical side of hybrid_search, run while the calling thread embeds and queries Chroma
+_lexical_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical-search")
+
+_COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style metadata filter ({"source": url}, {"type": {"$in": [...]}}, "$and", "$or") in Python"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator_name, operand in condition.items():
+                if operator_name not in _COMPARISONS:
+                    raise ValueError(f"Unsupported where operator: {operator_name}")
+                try:
+                    if not _COMPARISONS[operator_name](value, operand):
+                        return False
+                except TypeError:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
 class VectorStore:
     """ChromaDB-based vector store for RAG"""
     
-    def __init__(self, collection_name: str = "research_docs"):
+    def __init__(self, collection_name: str = "research_docs", search_mode: str = Config.RAG_SEARCH_MODE):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown RAG search mode: {search_mode} (expected one of {', '.join(SEARCH_MODES)})")
         self.collection_name = collection_name
-        self.embedding_model = SentenceTransformer(Config.EMBEDDING_MODEL)
+        self.search_mode = search_mode
+        self.embedding_backend = create_embedding_backend(Config.EMBEDDING_BACKEND, Config.EMBEDDING_MODEL)
+        # Cache misses from all request threads are coalesced into shared model calls
+        self.embedding_batcher = EmbeddingBatcher(
+            traced("embedding.model")(self.embedding_backend.encode),
+            max_batch_size=Config.EMBEDDING_BATCH_SIZE,
+            max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS
+        )
+        self.embedding_model_id = embedding_model_id(Config.EMBEDDING_BACKEND, Config.EMBEDDING_MODEL)
+        self.embedding_cache = EmbeddingCache(
+            self.embedding_batcher.encode,
+            self.embedding_model_id,
+            max_entries=Config.EMBEDDING_CACHE_SIZE,
+            disk_path=Config.EMBEDDING_CACHE_PATH
+        )
+        # Document ID -> time of the latest similarity_search hit, written to metadata in batches
+        self._retrievals: Dict[str, float] = {}
+        self._retrievals_lock = threading.Lock()
+        # BM25 over the collection plus each document's metadata for where filters; built on the first hybrid search
+        self._lexical_index: Optional[BM25Index] = None
+        self._lexical_metadata: Dict[str, Dict[str, Any]] = {}
+        self._lexical_lock = threading.Lock()
         self.chroma_client = chromadb.PersistentClient(path=Config.CHROMA_PERSIST_DIR)
         
         try:
@@ -23,49 +100,421 @@ class VectorStore:
             # Collection doesn't exist, create it
             self.collection = self.chroma_client.create_collection(
                 name=collection_name,
-                metadata={"description": "Research documents collection"}
+                metadata={"description": "Research documents collection", "embedding_model": self.embedding_model_id}
             )
             logger.info(f"Created new collection: {collection_name}")
         except Exception as e:
             logger.error(f"Error initializing vector store: {e}")
             raise
+        
+        self._check_embedding_model()
+    
+    def _check_embedding_model(self) -> None:
+        """Re-embed the collection if its vectors came from another embedding backend or model"""
+        metadata = dict(self.collection.metadata or {})
+        # Collections created before the ID was recorded hold the default backend's vectors
+        stored_id = metadata.get("embedding_model", embedding_model_id("sentence_transformers", Config.EMBEDDING_MODEL))
+        if stored_id != self.embedding_model_id:
+            logger.info(
+                f"Collection {self.collection_name} was embedded with {stored_id}; "
+                f"re-embedding it with {self.embedding_model_id}"
+            )
+            self.reembed()
+        # Recorded only once every vector is in the new space, so an interrupted run starts over
+        if metadata.get("embedding_model") != self.embedding_model_id:
+            metadata["embedding_model"] = self.embedding_model_id
+            self.collection.modify(metadata=metadata)
     
-    def add_documents(self, documents: List[Dict[str, Any]]) -> None:
-        """Add documents to the vector store"""
+    def reembed(self, batch_size: int = 500) -> int:
+        """Replace every stored embedding with one from the current backend; returns the number re-embedded"""
+        all_ids = self.collection.get(include=[])["ids"]
+        for start in range(0, len(all_ids), batch_size):
+            batch = self.collection.get(ids=all_ids[start:start + batch_size], include=["documents", "embeddings"])
+            embeddings = self.embed(batch["documents"])
+            if start == 0 and len(batch["embeddings"][0]) != embeddings.shape[1]:
+                # Chroma fixes a collection's dimension, so these vectors cannot be swapped in place
+                raise RuntimeError(
+                    f"Error: collection {self.collection_name} holds {len(batch['embeddings'][0])}-dimensional vectors, "
+                    f"but {self.embedding_model_id} produces {embeddings.shape[1]}; "
+                    f"switch EMBEDDING_BACKEND/EMBEDDING_MODEL back or delete {Config.CHROMA_PERSIST_DIR}"
+                )
+            self.collection.update(ids=batch["ids"], embeddings=embeddings.tolist())
+        logger.info(f"Re-embedded {len(all_ids)} documents in {self.collection_name}")
+        return len(all_ids)
+    
+    @traced("vector_store.embed")
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts through the shared embedding cache"""
+        return self.embedding_cache.encode(texts)
+    
+    @staticmethod
+    def document_id(content: str) -> str:
+        """Content-addressed ID: identical text always maps to the same ID"""
+        normalized = " ".join(content.split())
+        return f"doc_{hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]}"
+    
+    @traced("vector_store.add")
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Upsert documents, embedding only content not already in the collection; returns the number added"""
         try:
-            texts = [doc["content"] for doc in documents]
-            embeddings = self.embedding_model.encode(texts).tolist()
+            # Later duplicates within the batch win, matching upsert semantics
+            unique = {self.document_id(doc["content"]): doc for doc in documents}
+            ids = list(unique)
+            # Retention counts age from the latest time the content was added
+            added_at = time.time()
+            existing = set(self.collection.get(ids=ids, include=[])["ids"]) if ids else set()
+            new_ids = [doc_id for doc_id in ids if doc_id not in existing]
+            
+            if new_ids:
+                texts = [unique[doc_id]["content"] for doc_id in new_ids]
+                self.collection.upsert(
+                    ids=new_ids,
+                    embeddings=self.embed(texts).tolist(),
+                    documents=texts,
+                    metadatas=[{**unique[doc_id].get("metadata", {}), "added_at": added_at} for doc_id in new_ids]
+                )
+                with self._lexical_lock:
+                    if self._lexical_index is not None:
+                        for doc_id, text in zip(new_ids, texts):
+                            self._lexical_index.add(doc_id, text)
+                            self._lexical_metadata[doc_id] = {**unique[doc_id].get("metadata", {}), "added_at": added_at}
             
-            self.collection.add(
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=[doc.get("metadata", {}) for doc in documents],
-                ids=[f"doc_{i}_{datetime.now().timestamp()}" for i in range(len(documents))]
+            if existing:
+                # Refresh metadata without re-embedding the unchanged content
+                existing_ids = [doc_id for doc_id in ids if doc_id in existing]
+                self.collection.update(
+                    ids=existing_ids,
+                    metadatas=[{**unique[doc_id].get("metadata", {}), "added_at": added_at} for doc_id in existing_ids]
+                )
+                with self._lexical_lock:
+                    for doc_id in existing_ids:
+                        if doc_id in self._lexical_metadata:
+                            self._lexical_metadata[doc_id].update(unique[doc_id].get("metadata", {}), added_at=added_at)
+            
+            logger.info(
+                f"Added {len(new_ids)} documents to vector store "
+                f"({len(existing)} already present, {len(documents) - len(ids)} duplicates in batch)"
             )
-            logger.info(f"Added {len(documents)} documents to vector store")
+            return len(new_ids)
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {e}")
+            return 0
     
-    def similarity_search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
-        try:
-            query_embedding = self.embedding_model.encode([query]).tolist()
-            
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=k
+    def deduplicate(self, batch_size: int = 500) -> Dict[str, int]:
+        """Re-key legacy documents by content hash and drop duplicate copies"""
+        all_ids = self.collection.get(include=[])["ids"]
+        stats = {"scanned": len(all_ids), "rekeyed": 0, "removed": 0}
+        seen = set(doc_id for doc_id in all_ids if CONTENT_ID_PATTERN.fullmatch(doc_id))
+        
+        for start in range(0, len(all_ids), batch_size):
+            batch = self.collection.get(
+                ids=all_ids[start:start + batch_size],
+                include=["documents", "metadatas", "embeddings"]
             )
+            rekey_ids, rekey_docs, rekey_metadatas, rekey_embeddings, stale_ids = [], [], [], [], []
             
-            docs = []
-            for i, (doc, metadata) in enumerate(zip(results["documents"][0], results["metadatas"][0])):
-                docs.append({
-                    "content": doc,
-                    "metadata": metadata,
-                    "source": metadata.get("source", "unknown"),
-                    "score": results["distances"][0][i] if results["distances"] else 0
-                })
+            for doc_id, doc, metadata, embedding in zip(
+                batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]
+            ):
+                content_id = self.document_id(doc)
+                if doc_id == content_id:
+                    continue
+                stale_ids.append(doc_id)
+                if content_id in seen:
+                    stats["removed"] += 1
+                    continue
+                # Keep the stored embedding; nothing is re-encoded
+                seen.add(content_id)
+                rekey_ids.append(content_id)
+                rekey_docs.append(doc)
+                rekey_metadatas.append(metadata)
+                rekey_embeddings.append(list(embedding))
+                stats["rekeyed"] += 1
             
+            if rekey_ids:
+                self.collection.upsert(
+                    ids=rekey_ids,
+                    embeddings=rekey_embeddings,
+                    documents=rekey_docs,
+                    metadatas=rekey_metadatas
+                )
+            if stale_ids:
+                self.collection.delete(ids=stale_ids)
+        
+        # IDs changed wholesale; the next hybrid search rebuilds the lexical index
+        with self._lexical_lock:
+            self._lexical_index = None
+            self._lexical_metadata = {}
+        
+        logger.info(f"Deduplicated collection {self.collection_name}: {stats}")
+        return stats
+    
+    def _delete_ids(self, doc_ids: List[str], batch_size: int = 500) -> None:
+        """Delete documents from Chroma and the lexical index"""
+        for start in range(0, len(doc_ids), batch_size):
+            self.collection.delete(ids=doc_ids[start:start + batch_size])
+        with self._lexical_lock:
+            if self._lexical_index is not None:
+                for doc_id in doc_ids:
+                    self._lexical_index.remove(doc_id)
+                    self._lexical_metadata.pop(doc_id, None)
+    
+    def delete_documents(self, where: Dict[str, Any], keep_contents: Optional[List[str]] = None) -> int:
+        """Delete documents matching a metadata filter, except those with the given contents; returns the number deleted"""
+        try:
+            keep = {self.document_id(content) for content in keep_contents or []}
+            stale = [doc_id for doc_id in self.collection.get(where=where, include=[])["ids"] if doc_id not in keep]
+            self._delete_ids(stale)
+            if stale:
+                logger.info(f"Deleted {len(stale)} documents matching {where}")
+            return len(stale)
+        except Exception as e:
+            logger.error(f"Error deleting documents from vector store: {e}")
+            return 0
+    
+    def has_documents(self, where: Dict[str, Any]) -> bool:
+        """Whether any stored document matches a metadata filter such as {"source": url}"""
+        try:
+            return bool(self.collection.get(where=where, limit=1, include=[])["ids"])
+        except Exception as e:
+            logger.error(f"Error checking vector store: {e}")
+            return False
+    
+    def _record_retrievals(self, doc_ids: List[str]) -> None:
+        now = time.time()
+        with self._retrievals_lock:
+            for doc_id in doc_ids:
+                self._retrievals[doc_id] = now
+    
+    def _vector_candidates(self, query_embedding: np.ndarray, k: int, where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = self.collection.query(
+            query_embeddings=query_embedding.tolist(),
+            n_results=k,
+            where=where
+        )
+        
+        docs = []
+        for i, (doc_id, doc, metadata) in enumerate(zip(results["ids"][0], results["documents"][0], results["metadatas"][0])):
+            docs.append({
+                "id": doc_id,
+                "content": doc,
+                "metadata": metadata,
+                "source": metadata.get("source", "unknown"),
+                "score": results["distances"][0][i] if results["distances"] else 0
+            })
+        return docs
+    
+    @traced("vector_store.query")
+    def similarity_search(self, query: str, k: int = 3, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for similar documents, optionally restricted by a metadata filter"""
+        try:
+            docs = self._vector_candidates(self.embed([query]), k, where)
+            self._record_retrievals([doc["id"] for doc in docs])
             return docs
         except Exception as e:
             logger.error(f"Error searching vector store: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def search(self, query: str, k: int = 3, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Retrieve documents with the configured search mode (similarity_search or hybrid_search)"""
+        if self.search_mode == "hybrid":
+            return self.hybrid_search(query, k, where)
+        return self.similarity_search(query, k, where)
+    
+    def _build_lexical_index(self, batch_size: int = 1000) -> BM25Index:
+        """Index every stored document; called with _lexical_lock held"""
+        if self._lexical_index is None:
+            start = time.perf_counter()
+            index, metadatas = BM25Index(), {}
+            offset = 0
+            while True:
+                page = self.collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+                if not page["ids"]:
+                    break
+                for doc_id, doc, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                    index.add(doc_id, doc or "")
+                    metadatas[doc_id] = metadata or {}
+                offset += len(page["ids"])
+            self._lexical_index, self._lexical_metadata = index, metadatas
+            logger.info(f"Built lexical index over {len(index)} documents in {time.perf_counter() - start:.2f}s")
+        return self._lexical_index
+    
+    @traced("vector_store.lexical")
+    def lexical_search(self, query: str, k: int = 3, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """Top (document ID, score) pairs restricted by a metadata filter
+        
+        Scores are BM25 divided by the most the query could score, so they fall
+        in [0, 1] and reflect how much of the query a document matches.
+        """
+        with self._lexical_lock:
+            index = self._build_lexical_index()
+            metadatas = self._lexical_metadata
+            predicate = None if not where else (lambda doc_id: matches_where(metadatas.get(doc_id, {}), where))
+            hits = index.search(query, k, predicate)
+            best = index.max_score(tokenize(query))
+        return [(doc_id, score / best) for doc_id, score in hits] if best > 0 else []
+    
+    @traced("vector_store.hybrid")
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 3,
+        where: Optional[Dict[str, Any]] = None,
+        candidates: int = Config.RAG_CANDIDATES
+    ) -> List[Dict[str, Any]]:
+        """Fuse vector and BM25 candidates with reciprocal rank fusion
+        
+        Both retrievers fetch up to candidates documents matching where, the
+        lexical one on a worker thread while this one embeds the query. Each
+        document scores sum(1 / (RAG_RRF_K + rank)) over the lists it appears
+        in, and the top k are returned. score stays the Chroma distance (computed
+        from the stored embedding for lexical-only hits) and lexical_score is the
+        normalized BM25 score (0 if BM25 did not find the document); both measure
+        the match. fusion_score only reflects rank and is meant for ordering.
+        """
+        candidates = max(k, candidates)
+        lexical = _lexical_executor.submit(contextvars.copy_context().run, self.lexical_search, query, candidates, where)
+        try:
+            query_embedding = self.embed([query])
+            vector_docs = self._vector_candidates(query_embedding, candidates, where)
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            query_embedding, vector_docs = None, []
+        try:
+            lexical_hits = lexical.result()
+        except Exception as e:
+            logger.error(f"Error in lexical search: {e}")
+            lexical_hits = []
+        
+        rrf_k = Config.RAG_RRF_K
+        fused: Dict[str, float] = {}
+        for ranking in ([doc["id"] for doc in vector_docs], [doc_id for doc_id, _ in lexical_hits]):
+            for rank, doc_id in enumerate(ranking, start=1):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+        top = heapq.nlargest(k, fused.items(), key=lambda item: item[1])
+        
+        by_id = {doc["id"]: doc for doc in vector_docs}
+        missing = [doc_id for doc_id, _ in top if doc_id not in by_id]
+        if missing:
+            try:
+                by_id.update(self._lexical_documents(missing, query_embedding))
+            except Exception as e:
+                logger.error(f"Error loading lexical hits: {e}")
+        
+        lexical_scores = dict(lexical_hits)
+        docs = []
+        for doc_id, score in top:
+            if doc_id in by_id:
+                docs.append({
+                    **by_id[doc_id],
+                    "lexical_score": round(lexical_scores.get(doc_id, 0.0), 4),
+                    "fusion_score": round(score * (rrf_k + 1) / 2, 4)
+                })
+        self._record_retrievals([doc["id"] for doc in docs])
+        logger.info(f"Hybrid search fused {len(vector_docs)} vector and {len(lexical_hits)} lexical candidates into {len(docs)}")
+        return docs
+    
+    def _lexical_documents(self, doc_ids: List[str], query_embedding: Optional[np.ndarray]) -> Dict[str, Dict[str, Any]]:
+        """Load documents only the lexical side found, with the squared L2 distance Chroma would have reported"""
+        results = self.collection.get(ids=doc_ids, include=["documents", "metadatas", "embeddings"])
+        docs = {}
+        for doc_id, doc, metadata, embedding in zip(
+            results["ids"], results["documents"], results["metadatas"], results["embeddings"]
+        ):
+            metadata = metadata or {}
+            distance = None
+            if query_embedding is not None:
+                distance = float(np.sum((np.asarray(embedding, dtype=np.float32) - query_embedding[0]) ** 2))
+            docs[doc_id] = {
+                "id": doc_id,
+                "content": doc,
+                "metadata": metadata,
+                "source": metadata.get("source", "unknown"),
+                "score": distance
+            }
+        return docs
+    
+    def flush_retrievals(self) -> int:
+        """Write pending last_retrieved times into document metadata; returns the number written"""
+        with self._retrievals_lock:
+            pending, self._retrievals = self._retrievals, {}
+        if not pending:
+            return 0
+        
+        # Documents deleted since they were retrieved are skipped
+        ids = self.collection.get(ids=list(pending), include=[])["ids"]
+        if ids:
+            self.collection.update(ids=ids, metadatas=[{"last_retrieved": pending[doc_id]} for doc_id in ids])
+        return len(ids)
+    
+    def enforce_retention(
+        self,
+        policies: Dict[str, Dict[str, Any]],
+        now: Optional[float] = None,
+        batch_size: int = 500
+    ) -> Dict[str, Dict[str, Any]]:
+        """Expire and evict documents per metadata "type" according to retention policies
+        
+        Each policy may set ttl_days (documents added longer ago are deleted) and
+        max_documents (the least recently retrieved documents beyond the cap are
+        deleted, falling back to when they were added). Documents stored before
+        added_at existed are stamped with the current time, so their TTL starts now.
+        Returns per-type counts plus the sources that lost documents.
+        """
+        now = time.time() if now is None else now
+        self.flush_retrievals()
+        report = {}
+        
+        for doc_type, policy in policies.items():
+            ttl_days = policy.get("ttl_days")
+            max_documents = policy.get("max_documents")
+            stats = {"scanned": 0, "expired": 0, "evicted": 0, "backfilled": 0, "removed_sources": []}
+            report[doc_type] = stats
+            if ttl_days is None and max_documents is None:
+                continue
+            
+            documents, backfill_ids = [], []
+            offset = 0
+            while True:
+                page = self.collection.get(
+                    where={"type": doc_type}, include=["metadatas"], limit=batch_size, offset=offset
+                )
+                if not page["ids"]:
+                    break
+                for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                    metadata = metadata or {}
+                    if "added_at" not in metadata:
+                        backfill_ids.append(doc_id)
+                    added = metadata.get("added_at", now)
+                    last_used = max(added, metadata.get("last_retrieved", added))
+                    documents.append((doc_id, added, last_used, metadata.get("source", "unknown")))
+                offset += len(page["ids"])
+            stats["scanned"] = len(documents)
+            
+            for start in range(0, len(backfill_ids), batch_size):
+                batch = backfill_ids[start:start + batch_size]
+                self.collection.update(ids=batch, metadatas=[{"added_at": now} for _ in batch])
+            stats["backfilled"] = len(backfill_ids)
+            
+            expired = []
+            if ttl_days is not None:
+                cutoff = now - ttl_days * 86400
+                expired = [doc for doc in documents if doc[1] < cutoff]
+                documents = [doc for doc in documents if doc[1] >= cutoff]
+            
+            evicted = []
+            if max_documents is not None and len(documents) > max_documents:
+                documents.sort(key=lambda doc: doc[2])
+                evicted = documents[:len(documents) - max_documents]
+            
+            removed = expired + evicted
+            self._delete_ids([doc[0] for doc in removed], batch_size)
+            stats["expired"] = len(expired)
+            stats["evicted"] = len(evicted)
+            stats["removed_sources"] = sorted({doc[3] for doc in removed})
+        
+        logger.info(
+            f"Retention on {self.collection_name}: "
+            + ", ".join(f"{doc_type} -{s['expired']} expired -{s['evicted']} evicted" for doc_type, s in report.items())
+        )
+        return report
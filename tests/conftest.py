@@ -0,0 +1,72 @@
+import os
+import sys
+import hashlib
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_services import FakeServices
+
+STUB_DIMENSIONS = 64
+
+
+class StubEmbeddingBackend:
+    """Hashed bag-of-words vectors: no model download, and texts sharing words stay close"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def encode(self, texts):
+        import numpy as np
+        from stores.bm25_index import tokenize
+
+        vectors = np.zeros((len(texts), STUB_DIMENSIONS), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text) or [""]:
+                vectors[row, int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % STUB_DIMENSIONS] += 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_services(tmp_path_factory):
+    """Local Brave and OpenAI stand-ins, a stub embedding backend, and stores created in a temporary directory
+
+    Config reads the environment when it is first imported, so tests import the
+    application modules inside the test functions, after this fixture has run.
+    """
+    services = FakeServices(brave_ms=20, openai_ms=20, jitter_ms=0).start()
+    saved_environ = dict(os.environ)
+    saved_cwd = os.getcwd()
+    os.environ.update(services.environ())
+    os.environ.update({
+        "WARM_UP_ON_START": "0",
+        "RETENTION_INTERVAL": "0",
+        "MEMORY_SEARCH_MODE": "lexical",
+        "EMBEDDING_BACKEND": "stub"
+    })
+    os.chdir(tmp_path_factory.mktemp("stores"))
+
+    # Registered like the real backends, so the suite runs offline without the embedding model
+    from stores.embedding_backends import BACKENDS
+    BACKENDS["stub"] = StubEmbeddingBackend
+
+    yield services
+
+    os.chdir(saved_cwd)
+    os.environ.clear()
+    os.environ.update(saved_environ)
+    BACKENDS.pop("stub", None)
+    services.stop()
+
+
+@pytest.fixture
+def vector_store(fake_services):
+    """A VectorStore over a collection of its own, dropped after the test"""
+    from stores.vector_store import VectorStore
+
+    store = VectorStore(collection_name=f"test_{uuid.uuid4().hex[:12]}")
+    yield store
+    store.chroma_client.delete_collection(store.collection_name)
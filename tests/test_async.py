@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+
+import pytest
+
+_question_ids = itertools.count()
+
+
+def unique(question: str) -> str:
+    """Distinct question text, so neither coalescing nor the caches answer it"""
+    return f"{question} ({next(_question_ids)})"
+
+
+def test_async_search_parses_brave_results(fake_services):
+    from api.brave_search import BraveSearchAPI
+
+    results = asyncio.run(BraveSearchAPI.async_search(unique("vector databases"), 3))
+
+    assert len(results) == 3
+    for result in results:
+        assert result["title"].startswith("Result")
+        assert result["url"].startswith("https://example.com/")
+        assert result["snippet"]
+        assert result["source"] == "example"
+
+
+def test_async_search_coalesces_identical_queries(fake_services):
+    from api.brave_search import BraveSearchAPI
+
+    query = unique("http caching")
+    before = fake_services.requests["brave"]
+
+    async def search_concurrently():
+        return await asyncio.gather(*(BraveSearchAPI.async_search(query, 5) for _ in range(5)))
+
+    results = asyncio.run(search_concurrently())
+
+    assert fake_services.requests["brave"] == before + 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.parametrize("mode", ["routed", "parallel"])
+def test_ainvoke_answers_web_question(fake_services, mode):
+    from graph.workflow import create_async_research_assistant
+
+    graph = create_async_research_assistant(mode)
+    before = dict(fake_services.requests)
+
+    result = asyncio.run(graph.ainvoke({"question": unique("Search the web for recent work on raft consensus")}))
+
+    assert not result.get("error")
+    assert result["tool_choice"] == "web_search"
+    assert result["answer"] and not result["answer"].startswith("Error")
+    assert any(url.startswith("https://example.com/") for url in result["citations"])
+    assert fake_services.requests["brave"] == before["brave"] + 1
+    assert fake_services.requests["openai"] == before["openai"] + 1
+
+
+def test_ainvoke_serves_concurrent_questions_on_one_loop(fake_services):
+    from graph.workflow import create_async_research_assistant
+
+    graph = create_async_research_assistant()
+    questions = [unique(f"Search the web for latest news on topic {i}") for i in range(8)]
+
+    async def ask_all():
+        return await asyncio.gather(*(graph.ainvoke({"question": question}) for question in questions))
+
+    results = asyncio.run(ask_all())
+
+    assert [result["question"] for result in results] == questions
+    assert all(result["answer"] and not result.get("error") for result in results)
+
+
+def test_asgi_ask_endpoint(fake_services):
+    import httpx
+    from main import create_asgi_app
+
+    async def ask(question):
+        transport = httpx.ASGITransport(app=create_asgi_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/ask", json={"question": question}), await client.post("/ask", json={})
+
+    response, empty = asyncio.run(ask(unique("Search the web for bloom filters")))
+
+    assert response.status_code == 200
+    assert response.json()["answer"]
+    assert empty.status_code == 400
@@ -0,0 +1,63 @@
+from stores.bm25_index import BM25Index, tokenize
+
+
+def test_tokenize_lowercases_and_strips_punctuation_and_stopwords():
+    assert tokenize("What is the Raft-consensus protocol, in 2024?") == ["raft", "consensus", "protocol", "2024"]
+    assert tokenize("What is the", drop_stopwords=False) == ["what", "is", "the"]
+    assert tokenize("¿Qué es café?") == ["qué", "es", "café"]
+    assert tokenize("...") == []
+
+
+def test_rare_terms_and_repeated_terms_rank_higher():
+    index = BM25Index()
+    index.add(1, "raft consensus protocol")
+    index.add(2, "paxos consensus protocol")
+    index.add(3, "raft raft raft leader election")
+    index.add(4, "gossip protocol membership")
+
+    ranked = [doc_id for doc_id, _ in index.search("raft protocol", k=4)]
+
+    assert ranked[0] == 1
+    assert set(ranked) == {1, 2, 3, 4}
+    assert index.idf("raft") > index.idf("protocol")
+    assert index.search("zebra") == []
+
+
+def test_longer_documents_are_length_normalized():
+    index = BM25Index()
+    index.add("short", "bloom filter")
+    index.add("long", "bloom filter " + " ".join(f"filler{i}" for i in range(50)))
+
+    scores = index.scores(tokenize("bloom filter"))
+
+    assert scores["short"] > scores["long"]
+    assert scores["short"] <= index.max_score(tokenize("bloom filter"))
+
+
+def test_add_replaces_and_remove_drops_documents():
+    index = BM25Index()
+    index.add("a", "vector database")
+    index.add("b", "vector search")
+    index.add("a", "graph database")
+
+    assert "vector" not in index.doc_terms["a"]
+    assert set(index.postings["vector"]) == {"b"}
+    assert index.total_length == 4
+
+    index.remove("b")
+    index.remove("missing")
+
+    assert len(index) == 1
+    assert "vector" not in index.postings
+    assert index.total_length == 2
+
+
+def test_search_predicate_filters_before_top_k():
+    index = BM25Index()
+    for doc_id in range(10):
+        index.add(doc_id, "cache eviction" if doc_id % 2 else "cache eviction policy lru")
+
+    results = index.search("cache lru", k=3, predicate=lambda doc_id: doc_id % 2 == 1)
+
+    assert len(results) == 3
+    assert all(doc_id % 2 == 1 for doc_id, _ in results)
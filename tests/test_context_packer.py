@@ -0,0 +1,85 @@
+def words(text):
+    return len(text.split())
+
+
+def make_packer(**kwargs):
+    from graph.context_packer import ContextPacker
+
+    options = {"token_budget": 100, "max_item_tokens": 40, "min_relevance": 0.2, "duplicate_overlap": 0.8}
+    options.update(kwargs)
+    return ContextPacker(token_counter=words, **options)
+
+
+def result(i, snippet):
+    return {"title": f"Result{i}", "url": f"https://example.com/{i}", "snippet": snippet}
+
+
+def distinct_text(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_packing_stays_within_the_budget_most_relevant_first():
+    packer = make_packer()
+    search = [result(i, distinct_text(f"r{i}w", 28)) for i in range(5)]
+
+    packed = packer.pack(search, [], [])
+
+    # Each result costs 2 header + 28 content tokens, so three fit in 100
+    assert packed["tokens"] == 90
+    assert [candidate["item"]["url"] for candidate in packed["search"]] == [f"https://example.com/{i}" for i in range(3)]
+    assert packed["dropped"] == 2
+
+
+def test_smaller_candidates_fill_the_remaining_budget():
+    packer = make_packer(token_budget=50)
+    search = [result(0, distinct_text("a", 28)), result(1, distinct_text("b", 28)), result(2, distinct_text("c", 8))]
+
+    packed = packer.pack(search, [], [])
+
+    assert [candidate["item"]["url"] for candidate in packed["search"]] == ["https://example.com/0", "https://example.com/2"]
+    assert packed["tokens"] == 40
+
+
+def test_oversized_items_are_cut_to_max_item_tokens():
+    packer = make_packer(max_item_tokens=20)
+
+    packed = packer.pack([result(0, distinct_text("w", 200))], [], [])
+
+    candidate = packed["search"][0]
+    assert candidate["tokens"] == 20
+    assert candidate["content"].endswith("...")
+
+
+def test_low_relevance_and_duplicate_candidates_are_dropped():
+    packer = make_packer(min_relevance=0.5)
+    snippet = distinct_text("shared", 10)
+    rag_docs = [
+        {"source": "https://example.com/0", "content": snippet, "score": 0.2},
+        {"source": "https://far.example", "content": distinct_text("far", 10), "score": 1.8},
+        {"source": "https://exact.example", "content": distinct_text("exact", 10), "score": 1.8, "lexical_score": 0.9},
+    ]
+
+    packed = packer.pack([result(0, snippet)], rag_docs, [])
+
+    sources = [candidate["item"]["source"] for candidate in packed["rag"]]
+    # The far document scores 0.1, the exact-term hit keeps its BM25 relevance
+    assert "https://far.example" not in sources
+    assert "https://exact.example" in sources
+    # The RAG copy of the search snippet is a duplicate of whichever was packed first
+    assert len(packed["search"]) + sources.count("https://example.com/0") == 1
+
+
+def test_memory_scores_are_normalized_and_memory_search_results_skipped():
+    packer = make_packer()
+    memory = [
+        {"question": "raft leader", "answer": distinct_text("m", 5), "score": 12.0},
+        {"question": "paxos", "answer": distinct_text("p", 5), "score": 1.0},
+    ]
+    memory_result = {"title": "Previous Q&A", "url": "memory", "snippet": distinct_text("m", 5)}
+
+    candidates = packer.candidates([memory_result], [], memory)
+
+    assert [candidate["kind"] for candidate in candidates] == ["memory", "memory"]
+    assert candidates[0]["relevance"] == 1.0
+    assert round(candidates[1]["relevance"], 2) == 0.08
+    assert [candidate["item"]["question"] for candidate in packer.pack([], [], memory)["memory"]] == ["raft leader"]
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def make_client(**kwargs):
+    from api.http_client import HTTPClient, HTTPMetrics, RetryPolicy
+
+    retry = RetryPolicy(max_retries=2, backoff_base=0.01, backoff_max=0.01, retry_after_max=1.0)
+    return HTTPClient(retry=retry, metrics=HTTPMetrics(), **kwargs)
+
+
+def make_async_client(**kwargs):
+    from api.http_client import AsyncHTTPClient, HTTPMetrics, RetryPolicy
+
+    retry = RetryPolicy(max_retries=2, backoff_base=0.01, backoff_max=0.01, retry_after_max=1.0)
+    return AsyncHTTPClient(retry=retry, metrics=HTTPMetrics(), **kwargs)
+
+
+def host_of(url):
+    from urllib.parse import urlsplit
+
+    return urlsplit(url).netloc
+
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("0", 0.0), ("-5", 0.0), ("soon", None), ("", None), (None, None)])
+def test_parse_retry_after_seconds(value, expected):
+    from api.http_client import RetryPolicy
+
+    assert RetryPolicy.parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    from api.http_client import RetryPolicy
+
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+    assert 25 <= RetryPolicy.parse_retry_after(retry_at) <= 30
+
+
+def test_retry_delay_caps_retry_after_and_bounds_backoff():
+    from api.http_client import RetryPolicy
+
+    policy = RetryPolicy(max_retries=3, backoff_base=0.5, backoff_max=2.0, retry_after_max=10.0)
+
+    assert policy.delay(0, "120") == 10.0
+    assert all(0 <= policy.delay(attempt) <= min(2.0, 0.5 * 2 ** attempt) for attempt in range(6))
+    assert policy.should_retry(0, 503) and policy.should_retry(0, 429) and policy.should_retry(0, None)
+    assert not policy.should_retry(0, 404)
+    assert not policy.should_retry(3, 503)
+
+
+def test_retries_server_errors_until_success(fake_services):
+    client = make_client()
+    before = fake_services.requests["brave"]
+    fake_services.fail_next(2, status=503)
+
+    response = client.get(fake_services.brave_url, params={"q": "retry me"})
+
+    assert response.status_code == 200
+    assert fake_services.requests["brave"] == before + 3
+    stats = client.metrics.snapshot()[host_of(fake_services.brave_url)]
+    assert stats["retries"] == 2
+    assert stats["errors"] == 2
+
+
+def test_returns_last_error_once_retries_run_out(fake_services):
+    client = make_client()
+    before = fake_services.requests["brave"]
+    fake_services.fail_next(3, status=502)
+
+    response = client.get(fake_services.brave_url, params={"q": "give up"})
+
+    assert response.status_code == 502
+    assert fake_services.requests["brave"] == before + 3
+
+
+def test_honors_retry_after(fake_services):
+    client = make_client()
+    fake_services.fail_next(1, status=429, retry_after="0.3")
+
+    start = time.perf_counter()
+    response = client.get(fake_services.brave_url, params={"q": "throttled"})
+
+    assert response.status_code == 200
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_host_slot_released_after_errors_and_plain_requests(fake_services):
+    client = make_client(max_per_host=1)
+    fake_services.fail_next(2, status=503)
+    results = []
+
+    def requests_in_turn():
+        for i in range(3):
+            results.append(client.get(fake_services.brave_url, params={"q": f"turn {i}"}).status_code)
+
+    worker = threading.Thread(target=requests_in_turn, daemon=True)
+    worker.start()
+    worker.join(5)
+
+    assert results == [200, 200, 200]
+
+
+def test_streamed_response_holds_host_slot_until_closed(fake_services):
+    client = make_client(max_per_host=1)
+    first = client.get(fake_services.brave_url, params={"q": "stream 1"}, stream=True)
+    second = []
+    waiter = threading.Thread(
+        target=lambda: second.append(client.get(fake_services.brave_url, params={"q": "stream 2"}, stream=True)),
+        daemon=True
+    )
+    waiter.start()
+
+    waiter.join(0.3)
+    assert not second
+
+    first.close()
+    waiter.join(5)
+    assert len(second) == 1
+    second[0].close()
+    # Closing twice must not release the slot twice
+    second[0].close()
+    assert client.get(fake_services.brave_url, params={"q": "after"}).status_code == 200
+
+
+def test_async_retries_and_streamed_slot(fake_services):
+    async def scenario():
+        client = make_async_client(max_per_host=1)
+        fake_services.fail_next(1, status=503)
+        retried = await client.get(fake_services.brave_url, params={"q": "async retry"})
+
+        first = await client.request("GET", fake_services.brave_url, stream=True, params={"q": "async 1"})
+        second = asyncio.ensure_future(
+            client.request("GET", fake_services.brave_url, stream=True, params={"q": "async 2"})
+        )
+        await asyncio.sleep(0.3)
+        blocked = not second.done()
+        await first.aclose()
+        second_response = await asyncio.wait_for(second, 5)
+        await second_response.aclose()
+        await second_response.aclose()
+        after = await asyncio.wait_for(client.get(fake_services.brave_url, params={"q": "async after"}), 5)
+        await client.client.aclose()
+        return retried.status_code, blocked, after.status_code
+
+    assert asyncio.run(scenario()) == (200, True, 200)
@@ -0,0 +1,76 @@
+def add(vector_store, docs):
+    vector_store.add_documents([
+        {"content": content, "metadata": {"source": source, "type": doc_type}} for content, source, doc_type in docs
+    ])
+
+
+def test_matches_where_operators():
+    from stores.vector_store import matches_where
+
+    metadata = {"source": "https://example.com/a.pdf", "type": "pdf", "chunk_id": 3}
+
+    assert matches_where(metadata, None)
+    assert matches_where(metadata, {"type": "pdf"})
+    assert matches_where(metadata, {"type": {"$in": ["pdf", "web_search"]}, "chunk_id": {"$gte": 3}})
+    assert matches_where(metadata, {"$or": [{"type": "web_search"}, {"chunk_id": {"$lt": 4}}]})
+    assert not matches_where(metadata, {"$and": [{"type": "pdf"}, {"chunk_id": {"$gt": 3}}]})
+    assert not matches_where(metadata, {"missing": {"$gt": 1}})
+    assert not matches_where(metadata, {"type": {"$nin": ["pdf"]}})
+
+
+def test_rrf_ranks_documents_found_by_both_retrievers_first(vector_store):
+    add(vector_store, [
+        ("raft leader election uses randomized timeouts", "https://example.com/raft", "web_search"),
+        ("paxos uses numbered ballots", "https://example.com/paxos", "web_search"),
+        ("leader leases in chubby", "https://example.com/chubby", "web_search"),
+    ])
+
+    docs = vector_store.hybrid_search("raft leader election", k=3)
+
+    assert docs[0]["source"] == "https://example.com/raft"
+    assert docs[0]["fusion_score"] == 1.0
+    assert docs[0]["lexical_score"] > docs[-1]["lexical_score"]
+    assert [doc["fusion_score"] for doc in docs] == sorted((doc["fusion_score"] for doc in docs), reverse=True)
+    assert all(doc["score"] is not None for doc in docs)
+
+
+def test_where_filter_applies_to_both_retrievers(vector_store):
+    add(vector_store, [
+        ("bloom filter false positives", "https://example.com/web", "web_search"),
+        ("bloom filter sizing in chapter two", "https://example.com/book.pdf", "pdf"),
+        ("cuckoo filter deletion", "https://example.com/book.pdf", "pdf"),
+    ])
+
+    docs = vector_store.hybrid_search("bloom filter", k=5, where={"source": "https://example.com/book.pdf"})
+    lexical = vector_store.lexical_search("bloom filter", k=5, where={"type": {"$in": ["pdf"]}})
+
+    assert {doc["source"] for doc in docs} == {"https://example.com/book.pdf"}
+    assert docs[0]["content"] == "bloom filter sizing in chapter two"
+    assert {doc_id for doc_id, _ in lexical} == {
+        vector_store.document_id("bloom filter sizing in chapter two"),
+        vector_store.document_id("cuckoo filter deletion"),
+    }
+
+
+def test_lexical_scores_are_normalized(vector_store):
+    add(vector_store, [
+        ("merkle tree anti entropy", "https://example.com/1", "web_search"),
+        ("merkle proofs", "https://example.com/2", "web_search"),
+    ])
+
+    scores = dict(vector_store.lexical_search("merkle tree anti entropy", k=2))
+
+    assert max(scores.values()) <= 1.0
+    assert scores[vector_store.document_id("merkle tree anti entropy")] > scores[vector_store.document_id("merkle proofs")]
+    assert vector_store.lexical_search("unrelated words") == []
+
+
+def test_new_documents_join_the_built_lexical_index(vector_store):
+    add(vector_store, [("hinted handoff", "https://example.com/1", "web_search")])
+    assert vector_store.lexical_search("sloppy quorum") == []
+
+    add(vector_store, [("sloppy quorum writes", "https://example.com/2", "web_search")])
+
+    assert [doc_id for doc_id, _ in vector_store.lexical_search("sloppy quorum")] == [
+        vector_store.document_id("sloppy quorum writes")
+    ]
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+
+def entry(i):
+    return {
+        "question": f"question {i}",
+        "answer": f"answer {i}",
+        "citations": [f"https://example.com/{i}"],
+        "timestamp": f"2024-01-01T00:00:{i:02d}"
+    }
+
+
+def make_store(legacy_path, backend):
+    from stores.memory_store import MemoryStore
+
+    return MemoryStore(str(legacy_path), backend=backend, search_mode="lexical")
+
+
+def make_backend(kind, tmp_path):
+    from stores.memory_backends import create_memory_backend
+
+    file_names = {"jsonl": "memory.jsonl", "sqlite": "memory.db", "json": "memory.json"}
+    return create_memory_backend(kind, str(tmp_path / file_names[kind]))
+
+
+def test_jsonl_recovers_from_torn_write(tmp_path):
+    from stores.memory_backends import JSONLMemoryBackend
+
+    path = tmp_path / "memory.jsonl"
+    good = "".join(json.dumps(entry(i)) + "\n" for i in range(2))
+    path.write_text(good + '{"question": "torn', encoding="utf-8")
+
+    assert JSONLMemoryBackend(str(path)).load() == [entry(0), entry(1)]
+    # The torn record is compacted away, so new appends start on a clean line
+    assert path.read_text(encoding="utf-8") == good
+    backend = JSONLMemoryBackend(str(path))
+    backend.append(entry(2))
+    assert backend.load() == [entry(0), entry(1), entry(2)]
+
+
+def test_jsonl_skips_corrupt_records(tmp_path):
+    from stores.memory_backends import JSONLMemoryBackend
+
+    path = tmp_path / "memory.jsonl"
+    path.write_text(json.dumps(entry(0)) + "\nnot json\n\n" + json.dumps(entry(1)) + "\n", encoding="utf-8")
+
+    assert JSONLMemoryBackend(str(path)).load() == [entry(0), entry(1)]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_jsonl_compacts_once_it_doubles(tmp_path):
+    from stores.memory_backends import JSONLMemoryBackend
+
+    backend = JSONLMemoryBackend(str(tmp_path / "memory.jsonl"), compact_growth=2.0, compact_min_bytes=1)
+    backend.append_many([entry(i) for i in range(4)])
+    backend.compact(backend.load())
+    assert not backend.needs_compaction()
+
+    backend.append_many([entry(i) for i in range(4, 8)])
+    assert backend.needs_compaction()
+    backend.compact(backend.load())
+    assert not backend.needs_compaction()
+
+
+def test_store_compacts_on_growth(tmp_path):
+    from stores.memory_backends import JSONLMemoryBackend
+
+    backend = JSONLMemoryBackend(str(tmp_path / "memory.jsonl"), compact_growth=2.0, compact_min_bytes=500)
+    compactions = []
+    compact = backend.compact
+    backend.compact = lambda entries: (compactions.append(len(entries)), compact(entries))
+    store = make_store(tmp_path / "none.json", backend)
+
+    for i in range(40):
+        store.add_entry(f"question {i}", f"answer {i}")
+
+    assert compactions
+    assert len(backend.load()) == 40
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "sqlite", "json"])
+def test_legacy_file_imported_once(tmp_path, kind):
+    legacy = tmp_path / "memory_store.json"
+    legacy.write_text(json.dumps([entry(i) for i in range(3)]), encoding="utf-8")
+
+    store = make_store(legacy, make_backend(kind, tmp_path))
+    assert [item["question"] for item in store.memory] == ["question 0", "question 1", "question 2"]
+    store.add_entry("question 3", "answer 3")
+
+    # The legacy file is left alone, and not imported a second time
+    reopened = make_store(legacy, make_backend(kind, tmp_path))
+    assert len(reopened.memory) == 4
+    assert reopened.memory[0]["citations"] == ["https://example.com/0"]
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "sqlite"])
+def test_interrupted_migration_runs_again(tmp_path, monkeypatch, kind):
+    import stores.memory_backends
+
+    legacy = tmp_path / "memory_store.json"
+    legacy.write_text(json.dumps([entry(i) for i in range(5)]), encoding="utf-8")
+
+    def crash(*args):
+        raise OSError("crashed mid-migration")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(stores.memory_backends.os, "replace", crash)
+        assert make_store(legacy, make_backend(kind, tmp_path)).memory == []
+    assert not make_backend(kind, tmp_path).exists()
+
+    assert len(make_store(legacy, make_backend(kind, tmp_path)).memory) == 5
+
+
+def test_search_ranks_question_matches(tmp_path):
+    store = make_store(tmp_path / "none.json", make_backend("jsonl", tmp_path))
+    store.add_entry("How does raft elect a leader?", "Randomized election timeouts.")
+    store.add_entry("What is a bloom filter?", "A probabilistic set; raft is unrelated.")
+
+    results = store.search_memory("raft leader election", limit=2)
+
+    assert results[0]["question"] == "How does raft elect a leader?"
+    assert store.search_memory("zebra", limit=2) == []
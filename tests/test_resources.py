@@ -0,0 +1,13 @@
+def test_ready_once_lazy_resources_have_loaded(fake_services):
+    from graph.resources import Resources, WARM_UP_RESOURCES
+
+    resources = Resources()
+    assert not resources.ready
+    assert resources.status()["ready"] is False
+
+    # Requests load everything on first use; warm_up() never runs
+    for name in WARM_UP_RESOURCES:
+        getattr(resources, name)
+
+    assert resources.ready
+    assert resources.status()["ready"] is True
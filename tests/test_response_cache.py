@@ -0,0 +1,77 @@
+import numpy as np
+
+from api.response_cache import ResponseCache
+
+# Questions that embed to the same direction count as near-identical
+VECTORS = {
+    "what is raft": [1.0, 0.0, 0.0],
+    "what's raft": [0.99, 0.1, 0.0],
+    "what is paxos": [0.0, 1.0, 0.0],
+}
+
+
+def embed(texts):
+    return np.array([VECTORS[text] for text in texts], dtype=np.float32)
+
+
+def make_cache(**kwargs):
+    return ResponseCache("test-model", similarity_threshold=0.95, embedder=embed, **kwargs)
+
+
+def test_exact_hit_on_same_prompt():
+    cache = make_cache()
+    cache.store("prompt", 100, "what is raft", ["https://a"], "ANSWER")
+
+    assert cache.lookup("prompt", 100, "what is raft", ["https://a"]) == "ANSWER"
+    assert cache.lookup("other prompt", 100, "what is paxos", ["https://a"]) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_near_hit_on_similar_question_over_same_sources():
+    cache = make_cache()
+    cache.store("prompt 1", 100, "what is raft", ["https://a", "https://b"], "ANSWER")
+
+    assert cache.lookup("prompt 2", 100, "what's raft", ["https://b", "https://a"]) == "ANSWER"
+    assert cache.lookup("prompt 2", 100, "what's raft", ["https://a"]) is None
+    assert cache.lookup("prompt 3", 100, "what is paxos", ["https://a", "https://b"]) is None
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_no_near_hit_across_kinds_or_token_limits():
+    cache = make_cache()
+    cache.store("summary prompt", 500, "what is raft", ["https://a.pdf"], "SUMMARY", kind="summary")
+
+    assert cache.lookup("answer prompt", 500, "what's raft", ["https://a.pdf"]) is None
+    assert cache.lookup("summary prompt", 500, "what is raft", ["https://a.pdf"]) is None
+    assert cache.lookup("other prompt", 1000, "what's raft", ["https://a.pdf"], kind="summary") is None
+    assert cache.lookup("other prompt", 500, "what's raft", ["https://a.pdf"], kind="summary") == "SUMMARY"
+
+
+def test_no_near_hit_without_specific_sources():
+    cache = make_cache()
+    cache.store("prompt 1", 100, "what is raft", ["memory"], "FROM MEMORY")
+    cache.store("prompt 2", 100, "what is raft", [], "NO CONTEXT")
+
+    assert cache.lookup("prompt 3", 100, "what's raft", ["memory"]) is None
+    assert cache.lookup("prompt 4", 100, "what's raft", []) is None
+    assert cache.lookup("prompt 1", 100, "what is raft", ["memory"]) == "FROM MEMORY"
+
+
+def test_invalidate_sources_drops_answers_built_from_them():
+    cache = make_cache()
+    cache.store("prompt 1", 100, "what is raft", ["https://a", "https://b"], "ANSWER 1")
+    cache.store("prompt 2", 100, "what is paxos", ["https://c"], "ANSWER 2")
+
+    assert cache.invalidate_sources(["https://b"]) == 1
+    assert cache.lookup("prompt 1", 100, "what is raft", ["https://a", "https://b"]) is None
+    assert cache.lookup("prompt 2", 100, "what is paxos", ["https://c"]) == "ANSWER 2"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = make_cache(ttl=0)
+    cache.store("prompt", 100, "what is raft", ["https://a"], "ANSWER")
+
+    assert cache.lookup("prompt", 100, "what is raft", ["https://a"]) is None
+    assert cache.stats()["size"] == 0
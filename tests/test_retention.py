@@ -0,0 +1,80 @@
+import time
+
+DAY = 86400
+
+
+def add(vector_store, contents, doc_type="web_search"):
+    vector_store.add_documents([
+        {"content": content, "metadata": {"source": f"https://example.com/{content.split()[0]}", "type": doc_type}}
+        for content in contents
+    ])
+    return [vector_store.document_id(content) for content in contents]
+
+
+def stored_ids(vector_store):
+    return set(vector_store.collection.get(include=[])["ids"])
+
+
+def test_ttl_expires_old_documents_of_the_policy_type_only(vector_store):
+    web = add(vector_store, ["alpha snippet", "beta snippet"])
+    pdf = add(vector_store, ["gamma chunk"], doc_type="pdf")
+
+    report = vector_store.enforce_retention({"web_search": {"ttl_days": 1}, "pdf": {}}, now=time.time() + 2 * DAY)
+
+    assert report["web_search"]["expired"] == 2
+    assert report["web_search"]["removed_sources"] == ["https://example.com/alpha", "https://example.com/beta"]
+    assert report["pdf"] == {"scanned": 0, "expired": 0, "evicted": 0, "backfilled": 0, "removed_sources": []}
+    assert stored_ids(vector_store) == set(pdf)
+    assert not set(web) & stored_ids(vector_store)
+
+
+def test_size_cap_evicts_least_recently_retrieved(vector_store):
+    ids = add(vector_store, [f"doc{i} snippet" for i in range(5)])
+    now = time.time()
+    # doc3 and doc1 were retrieved most recently; the rest only have their added_at
+    vector_store.collection.update(ids=[ids[3], ids[1]], metadatas=[{"last_retrieved": now + 20}, {"last_retrieved": now + 10}])
+
+    report = vector_store.enforce_retention({"web_search": {"max_documents": 2}}, now=now + 30)
+
+    assert report["web_search"]["evicted"] == 3
+    assert stored_ids(vector_store) == {ids[1], ids[3]}
+
+
+def test_retrievals_are_recorded_and_count_for_the_cap(vector_store):
+    ids = add(vector_store, ["raft consensus snippet", "paxos ballots snippet", "gossip membership snippet"])
+    time.sleep(0.01)
+
+    hits = vector_store.similarity_search("paxos ballots snippet", k=1)
+    assert [hit["id"] for hit in hits] == [ids[1]]
+    assert vector_store.flush_retrievals() == 1
+    assert "last_retrieved" in vector_store.collection.get(ids=[ids[1]])["metadatas"][0]
+
+    vector_store.enforce_retention({"web_search": {"max_documents": 1}})
+    assert stored_ids(vector_store) == {ids[1]}
+
+
+def test_documents_without_added_at_start_their_ttl_now(vector_store):
+    vector_store.collection.add(
+        ids=["legacy"],
+        embeddings=vector_store.embed(["legacy snippet"]).tolist(),
+        documents=["legacy snippet"],
+        metadatas=[{"source": "https://example.com/legacy", "type": "web_search"}]
+    )
+    now = time.time()
+
+    report = vector_store.enforce_retention({"web_search": {"ttl_days": 1}}, now=now)
+
+    assert report["web_search"]["backfilled"] == 1
+    assert report["web_search"]["expired"] == 0
+    assert vector_store.collection.get(ids=["legacy"])["metadatas"][0]["added_at"] == now
+    assert vector_store.enforce_retention({"web_search": {"ttl_days": 1}}, now=now + 2 * DAY)["web_search"]["expired"] == 1
+
+
+def test_removed_documents_leave_the_lexical_index(vector_store):
+    ids = add(vector_store, ["zebra migration snippet", "yak grazing snippet"])
+    assert [doc["id"] for doc in vector_store.hybrid_search("zebra", k=1)] == [ids[0]]
+
+    vector_store.enforce_retention({"web_search": {"ttl_days": 1}}, now=time.time() + 2 * DAY)
+
+    assert vector_store.lexical_search("zebra") == []
+    assert vector_store.hybrid_search("zebra", k=1) == []
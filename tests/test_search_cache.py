@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+from api.search_cache import SearchCache, normalize_query
+
+
+class Fetcher:
+    """Counts calls and returns a new version of the results each time"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, query, count):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls += 1
+            return [{"title": f"{query} v{self.calls}", "url": f"https://example.com/{self.calls}"}]
+
+    async def fetch_async(self, query, count):
+        return self(query, count)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_fresh_entries_are_served_for_equivalent_queries():
+    cache = SearchCache()
+    fetch = Fetcher()
+
+    first = cache.get_or_fetch("Raft consensus?", 5, fetch, ttl=60)
+    second = cache.get_or_fetch("raft   CONSENSUS", 5, fetch, ttl=60)
+    other_count = cache.get_or_fetch("raft consensus", 10, fetch, ttl=60)
+
+    assert normalize_query("Raft consensus?") == "raft consensus"
+    assert first == second
+    assert other_count != first
+    assert fetch.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    cache = SearchCache(stale_factor=10.0)
+    fetch = Fetcher(delay=0.1)
+    original = cache.get_or_fetch("bloom filters", 5, fetch, ttl=0.05)
+    time.sleep(0.06)
+
+    start = time.perf_counter()
+    # The entry keeps the TTL it was stored with; the refresh stores the new one
+    stale = [cache.get_or_fetch("bloom filters", 5, fetch, ttl=60) for _ in range(3)]
+
+    # Served at once from the expired entry, with a single background refresh
+    assert time.perf_counter() - start < 0.1
+    assert stale == [original] * 3
+    assert wait_for(lambda: fetch.calls == 2)
+    assert wait_for(lambda: cache.stats()["size"] == 1 and not cache._refreshing)
+    assert cache.get_or_fetch("bloom filters", 5, fetch, ttl=60) != original
+    assert cache.stats()["stale_hits"] == 3
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_entries_past_the_stale_window_are_fetched_again():
+    cache = SearchCache(stale_factor=1.0)
+    fetch = Fetcher()
+    original = cache.get_or_fetch("gossip", 5, fetch, ttl=0.02)
+    time.sleep(0.05)
+
+    assert cache.get_or_fetch("gossip", 5, fetch, ttl=0.02) != original
+    assert fetch.calls == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_empty_results_are_not_cached():
+    cache = SearchCache()
+    calls = []
+
+    def fetch_nothing(query, count):
+        calls.append(query)
+        return []
+
+    cache.get_or_fetch("nothing", 5, fetch_nothing, ttl=60)
+    cache.get_or_fetch("nothing", 5, fetch_nothing, ttl=60)
+
+    assert len(calls) == 2
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SearchCache(max_entries=2)
+    fetch = Fetcher()
+    for query in ("a", "b"):
+        cache.get_or_fetch(query, 5, fetch, ttl=60)
+    cache.get_or_fetch("a", 5, fetch, ttl=60)
+    cache.get_or_fetch("c", 5, fetch, ttl=60)
+
+    assert set(cache._entries) == {SearchCache.key("a", 5), SearchCache.key("c", 5)}
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    db_path = str(tmp_path / "search_cache.db")
+    fetch = Fetcher()
+    results = SearchCache(db_path=db_path).get_or_fetch("vector search", 5, fetch, ttl=60)
+
+    assert SearchCache(db_path=db_path).get_or_fetch("vector search", 5, fetch, ttl=60) == results
+    assert fetch.calls == 1
+
+
+def test_async_stale_entries_refresh_as_a_task():
+    cache = SearchCache(stale_factor=10.0)
+    fetch = Fetcher()
+
+    async def scenario():
+        original = await cache.aget_or_fetch("lsm trees", 5, fetch.fetch_async, ttl=0.02)
+        await asyncio.sleep(0.03)
+        stale = await cache.aget_or_fetch("lsm trees", 5, fetch.fetch_async, ttl=60)
+        await asyncio.gather(*cache._background_tasks)
+        refreshed = await cache.aget_or_fetch("lsm trees", 5, fetch.fetch_async, ttl=60)
+        return original, stale, refreshed
+
+    original, stale, refreshed = asyncio.run(scenario())
+
+    assert stale == original
+    assert refreshed != original
+    assert fetch.calls == 2
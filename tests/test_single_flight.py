@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_sync")
+    started = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {"answer": 42}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert results == [{"answer": 42}] * 5
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_landed_flights_run_again_and_errors_are_shared():
+    flight = SingleFlight("test_errors")
+
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+    def fail():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_callers_share_one_execution():
+    flight = SingleFlight("test_async")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.ado("key", work) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["result"] * 5
+    assert len(calls) == 1
+
+
+def test_cancelling_the_async_leader_does_not_cancel_followers():
+    flight = SingleFlight("test_leader_cancel")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.1)
+        finished.append(True)
+        return 42
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await asyncio.wait_for(follower, 1)
+        return leader.cancelled(), result
+
+    assert asyncio.run(scenario()) == (True, 42)
+    assert finished == [True]
+
+
+def test_async_flight_finishes_when_every_caller_is_cancelled():
+    flight = SingleFlight("test_all_cancel")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return 1
+
+    async def scenario():
+        callers = [asyncio.ensure_future(flight.ado("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.1)
+        # The flight landed, so a new call executes again
+        return await flight.ado("key", work)
+
+    assert asyncio.run(scenario()) == 1
+    assert finished == [True, True]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_sync_caller_joins_async_flight():
+    flight = SingleFlight("test_mixed")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "shared"
+
+    results = []
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        thread = threading.Thread(target=lambda: results.append(flight.do("key", lambda: "own")))
+        thread.start()
+        results.append(await leader)
+        await asyncio.to_thread(thread.join, 2)
+
+    asyncio.run(scenario())
+
+    assert results == ["shared", "shared"]
+    assert len(calls) == 1
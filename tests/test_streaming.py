@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+
+import pytest
+
+_question_ids = itertools.count()
+
+
+class FakeGraph:
+    """Replays stream chunks, or raises, like a compiled graph in stream_mode=["updates", "values"]"""
+
+    def __init__(self, final_state=None, raises=None):
+        self.final_state = final_state
+        self.raises = raises
+
+    def chunks(self):
+        yield "updates", {"generate_answer": {}}
+        if self.raises:
+            raise self.raises
+        yield "values", self.final_state
+
+    def stream(self, state, config=None, stream_mode=None):
+        yield from self.chunks()
+
+    async def astream(self, state, config=None, stream_mode=None):
+        for chunk in self.chunks():
+            yield chunk
+
+
+def collect(graph, use_async):
+    from graph.streaming import astream_research_events, stream_research_events
+
+    if not use_async:
+        return list(stream_research_events(graph, "question"))
+
+    async def run():
+        return [event async for event in astream_research_events(graph, "question")]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+@pytest.mark.parametrize("graph, error", [
+    (FakeGraph({"answer": "Error generating response: upstream down"}), "Error generating response: upstream down"),
+    (FakeGraph({"answer": "partial", "error": "No search results found"}), "No search results found"),
+    (FakeGraph(raises=RuntimeError("node crashed")), "node crashed"),
+])
+def test_failed_runs_end_with_an_error_event(fake_services, graph, error, use_async):
+    events = collect(graph, use_async)
+
+    assert events[0] == ("node", {"node": "generate_answer"})
+    assert events[-1] == ("error", {"error": error})
+    assert "result" not in [event for event, _ in events]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_successful_runs_end_with_the_final_state(fake_services, use_async):
+    final_state = {"answer": "Raft elects a leader.", "citations": []}
+
+    assert collect(FakeGraph(final_state), use_async)[-1] == ("result", final_state)
+
+
+def test_asgi_stream_reports_failed_generation_as_error_event(fake_services):
+    import httpx
+    from main import create_asgi_app
+
+    question = f"What did we discuss about leases? ({next(_question_ids)})"
+    # A 400 is not retried, so the answer completion fails at once
+    fake_services.fail_next(1, status=400)
+
+    async def ask():
+        transport = httpx.ASGITransport(app=create_asgi_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/ask/stream", json={"question": question})
+
+    response = asyncio.run(ask())
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+
+    assert response.status_code == 200
+    assert frames[-1].startswith("event: error\n")
+    assert '"error": "Error generating response' in frames[-1]
+    assert not any(frame.startswith("event: done") for frame in frames)
+
+
+def test_failed_pdf_summary_is_recorded_as_an_error(fake_services, monkeypatch):
+    from graph import nodes
+
+    monkeypatch.setattr(nodes._pdf_flight, "do", lambda key, work: "preview text")
+    monkeypatch.setattr(nodes, "_summarize_pdf", lambda question, pdf_url, preview: "Error: OpenAI API key not configured")
+
+    result = nodes.pdf_summarize({"question": "Summarize this PDF: https://example.com/paper.pdf"})
+
+    assert result == {"error": "Error: OpenAI API key not configured"}
@@ -0,0 +1,91 @@
+import pytest
+
+
+def words(text):
+    return len(text.split())
+
+
+def make_chunker(chunk_tokens=20, overlap_tokens=5):
+    from stores.text_chunker import TextChunker
+
+    return TextChunker(chunk_tokens=chunk_tokens, overlap_tokens=overlap_tokens, token_counter=words)
+
+
+def sentences(count, start=0):
+    return [f"Sentence {i} has five words." for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("2.1 Results", True),
+    ("# Results", True),
+    ("IV. Discussion", True),
+    ("RELATED WORK", True),
+    ("Results are shown below.", False),
+    ("A B", False),
+    ("", False),
+    ("x" * 81, False),
+])
+def test_is_heading(line, expected):
+    from stores.text_chunker import is_heading
+
+    assert is_heading(line) is expected
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    from stores.text_chunker import TextChunker
+
+    with pytest.raises(ValueError):
+        TextChunker(chunk_tokens=10, overlap_tokens=10, token_counter=words)
+
+
+def test_chunks_respect_size_and_overlap():
+    text = " ".join(sentences(30))
+    chunks = make_chunker().chunk_text(text)
+
+    assert len(chunks) > 1
+    assert [chunk["chunk_id"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(chunk["tokens"] <= 20 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        shared = current["text"].split("\n")[0]
+        # Each chunk opens with the tail of the previous one, within the overlap budget
+        assert previous["text"].endswith(shared)
+        assert words(shared) <= 5
+    # Every sentence lands in some chunk
+    joined = "\n".join(chunk["text"] for chunk in chunks)
+    assert all(sentence in joined for sentence in sentences(30))
+
+
+def test_sections_start_new_chunks_and_carry_their_heading():
+    text = "\n".join(["1. Introduction", " ".join(sentences(2)), "", "2. Methods", " ".join(sentences(2, 2))])
+    chunks = make_chunker(chunk_tokens=40).chunk_text(text)
+
+    assert [chunk["heading"] for chunk in chunks] == ["1. Introduction", "2. Methods"]
+    assert chunks[1]["text"].startswith("2. Methods")
+    assert "Sentence 1 " in chunks[0]["text"] and "Sentence 2 " not in chunks[0]["text"]
+
+
+def test_short_sections_are_merged_with_the_next():
+    text = "\n".join(["1. Title", "Tiny.", "2. Body", " ".join(sentences(2))])
+    chunks = make_chunker(chunk_tokens=40).chunk_text(text)
+
+    assert len(chunks) == 1
+    assert chunks[0]["heading"] == "1. Title"
+
+
+def test_chunks_record_the_pages_they_span():
+    pages = [(1, " ".join(sentences(3))), (2, " ".join(sentences(3, 3))), (3, " ".join(sentences(3, 6)))]
+    chunks = list(make_chunker(chunk_tokens=40).chunk_pages(pages))
+
+    assert chunks[0]["page_start"] == 1
+    assert chunks[-1]["page_end"] == 3
+    assert any(chunk["page_start"] < chunk["page_end"] for chunk in chunks)
+    assert all(chunk["page_start"] <= chunk["page_end"] for chunk in chunks)
+
+
+def test_oversized_sentences_are_split_into_word_windows():
+    long_sentence = " ".join(f"word{i}" for i in range(100))
+    chunks = make_chunker().chunk_text(long_sentence)
+
+    assert len(chunks) >= 5
+    assert all(chunk["tokens"] <= 20 for chunk in chunks)
+    assert "word0" in chunks[0]["text"] and "word99" in chunks[-1]["text"]
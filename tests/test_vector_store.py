@@ -0,0 +1,59 @@
+def doc(content, **metadata):
+    return {"content": content, "metadata": {"source": "https://example.com/a", "type": "web_search", **metadata}}
+
+
+def test_document_ids_are_content_hashes():
+    from stores.vector_store import VectorStore
+
+    assert VectorStore.document_id("raft  consensus\nprotocol") == VectorStore.document_id("raft consensus protocol")
+    assert VectorStore.document_id("raft") != VectorStore.document_id("paxos")
+    assert VectorStore.document_id("raft").startswith("doc_")
+
+
+def test_add_documents_skips_duplicates_and_refreshes_metadata(vector_store):
+    added = vector_store.add_documents([doc("raft elects a leader"), doc("raft  elects a leader"), doc("paxos has ballots")])
+
+    assert added == 2
+    assert vector_store.collection.count() == 2
+
+    doc_id = vector_store.document_id("raft elects a leader")
+    before = vector_store.collection.get(ids=[doc_id])["metadatas"][0]
+
+    # Re-adding known content only updates its metadata
+    assert vector_store.add_documents([doc("raft elects a leader", title="Raft")]) == 0
+    after = vector_store.collection.get(ids=[doc_id])["metadatas"][0]
+    assert vector_store.collection.count() == 2
+    assert after["title"] == "Raft"
+    assert after["added_at"] >= before["added_at"]
+
+
+def test_deduplicate_rekeys_legacy_ids_and_drops_copies(vector_store):
+    contents = ["gossip spreads state", "gossip spreads state", "vector clocks order events"]
+    vector_store.collection.add(
+        ids=["legacy_1", "legacy_2", "legacy_3"],
+        embeddings=vector_store.embed(contents).tolist(),
+        documents=contents,
+        metadatas=[{"source": f"https://example.com/{i}"} for i in range(3)]
+    )
+
+    stats = vector_store.deduplicate()
+
+    assert stats == {"scanned": 3, "rekeyed": 2, "removed": 1}
+    assert sorted(vector_store.collection.get(include=[])["ids"]) == sorted(
+        vector_store.document_id(content) for content in contents[1:]
+    )
+
+
+def test_delete_documents_keeps_current_contents(vector_store):
+    url = "https://example.com/paper.pdf"
+    vector_store.add_documents([doc(f"version one chunk {i}", source=url, type="pdf") for i in range(3)])
+    vector_store.add_documents([doc("another document", source="https://example.com/other")])
+    current = ["version one chunk 0", "version two chunk 1"]
+    vector_store.add_documents([doc(content, source=url, type="pdf") for content in current])
+
+    removed = vector_store.delete_documents({"source": url}, keep_contents=current)
+
+    assert removed == 2
+    stored = vector_store.collection.get(where={"source": url})["documents"]
+    assert sorted(stored) == sorted(current)
+    assert vector_store.has_documents({"source": "https://example.com/other"})
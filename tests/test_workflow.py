@@ -0,0 +1,19 @@
+import itertools
+
+_question_ids = itertools.count()
+
+
+def test_parallel_branch_spans_reach_request_trace(fake_services):
+    from graph.workflow import create_research_assistant
+    from metrics import request_trace, timing_breakdown
+
+    graph = create_research_assistant("parallel")
+
+    with request_trace() as trace:
+        result = graph.invoke({"question": f"Search the web for gossip protocols ({next(_question_ids)})"})
+
+    timings = timing_breakdown(trace)
+    assert not result.get("error")
+    assert "brave.search" in timings
+    assert "memory_store.search" in timings
+    assert "vector_store.hybrid" in timings or "vector_store.query" in timings
@@ -1,5 +1,26 @@
 import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional: token counts fall back to a character estimate
+    tiktoken = None
 
 def configure_logging():
     logging.basicConfig(level=logging.INFO)
-    return logging.getLogger(__name__)
\ No newline at end of file
+    return logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"tiktoken encoding unavailable ({e}), estimating token counts")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Token count of text: exact with tiktoken installed, otherwise about 4 characters per token"""
+    encoding = _token_encoding() if tiktoken is not None else None
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4